@@ -0,0 +1,205 @@
+"""Show how a list carried forward and edited in Word every day grows, with and without compaction.
+
+Usage:
+    python -m benchmarks.bench_compaction [--days N] [--patients N] [--every N]
+
+Starting from the empty test list, each simulated day's list is generated from the day
+before's, after the day before's has been "edited in Word": a third of the patients have
+their jobs edited, which, as Word does, splits the text into runs with new revision ids
+(rsids) and proofing marks, and adds the edit's rsid to the settings. Once a week a style
+is pasted in from elsewhere. A tenth of the patients are replaced each day, apart from a
+few who stay throughout, whose cells are carried forward the whole time.
+
+Word itself can't be run here, so the time to unzip and parse every XML part of the list
+with lxml stands in for Word's open time. "Our parse" is the time to build a HandoverList
+from the list, without the parsed list cache.
+"""
+import argparse
+import copy
+import datetime
+import io
+import logging
+import os
+import random
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+os.environ.setdefault("TESTING", "true")
+os.environ.setdefault("LIST_ROOT_DIR", tempfile.mkdtemp(prefix="plg-bench-"))
+
+EMPTY_LIST = Path(__file__).parents[1] / "tests" / "assets" / "empty_list.docm"
+# patients who stay for the whole of the simulation
+N_LONG_STAY = 5
+
+
+def trakcare_patients(day: int, n_patients: int):
+    """Return the patients on TrakCare on the given day; most stay for ten days."""
+    from src.shared_enums import Consultant, Ward
+    from src.shared_models import Patient
+
+    turnover = max(n_patients // 10, 1)
+    numbers = list(range(N_LONG_STAY))
+    numbers += range(100 + day * turnover, 100 + day * turnover + n_patients - N_LONG_STAY)
+    return [
+        Patient.from_record(
+            {
+                "reg_number": f"{1000000 + i}",
+                "_nhs_number": f"{4000000000 + i}",
+                "forename": "John",
+                "surname": f"Smith{i}",
+                "admission_date": datetime.date(2020, 6, 15),
+                "dob": datetime.date(1956, 5, 14),
+                "ward": Ward.TARKA,
+                "room": f"Bay {i // 6 % 12 + 1:02} TA",
+                "_bed": f"Bed{'ABCDEF'[i % 6]}",
+                "_reason_for_admission": "Unwell",
+                "consultant": Consultant.ALISON_MOODY,
+            }
+        )
+        for i in numbers
+    ]
+
+
+def edit_in_word(data: bytes, day: int, rng: random.Random) -> bytes:
+    """Return the list after editing it as Word would; see the module docstring."""
+    from docx.oxml.ns import qn
+    from lxml import etree
+
+    rsid = f"00{day:06X}"
+    source = zipfile.ZipFile(io.BytesIO(data))
+    document = etree.fromstring(source.read("word/document.xml"))
+    settings = etree.fromstring(source.read("word/settings.xml"))
+    styles = etree.fromstring(source.read("word/styles.xml"))
+
+    for tr in document.iter(qn("w:tr")):
+        tcs = tr.findall(qn("w:tc"))
+        if len(tcs) != 8 or rng.random() > 1 / 3:
+            continue
+        p = tcs[4].find(qn("w:p"))
+        p.set(qn("w:rsidR"), rsid)
+        p.set(qn("w:rsidRDefault"), rsid)
+        runs = [r for r in p.findall(qn("w:r")) if r.find(qn("w:t")) is not None]
+        if not runs:
+            r = etree.SubElement(p, qn("w:r"))
+            etree.SubElement(r, qn("w:t")).text = "Chase bloods"
+            runs = [r]
+
+        # split the last run in two, as Word does when text is typed into the middle of it
+        r = runs[-1]
+        t = r.find(qn("w:t"))
+        middle = len(t.text) // 2
+        second = copy.deepcopy(r)
+        t.text, second.find(qn("w:t")).text = t.text[:middle], t.text[middle:]
+        for run in (r, second):
+            run.set(qn("w:rsidR"), rsid)
+            run.set(qn("w:rsidRPr"), rsid)
+            run.find(qn("w:t")).set(qn("xml:space"), "preserve")
+        r.addnext(second)
+        r.addnext(etree.Element(qn("w:proofErr"), {qn("w:type"): "spellStart"}))
+        second.addnext(etree.Element(qn("w:proofErr"), {qn("w:type"): "spellEnd"}))
+
+    rsids = settings.find(qn("w:rsids"))
+    if rsids is None:
+        rsids = etree.SubElement(settings, qn("w:rsids"))
+    etree.SubElement(rsids, qn("w:rsid"), {qn("w:val"): rsid})
+
+    if day % 7 == 0:
+        style = etree.SubElement(
+            styles,
+            qn("w:style"),
+            {qn("w:type"): "paragraph", qn("w:customStyle"): "1", qn("w:styleId"): f"Pasted{day}"},
+        )
+        etree.SubElement(style, qn("w:name"), {qn("w:val"): f"Pasted {day}"})
+        etree.SubElement(style, qn("w:basedOn"), {qn("w:val"): "Normal"})
+
+    edited = {
+        "word/document.xml": document,
+        "word/settings.xml": settings,
+        "word/styles.xml": styles,
+    }
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zf:
+        for info in source.infolist():
+            if info.filename in edited:
+                zf.writestr(info.filename, etree.tostring(edited[info.filename]))
+            else:
+                zf.writestr(info, source.read(info))
+    return output.getvalue()
+
+
+def best_of(repeat: int, fn) -> float:
+    """Return the shortest time in milliseconds of 'repeat' calls to 'fn'."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def parse_xml_parts(data: bytes) -> None:
+    from lxml import etree
+
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        for name in zf.namelist():
+            if name.endswith((".xml", ".rels")):
+                etree.fromstring(zf.read(name))
+
+
+def simulate(days: int, n_patients: int, compact: bool, every: int) -> list:
+    """Carry a list forward for the given number of days, measuring it every 'every' days."""
+    from src.list_generator.models import HandoverList
+    from src.shared_enums import Team
+
+    team = Team.RESPIRATORY.value
+    rng = random.Random(0)
+    data = EMPTY_LIST.read_bytes()
+    results = []
+    for day in range(1, days + 1):
+        handover_list = HandoverList(team, io.BytesIO(data), EMPTY_LIST.name)
+        handover_list.update(trakcare_patients(day, n_patients))
+        if compact:
+            handover_list.compact()
+        output = io.BytesIO()
+        handover_list.save(output)
+        data = edit_in_word(output.getvalue(), day, rng)
+
+        if day == 1 or day % every == 0:
+            with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                document_size = zf.getinfo("word/document.xml").file_size
+            results.append(
+                {
+                    "day": day,
+                    "list_kb": len(data) / 1024,
+                    "document_kb": document_size / 1024,
+                    "xml_parse_ms": best_of(5, lambda: parse_xml_parts(data)),
+                    "our_parse_ms": best_of(
+                        5, lambda: HandoverList(team, io.BytesIO(data), EMPTY_LIST.name)
+                    ),
+                }
+            )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--patients", type=int, default=40)
+    parser.add_argument("--every", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    for compact in (False, True):
+        print("with compaction" if compact else "without compaction")
+        print(f"{'day':>5} {'list':>10} {'document.xml':>14} {'xml parse':>11} {'our parse':>11}")
+        for result in simulate(args.days, args.patients, compact, args.every):
+            print(
+                f"{result['day']:>5} {result['list_kb']:>8.1f}KB {result['document_kb']:>12.1f}KB "
+                f"{result['xml_parse_ms']:>9.1f}ms {result['our_parse_ms']:>9.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Time fetching one team's patients from TrakCare, against fetching the whole hospital.
+
+Usage:
+    python -m benchmarks.bench_fetch [--patients N [N ...]] [--repeat N]
+
+Generating a single team's list fetches every inpatient on our wards, not just the team's,
+so that the TrakCare snapshot covers the whole hospital; see list_generator.__init__. This
+measures what that costs. For each size, an in-memory TrakCare is filled with that many
+patients spread across every ward and consultant, and three things are timed, each the
+best of several runs:
+
+    team:       fetching one team's patients, as generating a list did before snapshots
+    hospital:   fetching every patient and grouping them by team, as it does now
+    snapshot:   recording a snapshot of every patient and comparing it with the last one
+
+The difference between the first two, plus the snapshot, is the cost of the snapshot to a
+single team's list.
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("TESTING", "true")
+os.environ.setdefault("LIST_ROOT_DIR", tempfile.mkdtemp(prefix="plg-bench-"))
+
+
+def patient_values(i: int) -> dict:
+    from src.shared_enums import Consultant, Ward
+
+    wards, consultants = list(Ward), list(Consultant)
+    return {
+        "RegNumber": f"{1000000 + i}",
+        "NHSNumber": f"{4000000000 + i}",
+        "Forename": "John",
+        "Surname": f"Smith{i}",
+        "AdmissionDate": datetime.date(2020, 6, 15),
+        "DateOfBirth": datetime.date(1956, 5, 14),
+        "Ward": wards[i % len(wards)].value,
+        "Room": f"Bay {i // 6 % 12 + 1:02} CA",
+        "Bed": f"Bed{'ABCDEF'[i % 6]}",
+        "ReasonForAdmission": "Unwell",
+        "Consultant": consultants[i % len(consultants)].value,
+    }
+
+
+def fill_trak(n_patients: int) -> None:
+    from src import database
+    from src.shared_models import Patient
+
+    database.init_db()
+    with database.engine.connect() as conn:
+        conn.execute(Patient.__table__.delete())
+        conn.execute(Patient.__table__.insert(), [patient_values(i) for i in range(n_patients)])
+
+
+def best_of(repeat: int, fn) -> float:
+    """Return the shortest time in milliseconds of 'repeat' calls to 'fn'."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def bench(n_patients: int, repeat: int) -> dict:
+    from src import database
+    from src.list_generator import snapshot, trakcare
+    from src.shared_enums import Team
+
+    fill_trak(n_patients)
+    team = Team.RESPIRATORY.value
+
+    def fetch_team():
+        try:
+            return trakcare.fetch_team_patients(team)
+        finally:
+            database.session.remove()
+
+    def fetch_hospital():
+        try:
+            patients = trakcare.fetch_all_patients()
+        finally:
+            database.session.remove()
+        return trakcare.group_by_team(patients, [team])
+
+    patients = trakcare.fetch_all_patients()
+    database.session.remove()
+    store_dir = Path(tempfile.mkdtemp(prefix="plg-bench-"))
+    store = snapshot.SnapshotStore(store_dir / "snapshots.sqlite3")
+    # a snapshot from yesterday for each run to be compared with
+    snapshot.record(patients, store, datetime.datetime.now() - datetime.timedelta(days=1))
+
+    return {
+        "patients": n_patients,
+        "team_patients": len(fetch_team()),
+        "team_ms": best_of(repeat, fetch_team),
+        "hospital_ms": best_of(repeat, fetch_hospital),
+        "snapshot_ms": best_of(repeat, lambda: snapshot.record(patients, store)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'patients':>9} {'team':>6} {'team':>10} {'hospital':>10} {'snapshot':>10}")
+    for n_patients in args.patients:
+        result = bench(n_patients, args.repeat)
+        print(
+            f"{result['patients']:>9} {result['team_patients']:>6} "
+            f"{result['team_ms']:>8.1f}ms {result['hospital_ms']:>8.1f}ms "
+            f"{result['snapshot_ms']:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Measure the peak memory used to generate a large handover list, with and without low memory mode.
+
+Usage:
+    python -m benchmarks.bench_memory [--patients N] [--images N] [--image-mb N]
+
+A list with the given number of patients and pasted images is built from the empty test
+list, then generated in a fresh process for each mode against an in-memory TrakCare, so
+that the peaks of one run don't affect the other. Two peaks are reported: the Python heap
+as traced by tracemalloc (which doesn't see lxml's own allocations) and the process's
+maximum resident set size.
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import random
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+os.environ.setdefault("TESTING", "true")
+os.environ.setdefault("LIST_ROOT_DIR", tempfile.mkdtemp(prefix="plg-bench-"))
+
+EMPTY_LIST = Path(__file__).parents[1] / "tests" / "assets" / "empty_list.docm"
+
+
+def make_png(size_mb: float) -> bytes:
+    """Return an uncompressible PNG of roughly the given size, like a pasted screenshot."""
+    width = 1000
+    height = max(int(size_mb * 1024 * 1024 / (width * 3)), 1)
+    rows = b"".join(b"\x00" + random.randbytes(width * 3) for _ in range(height))
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows, 0))
+        + chunk(b"IEND", b"")
+    )
+
+
+def patient_values(i: int) -> dict:
+    return {
+        "RegNumber": f"{1000000 + i}",
+        "NHSNumber": f"{4000000000 + i}",
+        "Forename": "John",
+        "Surname": f"Smith{i}",
+        "AdmissionDate": datetime.date(2020, 6, 15),
+        "DateOfBirth": datetime.date(1956, 5, 14),
+        "Ward": "Capener",
+        "Room": f"Bay {i // 6 + 1:02} CA",
+        "Bed": f"Bed{'ABCDEF'[i % 6]}",
+        "ReasonForAdmission": "Unwell",
+        "Consultant": "Dr Alison Moody",
+    }
+
+
+def add_patients_to_trak(n_patients: int) -> None:
+    from src import database
+    from src.shared_models import Patient
+
+    database.init_db()
+    with database.engine.connect() as conn:
+        conn.execute(Patient.__table__.insert(), [patient_values(i) for i in range(n_patients)])
+
+
+def build_list(path: Path, n_patients: int, n_images: int, image_mb: float) -> None:
+    """Generate a list of the given number of patients and paste the images below it."""
+    from docx.shared import Cm
+
+    from src.list_generator.models import HandoverList
+    from src.shared_enums import Team
+
+    add_patients_to_trak(n_patients)
+    handover_list = HandoverList(Team.RESPIRATORY.value, EMPTY_LIST, EMPTY_LIST.name)
+    handover_list.update()
+    for _ in range(n_images):
+        handover_list.doc.add_picture(io.BytesIO(make_png(image_mb)), width=Cm(15))
+    handover_list.save(path)
+
+
+def run(path: Path, n_patients: int, low_memory: bool) -> dict:
+    """Generate a list from the given one, in this process, and return its measurements."""
+    import tracemalloc
+
+    from src.list_generator import generate_list
+    from src.shared_enums import Team
+
+    add_patients_to_trak(n_patients)
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(path, "rb") as fh:
+        generate_list(
+            Team.RESPIRATORY.value, fh, Path(path.name), force=True, low_memory=low_memory
+        )
+    elapsed = time.perf_counter() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": elapsed,
+        "traced_peak_mb": traced_peak / 1024 / 1024,
+        "max_rss_mb": max_rss_kb() / 1024,
+    }
+
+
+def max_rss_kb() -> int:
+    # ru_maxrss carries over from the parent process across exec on Linux, so prefer the
+    # high water mark of this process's own memory where it's available
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except FileNotFoundError:
+        pass
+
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=60)
+    parser.add_argument("--images", type=int, default=4)
+    parser.add_argument("--image-mb", type=float, default=5)
+    parser.add_argument("--run", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--low-memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run:
+        print(json.dumps(run(args.run, args.patients, args.low_memory)))
+        return
+
+    list_path = Path(os.environ["LIST_ROOT_DIR"]) / "large_list.docm"
+    build_list(list_path, args.patients, args.images, args.image_mb)
+    print(
+        f"{args.patients} patients and {args.images} images of {args.image_mb} MB "
+        f"({list_path.stat().st_size / 1024 / 1024:.1f} MB)"
+    )
+
+    print(f"{'mode':<12}{'time (s)':>10}{'traced peak (MB)':>20}{'max RSS (MB)':>16}")
+    for low_memory in (False, True):
+        command = [sys.executable, "-m", "benchmarks.bench_memory", "--run", str(list_path)]
+        command += ["--patients", str(args.patients)]
+        if low_memory:
+            command.append("--low-memory")
+        output = subprocess.run(command, capture_output=True, check=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{'low memory' if low_memory else 'default':<12}"
+            f"{result['seconds']:>10.2f}"
+            f"{result['traced_peak_mb']:>20.1f}"
+            f"{result['max_rss_mb']:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Time reconciling a handover list, and a hospital-wide snapshot, against TrakCare.
+
+Usage:
+    python -m benchmarks.bench_reconcile [--patients N [N ...]] [--churn FRACTION] [--repeat N]
+
+For each size, a previous list and a current TrakCare result are made up which share all
+but 'churn' of their patients; a tenth of the previous list's patients are known only by
+their registration number. Three things are timed, each the best of several runs:
+
+    index:      building the PatientList of the previous patients
+    reconcile:  matching the TrakCare patients against the list and merging them in
+    snapshot:   comparing two snapshots of the same patients, as SnapshotDiff does
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import time
+
+os.environ.setdefault("TESTING", "true")
+os.environ.setdefault("LIST_ROOT_DIR", tempfile.mkdtemp(prefix="plg-bench-"))
+
+
+def make_patients(n_patients: int, churn: float):
+    """Return (previous list patients, current TrakCare patients)."""
+    from src.shared_enums import Consultant, Ward
+    from src.shared_models import Patient
+
+    n_changed = int(n_patients * churn)
+    previous = []
+    for i in range(n_patients):
+        # a tenth of the patients were written on the list with only their reg number
+        patient = Patient(f"{1000000 + i}" if i % 10 == 0 else f"{4000000000 + i}")
+        patient.jobs = "Chase CXR"
+        previous.append(patient)
+
+    current = []
+    for i in range(n_changed, n_patients + n_changed):
+        current.append(
+            Patient.from_record(
+                {
+                    "reg_number": f"{1000000 + i}",
+                    "_nhs_number": f"{4000000000 + i}",
+                    "surname": f"Smith{i}",
+                    "dob": datetime.date(1956, 5, 14),
+                    "ward": Ward.CAPENER,
+                    "room": f"Bay {i // 6 % 12 + 1:02} CA",
+                    "_bed": f"Bed{'ABCDEF'[i % 6]}",
+                    "consultant": Consultant.ALISON_MOODY,
+                }
+            )
+        )
+    return previous, current
+
+
+def best_of(repeat: int, fn) -> float:
+    """Return the shortest time in milliseconds of 'repeat' calls to 'fn'."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def bench(n_patients: int, churn: float, repeat: int) -> dict:
+    from src.list_generator.models import PatientList
+    from src.list_generator.snapshot import SnapshotDiff, SnapshotRow
+    from src.shared_enums import Ward
+
+    previous, current = make_patients(n_patients, churn)
+
+    def index():
+        patient_list = PatientList(home_ward=Ward.CAPENER)
+        patient_list.extend(previous)
+        return patient_list
+
+    patient_list = index()
+
+    def reconcile():
+        reconciliation = patient_list.reconcile(current)
+        for trakcare_patient, list_patient in reconciliation.continuing:
+            trakcare_patient.merge(list_patient)
+        return reconciliation
+
+    reconciliation = reconcile()
+
+    previous_rows = {
+        patient.reg_number: SnapshotRow.from_patient(patient)
+        for patient in current[: n_patients - int(n_patients * churn)]
+    }
+    current_rows = {patient.reg_number: SnapshotRow.from_patient(patient) for patient in current}
+
+    return {
+        "patients": n_patients,
+        "continuing": len(reconciliation.continuing),
+        "new": len(reconciliation.new),
+        "discharged": len(reconciliation.discharged),
+        "index_ms": best_of(repeat, index),
+        "reconcile_ms": best_of(repeat, reconcile),
+        "snapshot_ms": best_of(repeat, lambda: SnapshotDiff(previous_rows, current_rows)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--churn", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'patients':>9} {'continuing':>10} {'new':>6} {'discharged':>10} "
+        f"{'index':>10} {'reconcile':>10} {'snapshot':>10}"
+    )
+    for n_patients in args.patients:
+        result = bench(n_patients, args.churn, args.repeat)
+        print(
+            f"{result['patients']:>9} {result['continuing']:>10} {result['new']:>6} "
+            f"{result['discharged']:>10} {result['index_ms']:>8.1f}ms "
+            f"{result['reconcile_ms']:>8.1f}ms {result['snapshot_ms']:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
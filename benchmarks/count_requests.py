@@ -0,0 +1,82 @@
+"""Count the requests to the server made by a typical session on the Generate List page.
+
+Usage:
+    python -m benchmarks.count_requests
+
+Each server-side Dash callback which fires is one HTTP request, whilst clientside callbacks
+run in the browser. Rather than drive a browser, this walks the app's callback graph the
+way the Dash renderer does: a change to a property fires every callback downstream of it,
+each once, after the callbacks it depends on. Every callback fires once when the page is
+first rendered. It assumes every callback updates all of its outputs, so is an upper bound.
+
+The session is: open the page, select a team, upload a list, delete it, upload it again,
+then click "Generate List".
+"""
+import os
+import tempfile
+
+os.environ.setdefault("TESTING", "true")
+os.environ.setdefault("LIST_ROOT_DIR", tempfile.mkdtemp(prefix="plg-bench-"))
+
+SESSION = [
+    ("open the page", None),
+    ("select a team", {"select-team-input.value"}),
+    ("upload a list", {"upload-previous-list-button.contents"}),
+    ("delete the upload", {"delete-uploaded-file-button.n_clicks"}),
+    ("upload it again", {"upload-previous-list-button.contents"}),
+    ("click Generate List", {"generate-list-button.n_clicks"}),
+]
+
+
+def parse_outputs(output: str) -> set:
+    """Return the "id.property" outputs of a callback, as given in Dash's callback list."""
+    if output.startswith(".."):
+        return {part for part in output.strip(".").split("...")}
+    return {output}
+
+
+def fire(callbacks, changed: set) -> tuple:
+    """Return the number of (server, clientside) callbacks fired by the changed properties."""
+    fired = []
+    while changed:
+        downstream = [
+            callback
+            for callback in callbacks
+            if callback not in fired
+            and {f"{i['id']}.{i['property']}" for i in callback["inputs"]} & changed
+        ]
+        fired.extend(downstream)
+        changed = set().union(*(parse_outputs(callback["output"]) for callback in downstream))
+
+    clientside = sum(1 for callback in fired if callback["clientside_function"])
+    return len(fired) - clientside, clientside
+
+
+def main():
+    from src.front_end import app
+    from src.front_end.pages.generate_list import GENERATE_LIST_LAYOUT
+
+    page_ids = set()
+    for component in GENERATE_LIST_LAYOUT:
+        page_ids |= {getattr(child, "id", None) for child in component._traverse()}
+
+    callbacks = [
+        callback
+        for callback in app._callback_list
+        if any(i["id"] in page_ids for i in callback["inputs"])
+    ]
+
+    total_server = total_clientside = 0
+    for action, changed in SESSION:
+        if changed is None:
+            # every callback on a page fires when it is first rendered
+            changed = {f"{i['id']}.{i['property']}" for c in callbacks for i in c["inputs"]}
+        server, clientside = fire(callbacks, changed)
+        total_server += server
+        total_clientside += clientside
+        print(f"{action:<22} {server:>3} requests {clientside:>3} clientside")
+    print(f"{'total':<22} {total_server:>3} requests {total_clientside:>3} clientside")
+
+
+if __name__ == "__main__":
+    main()
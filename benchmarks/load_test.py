@@ -0,0 +1,87 @@
+"""Simulate many people clicking "Generate" at the same time against a running server.
+
+Usage:
+    python -m benchmarks.load_test --team respiratory --list "14-04-2020_respiratory.docx"
+
+Each simulated click is the same request that the browser sends to Dash when the Generate
+button is pressed, using the auto-detected previous list. Start the server (e.g. with
+PRODUCTION=true python run.py) and make sure the list exists before running this.
+"""
+import argparse
+import json
+import math
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def build_payload(team: str, list_name: str, n_clicks: int) -> bytes:
+    payload = {
+        "output": "list-generation-status.children",
+        "outputs": {"id": "list-generation-status", "property": "children"},
+        "inputs": [
+            {"id": "generate-list-button", "property": "n_clicks", "value": n_clicks},
+            {"id": "select-team-input", "property": "value", "value": team},
+            {"id": "temp-upload-store", "property": "data", "value": None},
+        ],
+        "state": [
+            {"id": "previous-list-detected-name", "property": "value", "value": list_name},
+            {"id": "force-regenerate-checkbox", "property": "value", "value": []},
+        ],
+        "changedPropIds": ["generate-list-button.n_clicks"],
+    }
+    return json.dumps(payload).encode()
+
+
+def click_generate(url: str, payload: bytes) -> tuple:
+    """Send one Generate click, returning (latency in ms, the status text shown to the user)."""
+    request = urllib.request.Request(
+        url, data=payload, headers={"Content-Type": "application/json"}, method="POST"
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=300) as response:
+        body = json.loads(response.read())
+    latency = (time.perf_counter() - start) * 1000
+    status = body["response"]["list-generation-status"]["children"]
+    # a successful generation shows the status text followed by download and export links
+    return latency, status[0] if isinstance(status, list) else status
+
+
+def percentile(latencies: list, pct: int) -> float:
+    """Return the nearest-rank percentile of the latencies."""
+    ordered = sorted(latencies)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--team", required=True, help="The team name, as shown in the dropdown")
+    parser.add_argument("--list", required=True, help="The filename of the previous list")
+    parser.add_argument("--clicks", type=int, default=30, help="The number of concurrent clicks")
+    args = parser.parse_args(argv)
+
+    url = f"{args.url.rstrip('/')}/_dash-update-component"
+    payloads = [build_payload(args.team, args.list, i + 1) for i in range(args.clicks)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clicks) as executor:
+        results = list(executor.map(lambda payload: click_generate(url, payload), payloads))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _ in results]
+    failures = [status for _, status in results if not status.startswith("List generated")]
+
+    print(f"{args.clicks} concurrent clicks completed in {elapsed:.2f} s")
+    print(f"p50: {percentile(latencies, 50):.0f} ms")
+    print(f"p95: {percentile(latencies, 95):.0f} ms")
+    print(f"max: {max(latencies):.0f} ms")
+    print(f"failures: {len(failures)}")
+    for status in set(failures):
+        print(f"    {status}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
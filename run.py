@@ -1,4 +1,8 @@
-from src.front_end import run_server
+from src import settings
+from src.front_end import run_production_server, run_server
 
 if __name__ == "__main__":
-    run_server()
+    if settings.PRODUCTION:
+        run_production_server()
+    else:
+        run_server()
@@ -0,0 +1,114 @@
+"""The SQLAlchemy engine, session and model base class.
+
+This module deliberately has no dependency on the Dash app, so that the models, the
+list generator and the command line interface can all be used without building it.
+"""
+import logging
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from . import settings, utils
+
+logger = logging.getLogger()
+
+
+class TimedQueuePool(QueuePool):
+    """A QueuePool which logs how long it takes to check out each connection.
+
+    The time includes waiting for a free connection, opening a new one if required
+    and the pre-ping, so it reflects the full cost a request pays before its first query.
+    """
+
+    def _timed_checkout(self, checkout):
+        start = time.perf_counter()
+        connection = checkout()
+        logger.debug(
+            "Database connection checked out in %.1f ms (%s)",
+            (time.perf_counter() - start) * 1000,
+            self.status(),
+        )
+        return connection
+
+    def connect(self):
+        return self._timed_checkout(super().connect)
+
+    def unique_connection(self):
+        # used by Engine.connect(), and therefore by every Session
+        return self._timed_checkout(super().unique_connection)
+
+
+def _engine_options() -> dict:
+    if settings.TESTING:
+        # an in-memory SQLite database only lives as long as its connection, so the
+        # same connection must be shared between every thread
+        return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+
+    url = make_url(settings.DB_URL)
+    if url.get_backend_name() == "sqlite":
+        # SQLite is only used for local development, so keep SQLAlchemy's defaults
+        return {}
+
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_driver_name() == "pyodbc":
+        options["fast_executemany"] = settings.DB_FAST_EXECUTEMANY
+        options["connect_args"] = {"autocommit": settings.DB_AUTOCOMMIT}
+    return options
+
+
+engine = create_engine(settings.DB_URL, **_engine_options())
+
+# a thread-local session; the web app removes it at the end of each request
+session = scoped_session(sessionmaker(bind=engine))
+
+Base = declarative_base()
+Base.query = session.query_property()
+
+
+def init_db() -> None:
+    """Create all of the tables. Only used to set up the in-memory testing database."""
+    from . import shared_models  # noqa
+
+    Base.metadata.create_all(engine)
+
+
+def warm_up(n_connections: int = None) -> None:
+    """Open and validate a number of pooled connections ahead of the first request.
+
+    The connections are all checked out at the same time so that the pool really holds
+    that many open connections afterwards. Failure is logged rather than raised; the
+    pool will simply try again when the first request needs a connection.
+    """
+    if n_connections is None:
+        n_connections = settings.DB_WARM_UP_CONNECTIONS
+
+    start = time.perf_counter()
+    connections = []
+    try:
+        for _ in range(n_connections):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning("Unable to warm up the database connection pool: %r", e)
+    else:
+        logger.info(
+            "Warmed up %d database %s in %.1f ms",
+            n_connections,
+            utils.pluralise("connection", n_connections),
+            (time.perf_counter() - start) * 1000,
+        )
+    finally:
+        for connection in connections:
+            connection.close()
@@ -1,6 +1,12 @@
-from .. import settings
+import os
+
+from .. import database, settings
+from ..list_generator import prewarm
+from . import api, downloads  # noqa
 from .app import app
+from .pages.archive import callbacks as archive_callbacks  # noqa
 from .pages.base import BASE_LAYOUT
+from .pages.census import callbacks as census_callbacks  # noqa
 from .pages.generate_list import callbacks  # noqa
 
 app.layout = BASE_LAYOUT
@@ -13,4 +19,61 @@ def run_server():
         settings.PORT,
         "on" if settings.DEBUG else "off",
     )
+    # open the database connections now, rather than when the first user clicks "Generate"
+    database.warm_up()
+    # with the reloader on, only start prewarming in the child process which serves requests
+    if not settings.DEBUG or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        prewarm.start_scheduler()
     app.run_server(debug=settings.DEBUG, host=settings.HOST, port=settings.PORT)
+
+
+def run_production_server():
+    """Serve the app with several worker processes, each serving several threads.
+
+    Gunicorn is used where it is available. It doesn't run on Windows, so Waitress is used
+    there instead, which serves every thread from a single process.
+    """
+    app.logger.info(
+        "Starting production server at host %s running on port %d with %d workers of %d threads",
+        settings.HOST,
+        settings.PORT,
+        settings.WORKERS,
+        settings.THREADS,
+    )
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        import waitress
+
+        database.warm_up()
+        prewarm.start_scheduler()
+        waitress.serve(
+            app.server,
+            host=settings.HOST,
+            port=settings.PORT,
+            threads=settings.WORKERS * settings.THREADS,
+        )
+        return
+
+    def post_fork(server, worker):
+        # connections can't be shared across a fork, so each worker opens its own
+        database.engine.dispose()
+        database.warm_up()
+        # each worker keeps its own cache of parsed lists, so each prewarms its own
+        prewarm.start_scheduler()
+
+    class Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{settings.HOST}:{settings.PORT}")
+            self.cfg.set("workers", settings.WORKERS)
+            self.cfg.set("threads", settings.THREADS)
+            self.cfg.set("worker_class", "gthread")
+            # generating a list can take a while when TrakCare is busy
+            self.cfg.set("timeout", 120)
+            self.cfg.set("post_fork", post_fork)
+
+        def load(self):
+            return app.server
+
+    Application().run()
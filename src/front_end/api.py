@@ -0,0 +1,118 @@
+"""A read-only JSON API of the current patients of each team and ward, for other systems.
+
+    /api/teams/<team>/patients, e.g. /api/teams/respiratory/patients
+    /api/wards/<ward>/patients, e.g. /api/wards/tarka/patients
+
+The patients are loaded from the local TrakCare snapshot and the latest generated lists
+(see list_generator/current.py) at most once every API_CACHE_SECONDS per process, and the
+responses built from them are kept until then, so however often the API is polled, it
+never queries a database per request. Each response has an ETag and a Last-Modified time,
+so a client polling for changes is answered with an empty 304 until there are some, and
+is gzipped by Flask-Compress, which Dash already uses.
+"""
+import datetime
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from flask import Response, abort, request
+
+from .. import settings
+from ..list_generator import current
+from ..shared_enums import Team, Ward
+from .app import server
+
+logger = logging.getLogger()
+
+
+class ResponseCache:
+    """The current patients, reloaded every 'ttl' seconds at most, and the responses made from them.
+
+    Args:
+        ttl (float): How long to keep the patients for before loading them again.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._last_modified = None
+        self._expires_at = 0
+        self._patients = []
+        # a mapping of {key: (JSON body, ETag, last modified)}, emptied on reloading the patients
+        self._responses = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, select) -> tuple:
+        """Return the (JSON body, ETag, last modified) of the patients picked out by 'select'.
+
+        Args:
+            key (str): Identifies the response, e.g. "team:Respiratory".
+            select (function): Given a patient, returns whether they belong in the response.
+        """
+        with self._lock:
+            if time.monotonic() >= self._expires_at:
+                self._patients, self._last_modified = current.load()
+                self._responses = {}
+                self._expires_at = time.monotonic() + self.ttl
+
+            if key not in self._responses:
+                body = json.dumps(
+                    {
+                        "updated_at": self._last_modified.isoformat(timespec="seconds")
+                        if self._last_modified
+                        else None,
+                        "patients": [patient for patient in self._patients if select(patient)],
+                    },
+                    separators=(",", ":"),
+                ).encode()
+                etag = hashlib.sha256(body).hexdigest()[:32]
+                self._responses[key] = (body, etag, self._last_modified)
+            return self._responses[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expires_at = 0
+            self._responses = {}
+
+
+cache = ResponseCache(ttl=settings.API_CACHE_SECONDS)
+
+
+def _respond(key, select) -> Response:
+    body, etag, last_modified = cache.get(key, select)
+    response = Response(body, mimetype="application/json")
+    # weak, as Flask-Compress would otherwise change the ETag of a gzipped response, so
+    # that the 304 could only be worked out after compressing the body again
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified.astimezone(datetime.timezone.utc)
+    # polling clients may keep the response, so long as they check it is still current
+    response.cache_control.no_cache = True
+    response.cache_control.private = True
+    return response.make_conditional(request)
+
+
+@server.route("/api/teams/<team_name>/patients")
+def team_patients(team_name):
+    """Return the current patients of the team, e.g. "respiratory"."""
+    try:
+        team = Team.from_team_name(team_name)
+    except ValueError:
+        abort(404)
+
+    name = team.name.value
+    return _respond(f"team:{name}", lambda patient: patient["team"] == name)
+
+
+@server.route("/api/wards/<ward_name>/patients")
+def ward_patients(ward_name):
+    """Return the current patients on the ward, given by its name, e.g. "caroline_thorpe"."""
+    ward = next(
+        (ward for ward in Ward if ward_name.lower() in (ward.name.lower(), ward.value.lower())),
+        None,
+    )
+    if ward is None:
+        abort(404)
+
+    return _respond(f"ward:{ward.value}", lambda patient: patient["ward"] == ward.value)
@@ -1,8 +1,7 @@
 import dash
 import dash_bootstrap_components as dbc
-from flask_sqlalchemy import SQLAlchemy
 
-from .. import settings, utils
+from .. import database, settings, utils
 
 app = dash.Dash(
     __name__, suppress_callback_exceptions=True, external_stylesheets=[dbc.themes.FLATLY],
@@ -11,13 +10,14 @@ app = dash.Dash(
 utils.init_logging(app)
 
 server = app.server
-server.config["SQLALCHEMY_DATABASE_URI"] = settings.DB_URL
-server.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
-db = SQLAlchemy(server)
+
+@server.teardown_appcontext
+def remove_db_session(exception=None):
+    """Return each request's database session to the pool once the request is finished."""
+    database.session.remove()
+
 
 # set up the test database
 if settings.TESTING:
-    from .. import shared_models  # noqa
-
-    db.create_all()
+    database.init_db()
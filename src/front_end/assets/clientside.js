@@ -0,0 +1,33 @@
+/* Callbacks which only enable, disable or fill in parts of a page, and so are run in the
+   browser rather than with a round trip to the server. They are registered with
+   app.clientside_callback alongside the server callbacks of each page. */
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    generate_list: {
+        /* enable the Upload button once a team has been selected */
+        initialise_file_upload_stage: function(selectedTeam) {
+            return !selectedTeam;
+        },
+
+        /* enable the Generate List button once a previous list has been found or uploaded */
+        initialise_generate_list_stage: function(previousListName, uploadedFileData) {
+            return !(previousListName || (uploadedFileData && uploadedFileData.upload_id));
+        },
+
+        /* empty the Upload button when the uploaded file is deleted */
+        clear_upload_contents: function(nClicks) {
+            if (!nClicks) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            return "";
+        },
+
+        /* show the name of the uploaded file, and the button to delete it */
+        set_uploaded_file_info: function(uploadedFileData) {
+            if (uploadedFileData && uploadedFileData.filename) {
+                return [uploadedFileData.filename, {display: "inline-block"}];
+            }
+            return ["", {display: "none"}];
+        },
+    },
+});
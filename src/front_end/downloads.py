@@ -0,0 +1,109 @@
+"""Serve generated lists straight to the browser.
+
+Once a list has been generated, a download link is registered for it in the shared store
+and shown to the user, so they don't have to find the list on the share and read it over
+the network again. The list is streamed from its local copy where it is up to date (see
+list_generator.prewarm), with an ETag, so that a repeat download of an unchanged list is
+answered with a 304, and ranges, so that an interrupted download can be resumed.
+
+The same link also gives a print view and exports of the list, rendered from its saved
+preview rows without opening the Word document; see list_generator/renderers.py.
+"""
+import json
+import logging
+import secrets
+from pathlib import Path
+
+from flask import Response, abort, send_file
+
+from .. import settings
+from ..list_generator import prewarm, preview
+from ..list_generator.renderers import EXPORTERS, HtmlRenderer, render
+from ..list_generator.rows import Row
+from ..store import store
+from .app import server
+
+logger = logging.getLogger()
+
+
+def register(path: Path) -> str:
+    """Make the list at the given path available to download, returning its download key.
+
+    The key is random, so a list can only be downloaded by someone who has been shown its
+    link. Registering a list again whilst its key is still valid gives the same key, so
+    links already shown keep working, and keeps it valid for another DOWNLOAD_SECONDS.
+    """
+    key = store.get("download_keys", str(path))
+    if key is None or store.get("downloads", key.decode()) is None:
+        key = secrets.token_urlsafe().encode()
+    store.set("downloads", key.decode(), str(path).encode(), ttl=settings.DOWNLOAD_SECONDS)
+    store.set("download_keys", str(path), key, ttl=settings.DOWNLOAD_SECONDS)
+    return key.decode()
+
+
+def _registered_path(key) -> Path:
+    path = store.get("downloads", key)
+    if path is None:
+        abort(404)
+    return Path(path.decode())
+
+
+def _registered_rows(key):
+    """Return the path and Rows of the list registered against the key."""
+    path = _registered_path(key)
+    rows = preview.read(path)
+    if rows is None:
+        abort(404)
+    return path, [Row.from_dict(row) for row in rows]
+
+
+@server.route("/download/<key>")
+def download(key):
+    """Stream the list registered against the key as an attachment."""
+    path = _registered_path(key)
+    file_path = prewarm.local_copy(path)
+    if not file_path.exists():
+        abort(404)
+
+    logger.debug("Serving %s from %s", path.name, file_path)
+    # a conditional response compares the request's If-None-Match and Range headers with
+    # the file's ETag and length, answering with a 304 or 206 where it can
+    response = send_file(
+        str(file_path),
+        mimetype="application/vnd.ms-word.document.macroEnabled.12"
+        if path.suffix == ".docm"
+        else "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        as_attachment=True,
+        attachment_filename=path.name,
+        conditional=True,
+        cache_timeout=0,
+    )
+    # let the browser keep the list, so long as it checks whether it has changed first
+    response.cache_control.private = True
+    response.cache_control.public = False
+    return response
+
+
+@server.route("/print/<key>")
+def print_view(key):
+    """Show the list registered against the key as a web page, for printing."""
+    path, rows = _registered_rows(key)
+    (page,) = render(rows, [HtmlRenderer(title=path.stem)])
+    return Response(page, mimetype="text/html")
+
+
+@server.route("/export/<key>.<extension>")
+def export(key, extension):
+    """Return the list registered against the key in another format, as an attachment."""
+    if extension not in EXPORTERS:
+        abort(404)
+
+    path, rows = _registered_rows(key)
+    (exported,) = render(rows, [EXPORTERS[extension]()])
+    if extension == "json":
+        exported = json.dumps(exported)
+    return Response(
+        exported,
+        mimetype="text/csv" if extension == "csv" else "application/json",
+        headers={"Content-Disposition": f"attachment; filename={path.stem}.{extension}"},
+    )
@@ -1,2 +1,4 @@
+from .archive import ARCHIVE_LAYOUT  # noqa
 from .base import BASE_LAYOUT  # noqa
+from .census import CENSUS_LAYOUT  # noqa
 from .generate_list import GENERATE_LIST_LAYOUT  # noqa
@@ -0,0 +1,11 @@
+import dash_bootstrap_components as dbc
+
+from . import components
+
+ARCHIVE_LAYOUT = [
+    dbc.Row(
+        dbc.Col(
+            dbc.Card([components.make_search_stage(), components.make_results_table()], body=True,),
+        )
+    )
+]
@@ -0,0 +1,57 @@
+import datetime
+import logging
+import time
+from pathlib import Path
+
+from dash.dependencies import Input, Output
+
+from .... import utils
+from ....list_generator import archive
+from ....shared_enums import Team
+from ... import downloads
+from ...app import app
+from ..enums import Element as El
+
+logger = logging.getLogger()
+
+
+def _format_entry(entry, download_keys):
+    """Return an entry from the archive index as a row of the results table."""
+    nhs_number = entry["nhs_number"]
+    download_path = app.get_relative_path(f"/download/{download_keys[entry['path']]}")
+    return {
+        **{key: value for key, value in entry.items() if key != "path"},
+        "date": f"{datetime.date.fromisoformat(entry['date']):%d/%m/%Y}",
+        "nhs_number": f"{nhs_number[:3]} {nhs_number[3:6]} {nhs_number[6:]}".strip(),
+        "dob": f"{datetime.date.fromisoformat(entry['dob']):%d/%m/%Y}" if entry["dob"] else "",
+        "list": f"[Download]({download_path})",
+    }
+
+
+@app.callback(
+    [
+        Output(El.ARCHIVE_RESULTS_TEXT.value, "children"),
+        Output(El.ARCHIVE_RESULTS_TABLE.value, "data"),
+    ],
+    [Input(El.ARCHIVE_SEARCH_INPUT.value, "value"), Input(El.ARCHIVE_TEAM_INPUT.value, "value")],
+)
+@utils.log_callback
+def search_archive(query, team_name):
+    """Search the archive index of old lists, most recent first."""
+    if not query or not query.strip():
+        return "", []
+
+    team = Team.from_team_name(team_name) if team_name else None
+    start = time.perf_counter()
+    entries = archive.ArchiveIndex().search(query, team=team)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    # each list is usually found several times over, so only register it for download once
+    download_keys = {
+        path: downloads.register(Path(path)) for path in {entry["path"] for entry in entries}
+    }
+
+    text = f"{len(entries)} {utils.pluralise('result', len(entries))} in {elapsed:.0f} ms"
+    if len(entries) == archive.SEARCH_LIMIT:
+        text += f"; only the most recent {archive.SEARCH_LIMIT} are shown"
+    return text, [_format_entry(entry, download_keys) for entry in entries]
@@ -0,0 +1,69 @@
+import dash_bootstrap_components as dbc
+import dash_html_components as html
+import dash_table
+
+from ....shared_enums import Team
+from ..census.components import TABLE_STYLE
+from ..enums import Element as El
+
+
+def make_search_stage():
+    team_options = [{"label": "All teams", "value": ""}] + [
+        {"label": team.value.name.value, "value": team.value.name.value} for team in Team
+    ]
+
+    return html.Div(
+        [
+            html.P("Search old lists", className="form-label"),
+            dbc.Row(
+                [
+                    dbc.Col(
+                        dbc.Input(
+                            id=El.ARCHIVE_SEARCH_INPUT.value,
+                            type="search",
+                            placeholder="NHS number, reg number, surname or anything on the list",
+                            debounce=True,
+                        )
+                    ),
+                    dbc.Col(
+                        dbc.Select(id=El.ARCHIVE_TEAM_INPUT.value, options=team_options, value=""),
+                        width=3,
+                    ),
+                ],
+                className="stage-content",
+            ),
+        ],
+        className="form-stage-div",
+    )
+
+
+def make_results_table():
+    return html.Div(
+        [
+            html.P(id=El.ARCHIVE_RESULTS_TEXT.value, className="archive-results-text"),
+            dash_table.DataTable(
+                id=El.ARCHIVE_RESULTS_TABLE.value,
+                columns=[
+                    {"name": "Date", "id": "date"},
+                    {"name": "Team", "id": "team"},
+                    {"name": "NHS number", "id": "nhs_number"},
+                    {"name": "Reg number", "id": "reg_number"},
+                    {"name": "Surname", "id": "surname"},
+                    {"name": "DOB", "id": "dob"},
+                    {"name": "Issues", "id": "issues"},
+                    {"name": "Progress", "id": "progress"},
+                    {"name": "Jobs", "id": "jobs"},
+                    {"name": "EDD", "id": "edd"},
+                    {"name": "TTA/DS", "id": "tta_ds"},
+                    {"name": "Bloods", "id": "bloods"},
+                    {"name": "List", "id": "list", "presentation": "markdown"},
+                ],
+                data=[],
+                page_size=25,
+                # the issues to bloods columns can be long, so wrap them
+                style_data={"whiteSpace": "normal", "height": "auto"},
+                **TABLE_STYLE,
+            ),
+        ],
+        className="form-stage-div",
+    )
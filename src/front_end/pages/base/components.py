@@ -22,7 +22,11 @@ def make_navigation_bar():
             dbc.Col(),
             dbc.Col(
                 dbc.Tabs(
-                    [dbc.Tab(label="Generate List", tab_id=El.GENERATE_LIST_TAB.value)],
+                    [
+                        dbc.Tab(label="Generate List", tab_id=El.GENERATE_LIST_TAB.value),
+                        dbc.Tab(label="Census", tab_id=El.CENSUS_TAB.value),
+                        dbc.Tab(label="Archive", tab_id=El.ARCHIVE_TAB.value),
+                    ],
                     id=El.NAV_TABS.value,
                     active_tab=El.GENERATE_LIST_TAB.value,
                     persistence=True,
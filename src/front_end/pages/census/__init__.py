@@ -0,0 +1,29 @@
+import dash_bootstrap_components as dbc
+import dash_core_components as dcc
+import dash_html_components as html
+
+from .... import settings
+from ..enums import Element as El
+from . import components
+
+CENSUS_LAYOUT = [
+    dbc.Row(
+        dbc.Col(
+            dbc.Card(
+                [
+                    html.P(id=El.CENSUS_UPDATED_TEXT.value, className="census-updated-text"),
+                    components.make_teams_table(),
+                    components.make_length_of_stay_graph(),
+                    components.make_wards_table(),
+                    # the figures are cached for CENSUS_CACHE_SECONDS, so refreshing more
+                    # often than that wouldn't show anything new
+                    dcc.Interval(
+                        id=El.CENSUS_REFRESH_INTERVAL.value,
+                        interval=settings.CENSUS_CACHE_SECONDS * 1000,
+                    ),
+                ],
+                body=True,
+            ),
+        )
+    )
+]
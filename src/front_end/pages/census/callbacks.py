@@ -0,0 +1,35 @@
+import datetime
+import logging
+
+from dash.dependencies import Input, Output
+
+from .... import utils
+from ....list_generator import census
+from ...app import app
+from ..enums import Element as El
+from . import components
+
+logger = logging.getLogger()
+
+
+@app.callback(
+    [
+        Output(El.CENSUS_UPDATED_TEXT.value, "children"),
+        Output(El.CENSUS_TEAMS_TABLE.value, "data"),
+        Output(El.CENSUS_WARDS_TABLE.value, "data"),
+        Output(El.CENSUS_LENGTH_OF_STAY_GRAPH.value, "figure"),
+    ],
+    [Input(El.CENSUS_REFRESH_INTERVAL.value, "n_intervals")],
+)
+@utils.log_callback
+def update_census(n_intervals):
+    """Populate the census page from the cached census figures."""
+    figures = census.get_census()
+    as_of = datetime.datetime.fromisoformat(figures["as_of"])
+
+    return (
+        f"Figures from TrakCare as of {as_of:%H:%M:%S %d/%m/%Y}",
+        figures["teams"],
+        figures["wards"],
+        components.make_length_of_stay_figure(figures),
+    )
@@ -0,0 +1,82 @@
+import dash_core_components as dcc
+import dash_html_components as html
+import dash_table
+
+from ..enums import Element as El
+
+TABLE_STYLE = {
+    "style_cell": {"fontFamily": "inherit", "padding": "5px", "textAlign": "left"},
+    "style_header": {"fontWeight": "bold"},
+    "style_as_list_view": True,
+}
+
+
+def make_teams_table():
+    return html.Div(
+        [
+            html.P("Patients per team", className="form-label"),
+            dash_table.DataTable(
+                id=El.CENSUS_TEAMS_TABLE.value,
+                columns=[
+                    {"name": "Team", "id": "team"},
+                    {"name": "Home ward", "id": "home_ward"},
+                    {"name": "Patients", "id": "patients"},
+                    {"name": "Outliers", "id": "outliers"},
+                    {"name": "Outlier wards", "id": "outlier_wards"},
+                    {"name": "Median length of stay (days)", "id": "median_length_of_stay"},
+                ],
+                sort_action="native",
+                **TABLE_STYLE,
+            ),
+        ],
+        className="form-stage-div",
+    )
+
+
+def make_length_of_stay_graph():
+    return html.Div(
+        [
+            html.P("Length of stay", className="form-label"),
+            dcc.Graph(id=El.CENSUS_LENGTH_OF_STAY_GRAPH.value, config={"displayModeBar": False}),
+        ],
+        className="form-stage-div",
+    )
+
+
+def make_wards_table():
+    return html.Div(
+        [
+            html.P("Patients per team and ward", className="form-label"),
+            dash_table.DataTable(
+                id=El.CENSUS_WARDS_TABLE.value,
+                columns=[
+                    {"name": "Team", "id": "team"},
+                    {"name": "Ward", "id": "ward"},
+                    {"name": "Patients", "id": "patients"},
+                    {"name": "Outliers", "id": "outliers"},
+                ],
+                filter_action="native",
+                sort_action="native",
+                style_data_conditional=[
+                    {"if": {"filter_query": "{outliers} > 0"}, "backgroundColor": "#fdf2e9"}
+                ],
+                **TABLE_STYLE,
+            ),
+        ],
+        className="form-stage-div",
+    )
+
+
+def make_length_of_stay_figure(census):
+    """Return a stacked bar chart of the number of patients per length of stay, per team."""
+    return {
+        "data": [
+            {"type": "bar", "name": team, "x": census["length_of_stay_buckets"], "y": counts}
+            for team, counts in census["length_of_stay"].items()
+        ],
+        "layout": {
+            "barmode": "stack",
+            "margin": {"t": 10, "b": 40, "l": 40, "r": 10},
+            "yaxis": {"title": "Patients"},
+        },
+    }
@@ -5,6 +5,8 @@ class Element(Enum):
     # navigation tabs
     NAV_TABS = "nav-tabs"
     GENERATE_LIST_TAB = "generate-list-tab"
+    CENSUS_TAB = "census-tab"
+    ARCHIVE_TAB = "archive-tab"
 
     # page content
     PAGE_CONTENT = "page-content"
@@ -16,6 +18,20 @@ class Element(Enum):
     UPLOADED_FILE_TEXT = "uploaded-file-text"
     DELETE_UPLOADED_FILE_BUTTON = "delete-uploaded-file-button"
     GENERATE_LIST_BUTTON = "generate-list-button"
+    FORCE_REGENERATE_CHECKBOX = "force-regenerate-checkbox"
     PREVIOUS_LIST_NAME = "previous-list-detected-name"
     LIST_GENERATION_STATUS = "list-generation-status"
     TEMP_UPLOAD_STORE = "temp-upload-store"
+
+    # census tab
+    CENSUS_REFRESH_INTERVAL = "census-refresh-interval"
+    CENSUS_UPDATED_TEXT = "census-updated-text"
+    CENSUS_TEAMS_TABLE = "census-teams-table"
+    CENSUS_WARDS_TABLE = "census-wards-table"
+    CENSUS_LENGTH_OF_STAY_GRAPH = "census-length-of-stay-graph"
+
+    # archive tab
+    ARCHIVE_SEARCH_INPUT = "archive-search-input"
+    ARCHIVE_TEAM_INPUT = "archive-team-input"
+    ARCHIVE_RESULTS_TEXT = "archive-results-text"
+    ARCHIVE_RESULTS_TABLE = "archive-results-table"
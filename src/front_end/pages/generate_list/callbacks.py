@@ -1,20 +1,23 @@
 import base64
 import datetime
+import hashlib
 import io
 import logging
 from pathlib import Path
 
 import dash
 import dash_html_components as html
-from dash.dependencies import Input, Output, State
+from dash.dependencies import ClientsideFunction, Input, Output, State
 from dash.exceptions import PreventUpdate
 
-from .... import utils
-from ....list_generator import generate_list
+from .... import list_generator, settings, utils
+from ....list_generator import prewarm, preview
 from ....shared_enums import Team
-from ... import pages
+from ....store import store
+from ... import downloads, pages
 from ...app import app
 from ...pages.enums import Element as El
+from . import components
 
 logger = logging.getLogger()
 
@@ -28,18 +31,42 @@ def switch_tab(active_tab):
     if selected_tab == El.GENERATE_LIST_TAB:
         app.logger.debug("Creating the List Generation page")
         return pages.GENERATE_LIST_LAYOUT
-
-
-@app.callback(
+    elif selected_tab == El.CENSUS_TAB:
+        app.logger.debug("Creating the Census page")
+        return pages.CENSUS_LAYOUT
+    elif selected_tab == El.ARCHIVE_TAB:
+        app.logger.debug("Creating the Archive page")
+        return pages.ARCHIVE_LAYOUT
+
+
+# the callbacks which only toggle parts of the page are run in the browser; see
+# assets/clientside.js
+app.clientside_callback(
+    ClientsideFunction("generate_list", "initialise_file_upload_stage"),
     Output(El.UPLOAD_PREVIOUS_LIST_BUTTON.value, "disabled"),
     [Input(El.SELECT_TEAM_INPUT.value, "value")],
 )
-@utils.log_callback
-def initialise_file_upload_stage(selected_team):
-    """Handle enabling the upload button in the second stage, once the first stage is complete."""
-    if not selected_team:
-        return True
-    return False
+
+app.clientside_callback(
+    ClientsideFunction("generate_list", "initialise_generate_list_stage"),
+    Output(El.GENERATE_LIST_BUTTON.value, "disabled"),
+    [Input(El.PREVIOUS_LIST_NAME.value, "value"), Input(El.TEMP_UPLOAD_STORE.value, "data")],
+)
+
+app.clientside_callback(
+    ClientsideFunction("generate_list", "clear_upload_contents"),
+    Output(El.UPLOAD_PREVIOUS_LIST_BUTTON.value, "contents"),
+    [Input(El.DELETE_UPLOADED_FILE_BUTTON.value, "n_clicks")],
+)
+
+app.clientside_callback(
+    ClientsideFunction("generate_list", "set_uploaded_file_info"),
+    [
+        Output(El.UPLOADED_FILE_TEXT.value, "children"),
+        Output(El.DELETE_UPLOADED_FILE_BUTTON.value, "style"),
+    ],
+    [Input(El.TEMP_UPLOAD_STORE.value, "data")],
+)
 
 
 @app.callback(
@@ -60,25 +87,7 @@ def locate_previous_list(selected_team):
 
     # try and find the most recent handover list automatically. Do this by searching back up to
     # a week ago for a handover list identified by a specific filename format
-    today = datetime.date.today()
-    for n_days in range(1, 7):
-        previous_day = today - datetime.timedelta(days=n_days)
-        current_team_list_dir = utils.build_team_file_path(team, previous_day)
-
-        # make the folder first if it doesn't exist
-        current_team_list_dir.mkdir(parents=True, exist_ok=True)
-
-        previous_handover_list = None
-        for file in current_team_list_dir.iterdir():
-            if file.stem == utils.generate_file_stem(team, previous_day):
-                previous_handover_list = file
-
-        if previous_handover_list is not None:
-            # we've found the most recent handover list, so exit the loop
-            break
-    else:
-        # no previous handover list was found
-        previous_handover_list = None
+    previous_handover_list = prewarm.find_previous_list(team, datetime.date.today())
 
     if previous_handover_list is None:
         return html.P("No previous list detected; upload your own below"), ""
@@ -97,40 +106,6 @@ def locate_previous_list(selected_team):
     return list_found_text, previous_handover_list.name
 
 
-@app.callback(
-    Output(El.GENERATE_LIST_BUTTON.value, "disabled"),
-    [Input(El.PREVIOUS_LIST_NAME.value, "value"), Input(El.TEMP_UPLOAD_STORE.value, "data")],
-    [State(El.GENERATE_LIST_BUTTON.value, "disabled")],
-)
-@utils.log_callback
-def initialise_generate_list_stage(prev_list_name, uploaded_file_data, previous_disabled_state):
-    """Set the disabled attribute of the Generate List button depending on the state of the form."""
-    trigger = utils.parse_trigger(dash.callback_context)
-    if not trigger:
-        raise PreventUpdate
-
-    new_disabled_state = True
-
-    # enable the Generate List button either if we have found a previous handover list
-    # or if the user has uploaded a list
-    if prev_list_name or uploaded_file_data:
-        new_disabled_state = False
-
-    return new_disabled_state
-
-
-@app.callback(
-    Output(El.UPLOAD_PREVIOUS_LIST_BUTTON.value, "contents"),
-    [Input(El.DELETE_UPLOADED_FILE_BUTTON.value, "n_clicks")],
-)
-@utils.log_callback
-def clear_upload_contents(n_clicks):
-    """Handle emptying the contents of the Upload button."""
-    if n_clicks is None:
-        raise PreventUpdate
-    return ""
-
-
 @app.callback(
     Output(El.TEMP_UPLOAD_STORE.value, "data"),
     [
@@ -141,46 +116,29 @@ def clear_upload_contents(n_clicks):
 )
 @utils.log_callback
 def handle_list_upload(file_contents, n_clicks, filename):
-    """Parse the contents of the Upload button and save it to the Store."""
+    """Spool the contents of the Upload button to the shared store, and save its ID to the Store.
+
+    The file is kept server-side so that whichever worker process handles the "Generate"
+    click can read it, without the browser sending the whole file back again.
+    """
     trigger = utils.parse_trigger(dash.callback_context)
     if not trigger:
         raise PreventUpdate
 
-    if trigger == El.UPLOAD_PREVIOUS_LIST_BUTTON:
-        # get the file contents as a base64 encoded string and store it
+    if trigger == El.UPLOAD_PREVIOUS_LIST_BUTTON and file_contents:
+        # the file contents are given as a base64 encoded string
         _, content_string = file_contents.split(",")
+        contents = base64.b64decode(content_string)
+        upload_id = hashlib.sha256(contents).hexdigest()
+        store.set("uploads", upload_id, contents, ttl=settings.UPLOAD_SPOOL_SECONDS)
 
-        return {"contents": content_string, "filename": filename}
+        return {"upload_id": upload_id, "filename": filename}
     else:
-        # the trigger is the delete button, so set the store to be empty
+        # the trigger is the delete button (or the Upload button being emptied by it), so set
+        # the store to be empty
         return {}
 
 
-@app.callback(
-    [
-        Output(El.UPLOADED_FILE_TEXT.value, "children"),
-        Output(El.DELETE_UPLOADED_FILE_BUTTON.value, "style"),
-    ],
-    [
-        Input(El.TEMP_UPLOAD_STORE.value, "data"),
-        Input(El.DELETE_UPLOADED_FILE_BUTTON.value, "n_clicks"),
-    ],
-)
-@utils.log_callback
-def set_uploaded_file_info(uploaded_file_data, n_clicks):
-    """Handle displaying information about the uplaoded file."""
-    trigger = utils.parse_trigger(dash.callback_context)
-    if not trigger:
-        raise PreventUpdate
-
-    if trigger == El.TEMP_UPLOAD_STORE:
-        # a file was just uploaded, so display the filename to the user
-        return uploaded_file_data["filename"], {"display": "inline-block"}
-    else:
-        # otherwise the trigger was the delete button, so remove the previous filename
-        return "", {"display": "none"}
-
-
 @app.callback(
     Output(El.LIST_GENERATION_STATUS.value, "children"),
     [
@@ -188,10 +146,15 @@ def set_uploaded_file_info(uploaded_file_data, n_clicks):
         Input(El.SELECT_TEAM_INPUT.value, "value"),
         Input(El.TEMP_UPLOAD_STORE.value, "data"),
     ],
-    [State(El.PREVIOUS_LIST_NAME.value, "value")],
+    [
+        State(El.PREVIOUS_LIST_NAME.value, "value"),
+        State(El.FORCE_REGENERATE_CHECKBOX.value, "value"),
+    ],
 )
 @utils.log_callback
-def handle_generate_list(n_clicks, selected_team, uploaded_file_data, detected_list_filename):
+def handle_generate_list(
+    n_clicks, selected_team, uploaded_file_data, detected_list_filename, force_regenerate
+):
     """Handle passing the contents of the list generator function."""
     trigger = utils.parse_trigger(dash.callback_context)
     if not trigger:
@@ -206,7 +169,9 @@ def handle_generate_list(n_clicks, selected_team, uploaded_file_data, detected_l
     if uploaded_file_data:
         # use the uploaded list if one has been provided, otherwise use the auto-detected list
         app.logger.info("Will use the uploaded file as a base for the updated handover list")
-        file_io = io.BytesIO(base64.b64decode(uploaded_file_data["contents"]))
+        contents = store.get("uploads", uploaded_file_data["upload_id"])
+        if contents is None:
+            return "The uploaded list has expired; please upload it again"
         filename = Path(uploaded_file_data["filename"])
     else:
         # otherwise fallback to the auto-detected file
@@ -215,13 +180,60 @@ def handle_generate_list(n_clicks, selected_team, uploaded_file_data, detected_l
         list_date = datetime.datetime.strptime(detected_list_filename.split("_")[0], "%d-%m-%Y")
         input_file_path = utils.build_team_file_path(team, list_date) / filename
 
-        with open(input_file_path, "rb") as fh:
-            file_io = io.BytesIO(fh.read())
-
-    try:
-        output_file_path = generate_list(team, file_io, filename)
-    except Exception as e:
-        app.logger.exception(e)
-        return f"List generation failed due to the following error: '{e}'"
+        # read the prewarmed local copy of the list if it is still up to date
+        with open(prewarm.local_copy(input_file_path), "rb") as fh:
+            contents = fh.read()
+
+    force = "force" in (force_regenerate or [])
+
+    def generate():
+        try:
+            output_file_path = list_generator.generate_list(
+                team, io.BytesIO(contents), filename, force=force
+            )
+        except Exception as e:
+            app.logger.exception(e)
+            return {"error": str(e)}
+        return {"output_file_path": str(output_file_path)}
+
+    # repeated clicks for the same team and list, on any worker, share a single generation
+    job_key = f"{team.name.value}:{hashlib.sha256(contents).hexdigest()}"
+    if force:
+        job_key += ":force"
+        # don't hand back the result of an earlier click, but do join a forced generation
+        # which is still running, rather than starting another which writes the same file
+        if not store.in_flight("jobs", job_key):
+            store.delete("jobs", job_key)
+    result = store.single_flight("jobs", job_key, generate, ttl=settings.JOB_RESULT_SECONDS)
+
+    if "error" in result:
+        # don't hold on to failures, so that the user can simply try again
+        store.delete("jobs", job_key)
+        return f"List generation failed due to the following error: '{result['error']}'"
+
+    output_file_path = Path(result["output_file_path"])
+    download_key = downloads.register(output_file_path)
+    status = [
+        f"List generated succesfully. Saved at {output_file_path} ",
+        html.A(
+            f"Download {output_file_path.name}",
+            href=app.get_relative_path(f"/download/{download_key}"),
+            className="download-link",
+        ),
+        html.A(
+            "Print view",
+            href=app.get_relative_path(f"/print/{download_key}"),
+            target="_blank",
+            className="export-link",
+        ),
+        html.A(
+            "Export as CSV",
+            href=app.get_relative_path(f"/export/{download_key}.csv"),
+            className="export-link",
+        ),
+    ]
 
-    return f"List generated succesfully. Saved at {output_file_path}"
+    preview_rows = preview.read(output_file_path)
+    if preview_rows is not None:
+        status.append(components.make_list_preview(preview_rows))
+    return status
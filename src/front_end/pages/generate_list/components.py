@@ -1,7 +1,9 @@
 import dash_bootstrap_components as dbc
 import dash_core_components as dcc
 import dash_html_components as html
+import dash_table
 
+from ....list_generator.rows import HEADERS
 from ....shared_enums import Team
 from ..enums import Element as El
 
@@ -78,6 +80,17 @@ def make_generate_list_stage():
                             dbc.Button(
                                 "Generate List", id=El.GENERATE_LIST_BUTTON.value, disabled=True
                             ),
+                            dbc.Checklist(
+                                id=El.FORCE_REGENERATE_CHECKBOX.value,
+                                className="force-regenerate-checkbox",
+                                options=[
+                                    {
+                                        "label": "Regenerate even if nothing has changed",
+                                        "value": "force",
+                                    }
+                                ],
+                                value=[],
+                            ),
                             html.P(
                                 id=El.LIST_GENERATION_STATUS.value, className="status-text-output"
                             ),
@@ -90,3 +103,39 @@ def make_generate_list_stage():
             ),
         ]
     )
+
+
+def make_list_preview(rows):
+    """Return a table previewing the generated list, from the rows built by list_generator.preview.
+
+    Only the rows in view are rendered, so that long lists stay responsive.
+    """
+    return dash_table.DataTable(
+        columns=[{"name": header, "id": header.lower()} for header in HEADERS],
+        data=rows,
+        virtualization=True,
+        fixed_rows={"headers": True},
+        page_action="none",
+        style_table={"height": "500px", "overflowY": "auto"},
+        style_cell={
+            "fontFamily": "inherit",
+            "fontSize": "0.8rem",
+            "textAlign": "left",
+            "whiteSpace": "pre-line",
+            "minWidth": "80px",
+        },
+        style_header={"fontWeight": "bold"},
+        style_data_conditional=[
+            # match the Word document: grey ward headers, italic birthdays, bold new patients
+            {
+                "if": {"filter_query": '{kind} = "ward"'},
+                "backgroundColor": "#eeeeee",
+                "fontWeight": "bold",
+            },
+            {"if": {"filter_query": '{kind} = "birthday"'}, "fontStyle": "italic"},
+            {"if": {"filter_query": '{flags} contains "new"'}, "fontWeight": "bold"},
+            # and highlight the patients who have moved since the last list
+            {"if": {"filter_query": '{flags} contains "moved"'}, "backgroundColor": "#fdf2e9"},
+        ],
+        css=[{"selector": ".dash-spreadsheet-container", "rule": "margin-top: 10px"}],
+    )
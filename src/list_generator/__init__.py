@@ -1,19 +1,50 @@
 import datetime
 import logging
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple, Optional
 
-from .. import utils
+from .. import database, settings, utils
+from ..shared_models import Patient
+from . import archive, fingerprint, prewarm, preview, snapshot, trakcare
 from .models import HandoverList
 
 logger = logging.getLogger()
 
 
-def generate_list(team, input_file, input_filename):
+class GenerationResult(NamedTuple):
+    """The outcome of generating a single team's list as part of 'generate_all'."""
+
+    team: object
+    output_file_path: Optional[Path] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def generate_list(
+    team,
+    input_file,
+    input_filename,
+    trakcare_patients=None,
+    changes=None,
+    force=False,
+    low_memory=None,
+    per_ward_tables=None,
+):
     """Produce an updated and formatted handover list.
 
     This is the main function which produces an updated patient handover
     list. A list is first created from the input_file, before it is updated
     by gathering fresh data from TrakCare.
 
+    If today's list has already been generated from the same input list and the same
+    TrakCare patients, the existing list is returned without being regenerated.
+
     The handover list is saved at a dynamic location; the user provides the path
     to a base folder of handover lists, with the rest of the path being a function
     of the team name and current date.
@@ -25,10 +56,24 @@ def generate_list(team, input_file, input_filename):
         input_file (io.BytesIO): A file-like object; the team's previous handover
             list upon which to build the updated list.
         input_filename (Path): The filename pertaining to the input name.
+        trakcare_patients (list, optional): The team's patients, already fetched
+            from TrakCare. If not given, they are fetched as part of the update.
+        changes (SnapshotDiff, optional): The team's changes on TrakCare since the last
+            run, to accompany 'trakcare_patients'.
+        force (bool, optional): Regenerate the list even if it is already up to date.
+        low_memory (bool, optional): Keep as little of the list in memory as possible, at the
+            cost of some speed; see HandoverList. Defaults to settings.LOW_MEMORY.
+        per_ward_tables (bool, optional): Lay the list out as a table per ward; see
+            HandoverList. Defaults to settings.PER_WARD_TABLES.
 
     Returns:
-        Path: The path to the newly updated handover list.
+        Path: The path to the updated handover list.
     """
+    if low_memory is None:
+        low_memory = settings.LOW_MEMORY
+    if per_ward_tables is None:
+        per_ward_tables = settings.PER_WARD_TABLES
+
     # create a default output file path. Using the file extension provided by the
     # input_filename avoids making assumptions about whether it is a DOCM or DOCX file
     today = datetime.date.today()
@@ -42,14 +87,177 @@ def generate_list(team, input_file, input_filename):
     output_file_path.parent.mkdir(parents=True, exist_ok=True)
     logger.debug("Using the following output file path: %s", output_file_path)
 
-    # create a HandoverList instance from the given input list
-    logger.debug("Creating HandoverList instance from the input file")
-    handover_list = HandoverList(team=team, file=input_file, filename=input_filename)
+    start = time.perf_counter()
+    input_hash = fingerprint.hash_input(input_file)
+    previous_fingerprint = None if force else fingerprint.read(output_file_path)
+
+    if (
+        previous_fingerprint
+        and previous_fingerprint.input_hash == input_hash
+        and previous_fingerprint.per_ward_tables == per_ward_tables
+    ):
+        # the list has already been generated from this input in the same layout, so it is
+        # worth waiting for TrakCare before parsing anything: if the patients are unchanged
+        # too, we're done
+        if trakcare_patients is None:
+            trakcare_patients, changes = _fetch_team_patients(team, start)
+        if previous_fingerprint.trakcare_hash == fingerprint.hash_patients(trakcare_patients):
+            logger.info("The list at %s is already up to date", output_file_path)
+            return output_file_path
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        if trakcare_patients is None:
+            # fetching from TrakCare is mostly spent waiting on the network, so start it
+            # now and let it run whilst the input list is being unzipped and parsed
+            trakcare_future = executor.submit(_fetch_team_patients, team, start)
+
+        # create a HandoverList instance from the given input list
+        logger.debug("Creating HandoverList instance from the input file")
+        with utils.log_duration("Parsing the input list", since=start):
+            handover_list = HandoverList(
+                team=team,
+                file=input_file,
+                filename=input_filename,
+                cache_key=input_hash,
+                low_memory=low_memory,
+                per_ward_tables=per_ward_tables,
+            )
+
+        if trakcare_patients is None:
+            trakcare_patients, changes = trakcare_future.result()
+
+    trakcare_hash = fingerprint.hash_patients(trakcare_patients)
+
     # update the list - uses live data from TrakCare
     logger.debug("Updating the base handover list")
-    handover_list.update()
+    with utils.log_duration("Updating the list", since=start):
+        handover_list.update(trakcare_patients, changes)
+    with utils.log_duration("Compacting the list", since=start):
+        handover_list.compact()
     # save the list as a new Word document with the given output file path
     logger.debug("Saving the updated handover list")
-    handover_list.save(output_file_path)
+    with utils.log_duration("Saving the list", since=start):
+        # save a local copy first and copy it to the share, so that downloading the list (or
+        # using it as tomorrow's input list) doesn't have to read it back from the share
+        local_output_file_path = prewarm.local_path(output_file_path)
+        local_output_file_path.parent.mkdir(parents=True, exist_ok=True)
+        handover_list.save(local_output_file_path)
+        # copy2 keeps the modification time, which marks the local copy as up to date
+        shutil.copy2(local_output_file_path, output_file_path)
+    fingerprint.write(
+        output_file_path, fingerprint.Fingerprint(input_hash, trakcare_hash, per_ward_tables)
+    )
+    preview.write(output_file_path, handover_list.preview_rows)
+    try:
+        with utils.log_duration("Indexing the list", since=start):
+            archive.index_list(team, today, output_file_path, handover_list.patients)
+    except Exception as e:
+        # the archive is only for searching old lists, so it mustn't stop the list being made
+        logger.warning("Unable to add the list to the archive index: %r", e)
     logger.debug("List saved at %s", output_file_path)
     return output_file_path
+
+
+def _fetch_team_patients(team, since=None):
+    """Fetch a single team's patients from TrakCare, along with the team's changes."""
+    patients_by_team, changes = _fetch_trakcare_patients([team], since)
+    if changes is not None:
+        changes = changes.for_team(team.name.value)
+    return patients_by_team[team.name], changes
+
+
+def _fetch_trakcare_patients(teams, since=None):
+    """Fetch the current inpatients from TrakCare and snapshot them.
+
+    Every inpatient is fetched, rather than just those under the given teams, so that the
+    snapshot covers the whole hospital whichever team's list is being generated. For a
+    single team, this and the snapshot take several times as long as fetching the team's
+    patients alone; see benchmarks/bench_fetch.py.
+
+    Returns:
+        tuple: A mapping of {TeamName: [Patient]} for the given teams and the hospital-wide
+            SnapshotDiff since the last run, or None if the snapshot could not be recorded.
+    """
+    try:
+        with utils.log_duration("Fetching patients from TrakCare", since=since):
+            patients = trakcare.fetch_all_patients()
+    finally:
+        # the session belongs to this thread; closing it detaches the fetched patients
+        # so they can be used by other threads
+        database.session.remove()
+
+    try:
+        with utils.log_duration("Recording the TrakCare snapshot", since=since):
+            changes = snapshot.record(patients)
+    except Exception as e:
+        # the snapshot only adds detail to the list, so it mustn't stop it being generated
+        logger.warning("Unable to record a snapshot of TrakCare: %r", e)
+        changes = None
+
+    return trakcare.group_by_team(patients, teams), changes
+
+
+def _generate_team_list(team, patient_records, changes, input_file_path, force):
+    """Generate a single team's list in a worker process.
+
+    Only plain, picklable arguments are passed in: the TrakCare patients arrive as
+    records and are rebuilt here, so the worker never needs a database connection.
+    """
+    trakcare_patients = [Patient.from_record(record) for record in patient_records]
+    with open(prewarm.local_copy(input_file_path), "rb") as fh:
+        return generate_list(
+            team,
+            fh,
+            Path(input_file_path.name),
+            trakcare_patients=trakcare_patients,
+            changes=changes,
+            force=force,
+        )
+
+
+def generate_all(previous_lists, max_workers=None, force=False):
+    """Produce updated handover lists for several teams in parallel.
+
+    TrakCare is queried once for all of the requested teams, before building, updating
+    and saving each team's list in its own process. A failure for one team is recorded
+    against that team and does not prevent the remaining lists from being generated.
+
+    Args:
+        previous_lists (dict): A mapping of {Team: Path}, pointing at the previous
+            handover list to use as the base for each team's updated list.
+        max_workers (int, optional): The number of worker processes to use. Defaults
+            to the number of processors on the machine.
+        force (bool, optional): Regenerate lists even if they are already up to date.
+
+    Returns:
+        list: A GenerationResult for each of the requested teams, in the order given.
+    """
+    teams = list(previous_lists)
+    logger.debug("Fetching patients from TrakCare for %d teams", len(teams))
+    patients_by_team, changes = _fetch_trakcare_patients(teams)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _generate_team_list,
+                team,
+                [patient.to_record() for patient in patients_by_team[team.name]],
+                changes.for_team(team.name.value) if changes is not None else None,
+                Path(previous_lists[team]),
+                force,
+            )
+            for team in teams
+        ]
+
+        for team, future in zip(teams, futures):
+            try:
+                output_file_path = future.result()
+            except Exception as e:
+                logger.error("List generation failed for %s: %r", team, e)
+                results.append(GenerationResult(team, error=e))
+            else:
+                logger.debug("List generated for %s at %s", team, output_file_path)
+                results.append(GenerationResult(team, output_file_path=output_file_path))
+
+    return results
@@ -0,0 +1,120 @@
+"""Generate handover lists without the web interface, e.g. from a scheduled task.
+
+Usage:
+    python -m src.list_generator [--team TEAM [TEAM ...]] [--workers N] [--force]
+        [--verbose]
+    python -m src.list_generator --prewarm
+    python -m src.list_generator --index-archive [--workers N]
+
+Each team's most recent handover list is located automatically, exactly as it is on the
+Generate List page. If no teams are given, a list is generated for every team. The exit
+status is non-zero if any team's list could not be generated. A list which is already up
+to date is left as it is, unless --force is given.
+
+--prewarm copies each team's previous list into CACHE_DIR and parses it, ready for the
+first generation of the day (see prewarm.py), then exits.
+
+--index-archive adds every list in LIST_ROOT_DIR which is new or has been edited since it
+was last indexed to the archive search index (see archive.py), then exits.
+"""
+import argparse
+import datetime
+import logging
+import sys
+
+from .. import utils
+from ..shared_enums import Team, TeamName
+from . import GenerationResult, archive, generate_all, prewarm
+
+logger = logging.getLogger()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.list_generator",
+        description="Generate updated handover lists for one, several or all teams.",
+    )
+    parser.add_argument(
+        "--team",
+        dest="teams",
+        nargs="+",
+        metavar="TEAM",
+        choices=[team_name.value.lower() for team_name in TeamName],
+        type=str.lower,
+        help="the team(s) to generate a list for; defaults to all teams",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="the number of worker processes to use; defaults to the number of processors",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="regenerate lists even if nothing has changed since they were last generated",
+    )
+    parser.add_argument(
+        "--prewarm",
+        action="store_true",
+        help="copy and parse each team's previous list ahead of generating, then exit",
+    )
+    parser.add_argument(
+        "--index-archive",
+        action="store_true",
+        help="index any new or edited lists for the archive search page, then exit",
+    )
+    parser.add_argument("--verbose", action="store_true", help="enable debug logging")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    utils.init_logging(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    if args.prewarm:
+        prewarm.prewarm()
+        return 0
+
+    if args.index_archive:
+        summary = archive.ArchiveIndex().update(max_workers=args.workers)
+        return 0 if not summary["failed"] else 1
+
+    if args.teams:
+        teams = [Team.from_team_name(team_name) for team_name in args.teams]
+    else:
+        teams = [team.value for team in Team]
+
+    today = datetime.date.today()
+    summary = {}
+    previous_lists = {}
+    for team in teams:
+        previous_list = prewarm.find_previous_list(team, today)
+        if previous_list is None:
+            summary[team] = "FAILED  no previous handover list found"
+        else:
+            logger.info("Using %s as the base list for %s", previous_list, team)
+            previous_lists[team] = previous_list
+
+    if previous_lists:
+        try:
+            results = generate_all(previous_lists, max_workers=args.workers, force=args.force)
+        except Exception as e:
+            # most likely TrakCare could not be queried, which affects every team
+            logger.exception(e)
+            results = [GenerationResult(team, error=e) for team in previous_lists]
+
+        for result in results:
+            if result.ok:
+                summary[result.team] = f"OK      {result.output_file_path}"
+            else:
+                summary[result.team] = f"FAILED  {result.error!r}"
+
+    for team in teams:
+        print(f"{team.name.value:<12} {summary[team]}")
+
+    return 0 if all(status.startswith("OK") for status in summary.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
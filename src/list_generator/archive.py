@@ -0,0 +1,317 @@
+"""A full-text index of every handover list in LIST_ROOT_DIR, for finding patients on old lists.
+
+Answering "when was this patient last on our list, and what were their jobs?" would
+otherwise mean opening the lists on the share one at a time. Instead, the patients on each
+list are parsed with HandoverList, exactly as they are when a list is used as the input
+list, and kept in a local SQLite database with an FTS5 full-text index over their details
+and the Issues to Bloods columns, so the whole archive can be searched in milliseconds.
+
+'ArchiveIndex.update' indexes any list which is new or has changed (by size and
+modification time) since it was last indexed, parsing them in parallel, and drops lists
+which have been deleted. generate_list adds each list it saves with 'index_list', from the
+patients it already has in memory, so the index only needs a full update once, and after
+lists are edited in Word.
+"""
+import contextlib
+import datetime
+import logging
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from .. import settings, utils
+from ..shared_enums import Team
+from .models import HandoverList
+
+logger = logging.getLogger()
+
+# the indexed columns of each patient on a list, in the order 'entry_values' returns them
+ENTRY_COLUMNS = (
+    "nhs_number",
+    "reg_number",
+    "surname",
+    "dob",
+    "issues",
+    "progress",
+    "jobs",
+    "edd",
+    "tta_ds",
+    "bloods",
+)
+# the most results a search returns
+SEARCH_LIMIT = 100
+
+_DATE_FORMAT = "%d-%m-%Y"
+_DIGITS_PATTERN = re.compile(r"^[\d\s]+$")
+
+
+def entry_values(patient) -> tuple:
+    """Return the values of ENTRY_COLUMNS for a patient, parsed from a list or from TrakCare.
+
+    NHS numbers are stored as digits alone, so that they can be looked up however they're
+    written, and surnames and reg numbers in capitals as they are on a list, so that a
+    patient looks the same whether their list was indexed from TrakCare or from the file.
+    """
+    return (
+        "".join(patient.nhs_number.split()),
+        (patient.reg_number or "").strip().upper(),
+        (patient.surname or "").upper(),
+        patient.dob.isoformat() if patient.dob else "",
+        patient.reason_for_admission or "",
+        # new patients from TrakCare have nothing in these columns yet
+        getattr(patient, "progress", ""),
+        getattr(patient, "jobs", ""),
+        getattr(patient, "edd", ""),
+        getattr(patient, "tta_ds", ""),
+        getattr(patient, "bloods", ""),
+    )
+
+
+def find_lists():
+    """Yield the (team, date, path) of every list in LIST_ROOT_DIR named as generate_list does."""
+    for team in (team.value for team in Team):
+        # the team's folder, which holds a folder for each year and in those, each month
+        team_dir = utils.build_team_file_path(team, datetime.date.today()).parents[1]
+        for path in team_dir.glob("*/*/*.doc[mx]"):
+            try:
+                date = datetime.datetime.strptime(path.stem.split("_")[0], _DATE_FORMAT).date()
+            except ValueError:
+                continue
+            if path.stem == utils.generate_file_stem(team, date):
+                yield team, date, path
+
+
+def parse_list(path: str, team_name: str) -> list:
+    """Return the 'entry_values' of each patient on a list, in a worker process.
+
+    Only the path and the team's name are passed in, and plain tuples returned, so that
+    nothing needs pickling besides strings.
+    """
+    team = Team.from_team_name(team_name)
+    with open(path, "rb") as fh:
+        handover_list = HandoverList(team, fh, Path(path).name, low_memory=True)
+    return [entry_values(patient) for patient in handover_list.patients]
+
+
+def _fts_query(query: str) -> str:
+    """Return an FTS5 query matching rows which contain every word of 'query' as a prefix.
+
+    Each word is quoted, so that nothing typed into the search box is taken as FTS5 syntax.
+    """
+    words = query.split()
+    return " ".join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+class ArchiveIndex:
+    """A local SQLite database of the patients on every list, with a full-text index of them.
+
+    Each list is a row of 'archived_list', keyed by its path, with its team, date, size and
+    modification time. Each patient on it is a row of 'entry', which the FTS5 table
+    'entry_text' indexes, kept in step by triggers.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.CACHE_DIR / "archive.sqlite3"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        columns = ", ".join(ENTRY_COLUMNS)
+        new_columns = ", ".join(f"new.{column}" for column in ENTRY_COLUMNS)
+        old_columns = ", ".join(f"old.{column}" for column in ENTRY_COLUMNS)
+        with self._connect() as conn:
+            # write-ahead logging lets the search page carry on whilst lists are indexed
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS archived_list (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL UNIQUE,
+                    team TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS archived_list_team_date ON archived_list (team, date);
+
+                CREATE TABLE IF NOT EXISTS entry (
+                    id INTEGER PRIMARY KEY,
+                    list_id INTEGER NOT NULL REFERENCES archived_list (id),
+                    nhs_number TEXT,
+                    reg_number TEXT,
+                    surname TEXT,
+                    dob TEXT,
+                    issues TEXT,
+                    progress TEXT,
+                    jobs TEXT,
+                    edd TEXT,
+                    tta_ds TEXT,
+                    bloods TEXT
+                );
+                CREATE INDEX IF NOT EXISTS entry_list_id ON entry (list_id);
+                CREATE INDEX IF NOT EXISTS entry_nhs_number ON entry (nhs_number);
+                CREATE INDEX IF NOT EXISTS entry_reg_number ON entry (reg_number);
+
+                CREATE VIRTUAL TABLE IF NOT EXISTS entry_text USING fts5 (
+                    {columns}, content='entry', content_rowid='id'
+                );
+                CREATE TRIGGER IF NOT EXISTS entry_inserted AFTER INSERT ON entry BEGIN
+                    INSERT INTO entry_text (rowid, {columns}) VALUES (new.id, {new_columns});
+                END;
+                CREATE TRIGGER IF NOT EXISTS entry_deleted AFTER DELETE ON entry BEGIN
+                    INSERT INTO entry_text (entry_text, rowid, {columns})
+                    VALUES ('delete', old.id, {old_columns});
+                END;
+                """
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Yield a connection which commits on success and is always closed afterwards."""
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _remove(conn, path: str) -> None:
+        conn.execute(
+            "DELETE FROM entry WHERE list_id IN (SELECT id FROM archived_list WHERE path = ?)",
+            (path,),
+        )
+        conn.execute("DELETE FROM archived_list WHERE path = ?", (path,))
+
+    def add(self, team, date: datetime.date, path: Path, entries) -> None:
+        """Index a list, replacing whatever was indexed for it before.
+
+        Args:
+            team (Team): The team the list belongs to.
+            date (datetime.date): The date the list is for.
+            path (Path): Where the list is saved.
+            entries (list): The 'entry_values' of each patient on the list.
+        """
+        stat = path.stat()
+        with self._connect() as conn:
+            self._remove(conn, str(path))
+            list_id = conn.execute(
+                "INSERT INTO archived_list (path, team, date, size, mtime_ns) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (str(path), team.name.value, date.isoformat(), stat.st_size, stat.st_mtime_ns),
+            ).lastrowid
+            conn.executemany(
+                f"INSERT INTO entry (list_id, {', '.join(ENTRY_COLUMNS)}) "
+                f"VALUES (?, {', '.join('?' for _ in ENTRY_COLUMNS)})",
+                [(list_id, *values) for values in entries],
+            )
+
+    def update(self, max_workers=None) -> dict:
+        """Index every list in LIST_ROOT_DIR which is new or has changed since it was last indexed.
+
+        Lists are parsed in parallel, and each is indexed as soon as it has been parsed, so
+        an interrupted update only has to parse the lists it didn't get to. A list which
+        can't be parsed is logged and skipped, and tried again on the next update.
+
+        Args:
+            max_workers (int, optional): The number of worker processes to use. Defaults to
+                the number of processors on the machine.
+
+        Returns:
+            dict: The number of lists "indexed", "unchanged", "removed" and "failed".
+        """
+        with self._connect() as conn:
+            indexed = {
+                path: (size, mtime_ns)
+                for path, size, mtime_ns in conn.execute(
+                    "SELECT path, size, mtime_ns FROM archived_list"
+                )
+            }
+
+        summary = dict.fromkeys(("indexed", "unchanged", "removed", "failed"), 0)
+        to_parse = []
+        for team, date, path in find_lists():
+            stat = path.stat()
+            if indexed.pop(str(path), None) == (stat.st_size, stat.st_mtime_ns):
+                summary["unchanged"] += 1
+            else:
+                to_parse.append((team, date, path))
+
+        # whatever is left has been deleted from the share
+        with self._connect() as conn:
+            for path in indexed:
+                self._remove(conn, path)
+        summary["removed"] = len(indexed)
+
+        logger.info("Indexing %d %s", len(to_parse), utils.pluralise("list", len(to_parse)))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(parse_list, str(path), team.name.value)
+                for team, date, path in to_parse
+            ]
+            for (team, date, path), future in zip(to_parse, futures):
+                try:
+                    self.add(team, date, path, future.result())
+                except Exception as e:
+                    logger.warning("Unable to index %s: %r", path, e)
+                    summary["failed"] += 1
+                else:
+                    summary["indexed"] += 1
+
+        logger.info("Updated the archive index: %s", summary)
+        return summary
+
+    def search(self, query: str, team=None, limit: int = SEARCH_LIMIT) -> list:
+        """Return the entries matching a search, most recent list first.
+
+        A query of digits alone is looked up as an NHS or reg number. Anything else is
+        matched against every indexed column, with each word matching the start of a word,
+        e.g. "smi chase" finds SMITH, whose jobs were "Chase bloods".
+
+        Args:
+            query (str): What was typed into the search box.
+            team (Team, optional): Only search this team's lists.
+            limit (int, optional): The most entries to return.
+
+        Returns:
+            list: A dict for each entry, of ENTRY_COLUMNS with the "team", "date" and "path"
+                of its list.
+        """
+        query = query.strip()
+        if not query:
+            return []
+
+        if _DIGITS_PATTERN.match(query):
+            number = "".join(query.split())
+            sql = (
+                "SELECT {columns} FROM entry e JOIN archived_list l ON l.id = e.list_id "
+                "WHERE (e.nhs_number = ? OR e.reg_number = ?)"
+            )
+            parameters = [number, number]
+        else:
+            sql = (
+                "SELECT {columns} FROM entry_text "
+                "JOIN entry e ON e.id = entry_text.rowid "
+                "JOIN archived_list l ON l.id = e.list_id "
+                "WHERE entry_text MATCH ?"
+            )
+            parameters = [_fts_query(query)]
+
+        if team is not None:
+            sql += " AND l.team = ?"
+            parameters.append(team.name.value)
+        sql += " ORDER BY l.date DESC, e.id LIMIT ?"
+        parameters.append(limit)
+
+        columns = [f"e.{column}" for column in ENTRY_COLUMNS] + ["l.team", "l.date", "l.path"]
+        with self._connect() as conn:
+            rows = conn.execute(sql.format(columns=", ".join(columns)), parameters).fetchall()
+        keys = ENTRY_COLUMNS + ("team", "date", "path")
+        return [dict(zip(keys, row)) for row in rows]
+
+
+def index_list(
+    team, date: datetime.date, path: Path, patients, index: Optional[ArchiveIndex] = None
+) -> None:
+    """Add a list which has just been saved to the archive index, from its patients."""
+    index = index or ArchiveIndex()
+    index.add(team, date, path, [entry_values(patient) for patient in patients])
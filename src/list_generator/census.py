@@ -0,0 +1,123 @@
+"""Hospital-wide patient counts per team and ward, for the census page.
+
+The figures are built from a single grouped query and cached for a short time in the
+shared store, so that however many people have the page open, and however many worker
+processes are serving them, TrakCare is queried at most once per cache period.
+"""
+import datetime
+import logging
+from collections import defaultdict
+
+from .. import settings, utils
+from ..shared_enums import CONSULTANT_TEAMS, Team
+from ..store import store
+from . import trakcare
+
+logger = logging.getLogger()
+
+# (lower bound, upper bound, label) for grouping lengths of stay, in days
+LENGTH_OF_STAY_BUCKETS = [
+    (0, 1, "0-1 days"),
+    (2, 3, "2-3 days"),
+    (4, 7, "4-7 days"),
+    (8, 14, "8-14 days"),
+    (15, 28, "15-28 days"),
+    (29, None, "29+ days"),
+]
+
+
+def _bucket_index(length_of_stay: int) -> int:
+    for i, (lower, upper, _) in enumerate(LENGTH_OF_STAY_BUCKETS):
+        if upper is None or lower <= length_of_stay <= upper:
+            return i
+
+
+def _median(counts_by_value: dict):
+    """Return the median of values given as a mapping of {value: number of occurrences}."""
+    total = sum(counts_by_value.values())
+    if not total:
+        return None
+
+    seen = 0
+    for value in sorted(counts_by_value):
+        seen += counts_by_value[value]
+        if seen * 2 >= total:
+            return value
+
+
+def build_census(counts, as_of: datetime.datetime) -> dict:
+    """Aggregate grouped counts into per-team and per-ward figures.
+
+    Args:
+        counts (list): (Consultant, Ward, admission date, number of patients) tuples, as
+            returned by trakcare.fetch_census_counts.
+        as_of (datetime): When the counts were fetched.
+
+    Returns:
+        dict: JSON-serialisable census figures.
+    """
+    home_wards = {team.value.name.value: team.value.home_ward for team in Team}
+    ward_counts = defaultdict(int)
+    length_of_stay_counts = defaultdict(lambda: defaultdict(int))
+
+    for consultant, ward, admission_date, count in counts:
+        team = CONSULTANT_TEAMS.get(consultant)
+        if team is None:
+            continue
+        ward_counts[team, ward] += count
+        if admission_date is not None:
+            length_of_stay = max((as_of.date() - admission_date).days, 0)
+            length_of_stay_counts[team][length_of_stay] += count
+
+    wards = []
+    for (team, ward), count in ward_counts.items():
+        is_home_ward = ward == home_wards[team]
+        wards.append(
+            {
+                "team": team,
+                "ward": ward.value,
+                "patients": count,
+                "outliers": 0 if is_home_ward else count,
+                # sort the home ward to the top of each team, then the outliers by name
+                "_sort": (team, not is_home_ward, ward.value),
+            }
+        )
+    wards.sort(key=lambda row: row.pop("_sort"))
+
+    teams = []
+    for team in sorted(home_wards):
+        team_wards = [row for row in wards if row["team"] == team]
+        teams.append(
+            {
+                "team": team,
+                "home_ward": home_wards[team].value,
+                "patients": sum(row["patients"] for row in team_wards),
+                "outliers": sum(row["outliers"] for row in team_wards),
+                "outlier_wards": sum(1 for row in team_wards if row["outliers"]),
+                "median_length_of_stay": _median(length_of_stay_counts[team]),
+            }
+        )
+
+    length_of_stay = {}
+    for team in sorted(home_wards):
+        buckets = [0] * len(LENGTH_OF_STAY_BUCKETS)
+        for days, count in length_of_stay_counts[team].items():
+            buckets[_bucket_index(days)] += count
+        length_of_stay[team] = buckets
+
+    return {
+        "as_of": as_of.isoformat(timespec="seconds"),
+        "teams": teams,
+        "wards": wards,
+        "length_of_stay_buckets": [label for _, _, label in LENGTH_OF_STAY_BUCKETS],
+        "length_of_stay": length_of_stay,
+    }
+
+
+@store.cached(ttl=settings.CENSUS_CACHE_SECONDS)
+def get_census() -> dict:
+    """Return the current census figures, querying TrakCare if the cached figures are stale."""
+    logger.debug("Fetching census counts from TrakCare")
+    with utils.log_duration("Fetching census counts from TrakCare"):
+        counts = trakcare.fetch_census_counts()
+    return build_census(counts, as_of=datetime.datetime.now())
@@ -0,0 +1,204 @@
+"""Strip the XML which builds up in a list from being carried forward day after day.
+
+Each day's list is built from the day before's, so anything Word adds to a document whilst
+it is being edited is carried forward with it, and keeps accumulating for as long as the
+team keeps using the list: revision ids (rsids) on every paragraph and run, proofing
+marks, text split across several runs with the same formatting, empty runs, properties
+repeated within the same element and styles pasted in from other documents that are no
+longer used. None of it changes how the list looks, but it makes the list bigger and slower
+to open, both in Word and here.
+
+'compact' removes all of these from a parsed document in place, before it is saved.
+"""
+import logging
+from collections import Counter
+
+from docx.opc.constants import CONTENT_TYPE as CT
+from docx.opc.part import XmlPart
+from docx.oxml.ns import qn
+from lxml import etree
+
+logger = logging.getLogger()
+
+_RSID_PREFIX = qn("w:rsid")
+# elements which hold the properties of their parent, each of which should only appear once
+_PROPERTIES = {qn(tag) for tag in ("w:pPr", "w:rPr", "w:tblPr", "w:trPr", "w:tcPr")}
+# the children of a run which only hold formatted text, so may be merged with a neighbour
+_TEXT_RUN_CHILDREN = {qn("w:rPr"), qn("w:t")}
+# elements which refer to a style by its id
+_STYLE_REFERENCES = {
+    qn(tag) for tag in ("w:pStyle", "w:rStyle", "w:tblStyle", "w:numStyleLink", "w:styleLink")
+}
+# elements of a style which refer to another style
+_STYLE_LINKS = {qn(tag) for tag in ("w:basedOn", "w:next", "w:link")}
+
+
+class CompactionReport:
+    """What compacting a document removed, and the size of each of its XML parts before and after.
+
+    Attributes:
+        sizes_before (dict), sizes_after (dict): The size in bytes of each XML part that was
+            compacted, by part name, e.g. {"/word/document.xml": 40603}.
+        removed (Counter): The number of each kind of thing removed, e.g. "empty runs".
+    """
+
+    def __init__(self, sizes_before: dict, sizes_after: dict, removed: Counter):
+        self.sizes_before = sizes_before
+        self.sizes_after = sizes_after
+        self.removed = removed
+
+    @property
+    def bytes_saved(self) -> int:
+        return sum(self.sizes_before.values()) - sum(self.sizes_after.values())
+
+    def __repr__(self):
+        sizes = ", ".join(
+            f"{name} {self.sizes_before[name]} -> {self.sizes_after[name]}"
+            for name in self.sizes_before
+        )
+        removed = ", ".join(f"{count} {kind}" for kind, count in self.removed.items() if count)
+        return f"<{self.__class__.__name__}({sizes}; removed {removed or 'nothing'})>"
+
+
+def _remove(element) -> None:
+    element.getparent().remove(element)
+
+
+def remove_rsids(root) -> int:
+    """Remove the revision ids Word adds to elements as they are edited, and its list of them."""
+    count = 0
+    for element in root.iter(etree.Element):
+        for name in [name for name in element.attrib if name.startswith(_RSID_PREFIX)]:
+            del element.attrib[name]
+            count += 1
+    # the list of every revision id, kept in the settings
+    for rsids in root.findall(qn("w:rsids")):
+        _remove(rsids)
+        count += 1
+    return count
+
+
+def remove_proofing_marks(root) -> int:
+    """Remove the marks Word leaves around misspelt words and bad grammar; it adds them back."""
+    proof_errs = list(root.iter(qn("w:proofErr")))
+    for proof_err in proof_errs:
+        _remove(proof_err)
+    return len(proof_errs)
+
+
+def remove_duplicate_properties(root) -> int:
+    """Remove any property which appears more than once in the same element, keeping the first.
+
+    The first is kept because it is the one python-docx reads.
+    """
+    count = 0
+    for properties in root.iter(*_PROPERTIES):
+        seen = set()
+        for child in list(properties):
+            if child.tag in seen:
+                properties.remove(child)
+                count += 1
+            seen.add(child.tag)
+    return count
+
+
+def _is_text_run(r) -> bool:
+    return all(child.tag in _TEXT_RUN_CHILDREN for child in r)
+
+
+def remove_empty_runs(root) -> int:
+    """Remove runs which have no content besides their formatting, or only empty text."""
+    empty_runs = [
+        r
+        for r in root.iter(qn("w:r"))
+        if _is_text_run(r) and not any(t.text for t in r.iter(qn("w:t")))
+    ]
+    for r in empty_runs:
+        _remove(r)
+    return len(empty_runs)
+
+
+def merge_runs(root) -> int:
+    """Merge neighbouring runs of text with identical formatting into the first of them."""
+    count = 0
+    # find every parent of a run first, as merging removes runs from the tree
+    for parent in {r.getparent() for r in root.iter(qn("w:r"))}:
+        previous, previous_format = None, None
+        for r in list(parent):
+            if r.tag != qn("w:r") or not _is_text_run(r) or r.find(qn("w:t")) is None:
+                previous = None
+                continue
+
+            rPr = r.find(qn("w:rPr"))
+            run_format = etree.tostring(rPr) if rPr is not None else b""
+            if previous is not None and run_format == previous_format:
+                last_t = previous.findall(qn("w:t"))[-1]
+                last_t.text = (last_t.text or "") + "".join(t.text or "" for t in r.iter(qn("w:t")))
+                # otherwise leading and trailing spaces would be lost
+                last_t.set(qn("xml:space"), "preserve")
+                parent.remove(r)
+                count += 1
+            else:
+                previous, previous_format = r, run_format
+    return count
+
+
+def remove_unused_styles(styles_root, other_roots) -> int:
+    """Remove custom styles which nothing in the document uses, directly or through another style.
+
+    Word's built-in styles and the default styles are always kept.
+    """
+    styles = {style.get(qn("w:styleId")): style for style in styles_root.iter(qn("w:style"))}
+    to_visit = [
+        element.get(qn("w:val"))
+        for root in other_roots
+        for element in root.iter(*_STYLE_REFERENCES)
+    ]
+    to_visit += [
+        style_id
+        for style_id, style in styles.items()
+        if style.get(qn("w:customStyle")) not in ("1", "true")
+        or style.get(qn("w:default")) in ("1", "true")
+    ]
+
+    used = set()
+    while to_visit:
+        style_id = to_visit.pop()
+        if style_id in used or style_id not in styles:
+            continue
+        used.add(style_id)
+        to_visit.extend(link.get(qn("w:val")) for link in styles[style_id].iter(*_STYLE_LINKS))
+
+    unused = [style for style_id, style in styles.items() if style_id not in used]
+    for style in unused:
+        _remove(style)
+    return len(unused)
+
+
+def compact(document) -> CompactionReport:
+    """Compact every XML part of a docx Document in place; see the module docstring.
+
+    Returns:
+        CompactionReport: The size of each part before and after, and what was removed.
+    """
+    parts = [part for part in document.part.package.iter_parts() if isinstance(part, XmlPart)]
+    sizes_before = {str(part.partname): len(part.blob) for part in parts}
+
+    removed = Counter()
+    for part in parts:
+        root = part.element
+        removed["rsids"] += remove_rsids(root)
+        removed["proofing marks"] += remove_proofing_marks(root)
+        removed["duplicate properties"] += remove_duplicate_properties(root)
+        removed["empty runs"] += remove_empty_runs(root)
+        removed["merged runs"] += merge_runs(root)
+
+    (styles_part,) = [part for part in parts if part.content_type == CT.WML_STYLES]
+    removed["unused styles"] += remove_unused_styles(
+        styles_part.element, [part.element for part in parts if part is not styles_part]
+    )
+
+    sizes_after = {str(part.partname): len(part.blob) for part in parts}
+    report = CompactionReport(sizes_before, sizes_after, removed)
+    logger.info("Compacted the list: %r", report)
+    return report
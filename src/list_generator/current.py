@@ -0,0 +1,75 @@
+"""The current inpatients of each team and ward, for other systems to read; see front_end/api.py.
+
+Nothing here queries TrakCare. The patients come from the most recent local snapshot of
+TrakCare (see snapshot.py), and each is joined to their row on the latest list generated
+for their team, as saved in the list's preview (see preview.py), so that the handover
+entries (issues, jobs and so on) come along with their location.
+"""
+import datetime
+import logging
+
+from ..shared_enums import Team
+from ..shared_models import Patient
+from . import preview
+from .snapshot import SnapshotStore
+
+logger = logging.getLogger()
+
+
+def _digits(identifier) -> str:
+    return "".join(identifier.split()) if identifier else ""
+
+
+def load_handover_entries(date=None):
+    """Return every team's latest handover entries, keyed by the patient's NHS or reg number.
+
+    Returns:
+        tuple: A mapping of {identifier: preview row} and the modification time of the most
+            recently generated list, or None if no list has been generated.
+    """
+    date = date or datetime.date.today()
+    entries = {}
+    last_modified = None
+    for team in (team.value for team in Team):
+        list_path = preview.find_latest(team, date)
+        rows = preview.read(list_path) if list_path else None
+        if rows is None:
+            continue
+
+        modified = datetime.datetime.fromtimestamp(preview.preview_path(list_path).stat().st_mtime)
+        last_modified = max(last_modified or modified, modified)
+        for row in rows:
+            patient_id = Patient.patient_id_pattern.search(row.get("patient details", ""))
+            if row["kind"] == "patient" and patient_id:
+                entries[_digits(patient_id[0])] = {
+                    key: value for key, value in row.items() if key != "kind"
+                }
+    return entries, last_modified
+
+
+def load(date=None):
+    """Return the current inpatients, along with their latest handover entries.
+
+    Returns:
+        tuple: A list of patients, each a JSON-serialisable dict with the TrakCare location,
+            consultant and team of the patient, and the patient's row on their team's latest
+            list as "handover" (or None if they aren't on it yet), ordered by location; and
+            the time the snapshot or a list last changed, or None if there is neither.
+    """
+    store = SnapshotStore()
+    taken_at = store.latest()
+    snapshot = store.load(taken_at) if taken_at else {}
+    entries, lists_modified = load_handover_entries(date)
+
+    patients = []
+    for row in sorted(snapshot.values(), key=lambda row: [part or "" for part in row.location]):
+        handover = entries.get(_digits(row.nhs_number)) or entries.get(row.reg_number)
+        patients.append(dict(row._asdict(), handover=handover))
+
+    logger.debug(
+        "Loaded %d current patients, %d with handover entries",
+        len(patients),
+        sum(1 for patient in patients if patient["handover"]),
+    )
+    last_modified = max(filter(None, [taken_at, lists_modified]), default=None)
+    return patients, last_modified
@@ -0,0 +1,60 @@
+"""Fingerprints of generated lists, used to avoid regenerating a list which can't have changed.
+
+A generated list depends only on the input list, the team's patients on TrakCare and the
+layout of the list, so a hash of each of the first two is saved in a small sidecar file
+next to the list, along with the layout. If they all match when the list is next
+generated, the existing list is already up to date.
+"""
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger()
+
+
+class Fingerprint(NamedTuple):
+    input_hash: str
+    trakcare_hash: str
+    # missing from the fingerprints of lists generated before the per-ward layout was added
+    per_ward_tables: bool = False
+
+
+def hash_input(file) -> str:
+    """Return a hash of the contents of a file-like object, leaving it at the start."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(1024 * 1024), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def hash_patients(patients) -> str:
+    """Return a hash of the TrakCare columns of the given patients, in any order."""
+    rows = sorted([str(value) for value in patient.to_record().values()] for patient in patients)
+    return hashlib.sha256(json.dumps(rows).encode()).hexdigest()
+
+
+def sidecar_path(output_file_path: Path) -> Path:
+    # the whole filename is kept so that the sidecar never has the same stem as a list
+    return output_file_path.with_name(f"{output_file_path.name}.fingerprint")
+
+
+def read(output_file_path: Path) -> Optional[Fingerprint]:
+    """Return the fingerprint saved for the given list, or None if it has none or is missing."""
+    if not output_file_path.exists():
+        return None
+    try:
+        with open(sidecar_path(output_file_path)) as fh:
+            return Fingerprint(**json.load(fh))
+    except FileNotFoundError:
+        return None
+    except (ValueError, TypeError) as e:
+        logger.warning("Ignoring an unreadable list fingerprint: %r", e)
+        return None
+
+
+def write(output_file_path: Path, fingerprint: Fingerprint) -> None:
+    with open(sidecar_path(output_file_path), "w") as fh:
+        json.dump(fingerprint._asdict(), fh)
@@ -1,32 +1,91 @@
+import copy
+import io
 import logging
-from collections import defaultdict
-from datetime import datetime
-from typing import Union
+import shutil
+import tempfile
+import zipfile
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from typing import Optional, Union
 
 from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
 from docx.enum.table import WD_CELL_VERTICAL_ALIGNMENT, WD_TABLE_ALIGNMENT
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from docx.oxml import OxmlElement, parse_xml
 from docx.oxml.ns import nsdecls, qn
+from docx.section import Section
 from docx.shared import Cm, Pt
-from docx.table import Table
+from docx.table import Table, _Cell
+from docx.text.paragraph import Paragraph
+from docx.text.run import Run
 
 from .. import shared_enums
-from ..front_end.app import db
 from ..shared_models import Patient
 from ..utils import pluralise
+from . import cache, compact, trakcare
+from .batch import stamp_batch
+from .reconcile import Reconciliation, reconcile
+from .renderers import DocxRenderer, JsonRenderer, WardTablesDocxRenderer, render
+from .rows import Row, build_rows
 
 logger = logging.getLogger()
 
+# copy binary parts between Word documents in chunks of this size, in low memory mode
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+# the paragraph styles of the ward headings and birthday messages in the per-ward layout,
+# which is how they are found again when the list is next generated; see WardTables
+WARD_HEADING_STYLE = "Ward Heading"
+BIRTHDAY_STYLE = "Ward Birthday"
+
 
 class HandoverList:
     """The primary object representing the Word document containing the team's list of patients."""
 
-    def __init__(self, team, file, filename):
+    def __init__(
+        self, team, file, filename, cache_key=None, low_memory=False, per_ward_tables=False
+    ):
+        """Parse a handover list.
+
+        Args:
+            team (Team): The team which the list belongs to.
+            file (io.BytesIO): A file-like object of the Word document.
+            filename (Path): The name of the Word document.
+            cache_key (str, optional): A key which identifies the contents of the file, such
+                as its hash. If given, the parsed document is cached against it, and the
+                cached document is used in place of parsing the file again.
+            low_memory (bool, optional): Keep as little of the document in memory as possible.
+                Binary parts, such as pasted images, are dropped once the document has been
+                parsed and are copied straight from 'file' when the list is saved, so 'file'
+                must be kept open until then. The parsed document is not cached.
+            per_ward_tables (bool, optional): Lay the updated list out as a table per ward,
+                each under a heading, rather than as a single table; see WardTables. A list
+                in either layout can be read.
+        """
         logger.debug("Instantiating HandoverList for %r using '%s' as a base list", team, filename)
-        self.doc = Document(docx=file)
+        self.low_memory = low_memory
+        self.per_ward_tables = per_ward_tables
         self.team = team
-        self.patients = self._parse_patients()
+        # the date the list is being produced for, used for ages, birthdays etc.
+        self.as_of = date.today()
+        # the team's changes on TrakCare since the last run, if known (see snapshot.py)
+        self.changes = None
+        # the Rows of the updated table, and the same rows as dicts for the preview, once
+        # the list has been updated
+        self.rows = []
+        self.preview_rows = []
+        if low_memory:
+            self._source_file = file
+            self._passthrough_parts, slim_file = self._without_binary_parts(file)
+            self.doc = Document(docx=slim_file)
+            del slim_file
+            self.patients = self._parse_patients()
+            # the patients have been extracted, so let go of the old rows straight away
+            # rather than when the table is rebuilt
+            self._clear_tables()
+        else:
+            self.patients = self._load(file, cache_key)
         logger.debug("Patients parsed from input handover list: %s", self.patients)
         if len(self.patients):
             logger.debug(
@@ -45,52 +104,206 @@ class HandoverList:
         """Pass any unresolved attribute accesses down to the underlying docx.Document instance."""
         return getattr(self.doc, attr)
 
+    def _load(self, file, cache_key=None):
+        """Parse the document and the patients on it, or copy both from the parsed list cache.
+
+        Returns:
+            PatientList: The patients parsed from the list.
+        """
+        cached = cache.parsed_lists.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            document_part, records = cached
+            self.doc = document_part.document
+            return self._patients_from_records(records)
+
+        self.doc = Document(docx=file)
+        patients = self._parse_patients()
+        if cache_key is not None:
+            # the document part is cached rather than the Document, which by now holds proxies
+            # of its elements that wouldn't be copied along with the rest of the document
+            cache.parsed_lists.put(
+                cache_key,
+                (self.doc.part, self._patient_records(patients)),
+                size=cache.estimated_size(file),
+            )
+        return patients
+
+    def _patient_records(self, patients) -> list:
+        """Return the patients parsed from the list as plain tuples, for the parsed list cache.
+
+        The carried cells of each patient are recorded by their position amongst the <w:tc>
+        elements of the document, so that they can be found again in each copy of it.
+        """
+        positions = {tc: i for i, tc in enumerate(self.doc.element.body.iter(qn("w:tc")))}
+        return [
+            (
+                patient.patient_id,
+                patient._reason_for_admission,
+                patient.progress,
+                patient.jobs,
+                patient.edd,
+                patient.tta_ds,
+                patient.bloods,
+                patient.surname,
+                patient.dob,
+                None
+                if patient.carried_cells is None
+                else [positions[tc] for tc in patient.carried_cells],
+            )
+            for patient in patients
+        ]
+
+    def _patients_from_records(self, records):
+        """Return the PatientList made by '_patient_records', as parsed from this document."""
+        tcs = list(self.doc.element.body.iter(qn("w:tc")))
+        patient_list = PatientList(home_ward=self.team.home_ward)
+        for (*values, surname, dob, positions) in records:
+            patient = Patient(*values)
+            patient.surname, patient.dob = surname, dob
+            patient.carried_cells = None if positions is None else [tcs[i] for i in positions]
+            patient_list.append(patient)
+        return patient_list
+
+    @staticmethod
+    def _without_binary_parts(file):
+        """Return the names of the binary parts of a Word document, and a copy without them.
+
+        python-docx holds every part of a document in memory, including images, which can
+        make up most of a list's size. They are never changed, so the copy has them emptied
+        out and they are copied across from the original when the list is saved.
+        """
+        names = set()
+        slim_file = io.BytesIO()
+        with zipfile.ZipFile(file) as source, zipfile.ZipFile(
+            slim_file, "w", zipfile.ZIP_STORED
+        ) as slim:
+            for info in source.infolist():
+                if info.filename.endswith((".xml", ".rels")):
+                    slim.writestr(info.filename, source.read(info))
+                else:
+                    names.add(info.filename)
+                    slim.writestr(info.filename, b"")
+        slim_file.seek(0)
+        return names, slim_file
+
+    def save(self, path) -> None:
+        """Save the list as a Word document at the given path."""
+        if not self.low_memory:
+            self.doc.save(path)
+            return
+
+        # python-docx writes the binary parts out empty, so write the document to a temporary
+        # file first, then copy it across with the original binary parts
+        with tempfile.TemporaryFile() as tmp:
+            self.doc.save(tmp)
+            tmp.seek(0)
+            with zipfile.ZipFile(tmp) as saved, zipfile.ZipFile(
+                self._source_file
+            ) as source, zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as output:
+                for info in saved.infolist():
+                    if info.filename in self._passthrough_parts:
+                        from_zip, info = source, source.getinfo(info.filename)
+                    else:
+                        from_zip = saved
+                    # writing updates the ZipInfo it is given, so give it a fresh one
+                    output_info = zipfile.ZipInfo(info.filename, info.date_time)
+                    output_info.compress_type = info.compress_type
+                    output_info.file_size = info.file_size
+                    with from_zip.open(info) as src, output.open(output_info, "w") as dst:
+                        shutil.copyfileobj(src, dst, _COPY_CHUNK_SIZE)
+
     def _parse_patients(self):
         """Parse the patients from the Word document table into a PatientList."""
         patient_list = PatientList(home_ward=self.team.home_ward)
 
-        for row in self._handover_table.rows:
-            # skip past the column headers
-            if row.cells[0].text.lower() == "bed":
-                continue
+        # there is a table per ward if the list is laid out that way
+        for table in self._handover_tables:
+            for row in table.rows:
+                cells = table.row_cells(row)
 
-            # skip past the ward name headers or empty rows
-            if row.cells[0].text == row.cells[1].text:
-                continue
-            try:
-                pt = Patient.from_table_row(row)
-            except ValueError as e:
-                logger.exception(e)
-                raise
+                # skip past the column headers
+                if cells[0].text.lower() == "bed":
+                    continue
+
+                # skip past the ward name headers or empty rows
+                if cells[0].text == cells[1].text:
+                    continue
+                try:
+                    pt = Patient.from_table_cells(cells)
+                except ValueError as e:
+                    logger.exception(e)
+                    raise
 
-            patient_list.append(pt)
+                pt.carried_cells = self._carried_cells(row)
+                patient_list.append(pt)
 
         return patient_list
 
+    @staticmethod
+    def _carried_cells(row):
+        """Return the <w:tc> elements of the Issues to Bloods cells, if they can be reused.
+
+        Cells which are merged with a neighbouring cell can't be moved on their own, in which
+        case None is returned and the cells' text is used instead.
+        """
+        tcs = row._tr.tc_lst
+        if len(tcs) != 8 or any(tc.grid_span != 1 or tc.vMerge is not None for tc in tcs):
+            return None
+
+        # new patients are written in bold throughout, but they're no longer new on the next
+        # list, so take the bold back off
+        bed_and_details_runs = [run for tc in tcs[:2] for run in tc.iter(qn("w:r"))]
+        if bed_and_details_runs and all(Run(run, None).bold for run in bed_and_details_runs):
+            for tc in tcs[2:]:
+                for bold in list(tc.iter(qn("w:b"), qn("w:bCs"))):
+                    bold.getparent().remove(bold)
+
+        return tcs[2:]
+
     @property
     def total_patient_count(self) -> int:
         return len(self.patients)
 
     @property
     def new_patient_count(self) -> int:
-        return sum(patient.is_new for patient in self.patients)
+        return self.patients.new_count
 
     def get_trakcare_patients(self):
         """Fetch and return a list of patients from TrakCare under the current team."""
-        team_name = self.team.name
-        allowed_wards = [ward.value for ward in shared_enums.Ward]
-        patients = (
-            db.session.query(Patient)
-            .filter(db.and_(Patient.team == team_name.value), Patient.ward.in_(allowed_wards))
-            .all()
-        )
-        return patients
+        return trakcare.fetch_team_patients(self.team)
 
     @property
     def _handover_table(self):
         """Return the underlying Word document table."""
         return HandoverTable(self.tables[0])
 
+    @staticmethod
+    def _column_headers(table: Table) -> str:
+        trs = table._tbl.tr_lst
+        return "".join(t.text or "" for t in trs[0].iter(qn("w:t"))) if trs else ""
+
+    @property
+    def _handover_tables(self) -> list:
+        """Return the first table, along with any other tables with the same column headers.
+
+        There is more than one table when the list is laid out as a table per ward.
+        """
+        first, *others = self.tables
+        headers = self._column_headers(first)
+        return [HandoverTable(first)] + [
+            HandoverTable(table) for table in others if self._column_headers(table) == headers
+        ]
+
+    def _clear_tables(self) -> None:
+        """Clear the list back to a single table of column headers, whichever layout it is in."""
+        first, *others = self._handover_tables
+        for table in others:
+            table._tbl.getparent().remove(table._tbl)
+        for paragraph in self.doc.paragraphs:
+            if paragraph.style.name in (WARD_HEADING_STYLE, BIRTHDAY_STYLE):
+                paragraph._p.getparent().remove(paragraph._p)
+        first.clear()
+
     def _apply_default_formatting(self):
         style = self.styles["Normal"]
         font = style.font
@@ -105,11 +318,19 @@ class HandoverList:
             section.left_margin = Cm(1.25)
             section.right_margin = Cm(1.25)
 
-    def _update_patients(self) -> None:
-        """Bring the internal PatientList object up to date with TrakCare."""
+    def _update_patients(self, trakcare_patients=None) -> None:
+        """Bring the internal PatientList object up to date with TrakCare.
+
+        If 'trakcare_patients' is given, it is used in place of fetching the team's
+        patients from TrakCare, e.g. when they have already been fetched for several teams.
+        """
         updated_list = PatientList(home_ward=self.team.home_ward)
-        logger.debug("Fetching patients from TrakCare")
-        current_trakcare_patients = self.get_trakcare_patients()
+        if trakcare_patients is None:
+            logger.debug("Fetching patients from TrakCare")
+            current_trakcare_patients = self.get_trakcare_patients()
+        else:
+            logger.debug("Using pre-fetched TrakCare patients")
+            current_trakcare_patients = trakcare_patients
         if len(current_trakcare_patients):
             logger.debug(
                 "Found %d %s on TrakCare:\n\t%s",
@@ -120,21 +341,36 @@ class HandoverList:
         else:
             logger.debug("No patients found on TrakCare")
 
+        # work out ages, birthdays and bed sorting keys for the whole batch at once, so
+        # that every patient on the list is calculated as of the same date
+        stamp_batch(current_trakcare_patients, as_of=self.as_of)
+
         # use the TrakCare patient list as the canonical source for which patients
         # are presently under the team. Note that any patients who were on the original
         # input handover list will be dropped at this point.
+        moved = self.changes.moved if self.changes is not None else set()
         for trakcare_patient in current_trakcare_patients:
-            if trakcare_patient not in self.patients:
-                # patient must be new to the team
-                trakcare_patient.is_new = True
-                updated_list.append(trakcare_patient)
-            else:
-                # patient must be on the original list, therefore merge the jobs,
-                # EDD etc into the TrakCare patient. By merging into the TrakCare
-                # patient, we also ensure that their location is fully up to date
-                # incase they were moved since the previous list was produced.
-                trakcare_patient.merge(self.patients[trakcare_patient.nhs_number])
-                updated_list.append(trakcare_patient)
+            trakcare_patient.moved = trakcare_patient.reg_number in moved
+
+        reconciliation = self.patients.reconcile(current_trakcare_patients)
+        for trakcare_patient, list_patient in reconciliation.continuing:
+            # patient must be on the original list, therefore merge the jobs,
+            # EDD etc into the TrakCare patient. By merging into the TrakCare
+            # patient, we also ensure that their location is fully up to date
+            # incase they were moved since the previous list was produced.
+            trakcare_patient.merge(list_patient)
+            updated_list.append(trakcare_patient)
+        for trakcare_patient in reconciliation.new:
+            # patient must be new to the team
+            trakcare_patient.is_new = True
+            updated_list.append(trakcare_patient)
+        if reconciliation.discharged:
+            logger.debug(
+                "Dropping %d %s no longer under the team: %s",
+                len(reconciliation.discharged),
+                pluralise("patient", len(reconciliation.discharged)),
+                ", ".join(repr(patient) for patient in reconciliation.discharged),
+            )
 
         logger.debug("Sorting the updated list")
         updated_list.sort()
@@ -150,35 +386,90 @@ class HandoverList:
             logger.debug("No patients present on the updated list")
 
     def _update_handover_table(self) -> None:
-        """Create a fresh Word table with the current PatientList."""
-        self._handover_table.update(self.patients)
+        """Create a fresh Word table with the current PatientList.
+
+        The rows of the table are built once and kept in 'rows', and the rows for the preview
+        are rendered in the same pass as the Word table, in 'preview_rows'.
+        """
+        self.rows = build_rows(self.patients)
+        self._clear_tables()
+        if self.per_ward_tables:
+            docx_renderer = WardTablesDocxRenderer(WardTables(self.doc, self._handover_table))
+        else:
+            docx_renderer = DocxRenderer(self._handover_table)
+        _, self.preview_rows = render(self.rows, [docx_renderer, JsonRenderer()])
+
+    @property
+    def _first_section(self) -> Section:
+        # self.sections[0] would find the properties of every section to return the first
+        body = self.doc.element.body
+        (sectPr,) = body.xpath("(./w:p/w:pPr/w:sectPr | ./w:sectPr)[1]")
+        return Section(sectPr, self.doc.part)
 
     def _update_list_metadata(self) -> None:
-        """Update additonal metadata, such as the footer."""
-        # put the patient count in the footer
-        footer = self.sections[0].footer
+        """Update additonal metadata, such as the footer.
+
+        All of the figures come from the counts kept by the PatientList as it was built, so
+        the patients don't need to be visited again.
+        """
+        patients = self.patients
+        footer = self._first_section.footer
         footer.footer_distance = Cm(1.25)
+
+        # the first line has the patient counts...
         metadata_text = (
             f"{self.total_patient_count} {pluralise('patient', self.total_patient_count)} "
-            f"({self.new_patient_count} new)\t"
-            f"\t"
-            f"Generated at {datetime.now():%H:%M %d/%m/%Y}"
+            f"({self.new_patient_count} new)"
         )
+        if self.changes is not None:
+            metadata_text += f" · {patients.moved_count} moved"
+            # the changes are since the last snapshot before today, which isn't necessarily
+            # when the input list was generated, so say when that was
+            if self.changes.previous_taken_at is not None:
+                metadata_text += (
+                    f" · {len(self.changes.discharged)} discharged since "
+                    f"{self.changes.previous_taken_at:%H:%M %d/%m/%Y}"
+                )
+        metadata_text += f"\t\tGenerated at {datetime.now():%H:%M %d/%m/%Y}"
+
+        # ...and the second has the counts per ward
+        ward_counts = [f"{ward.value} {count}" for ward, count in patients.ward_counts()]
+        if patients.outlier_count:
+            ward_counts.append(
+                f"{patients.outlier_count} {pluralise('outlier', patients.outlier_count)}"
+            )
+        if self.changes is not None and self.changes.taken_at is not None:
+            ward_counts.append(f"TrakCare as of {self.changes.taken_at:%H:%M %d/%m/%Y}")
+        if ward_counts:
+            metadata_text += "\n" + " · ".join(ward_counts)
+
         footer.paragraphs[0].text = metadata_text
         logger.debug("Added metadata to the handover list: %r", metadata_text)
 
-    def update(self) -> None:
+    def update(self, trakcare_patients=None, changes=None) -> None:
         """Update the HandoverList patient table.
 
         Comprises of 3 phases:
             1) Update the in-memory 'self.patients' PatientList using TrakCare
             2) Update the underlying table in the Word document with the updated 'self.patients'
             3) Update any addtional metadata pertaining to the HandoverList e.g. footer information
+
+        Args:
+            trakcare_patients (list, optional): The team's current patients, if they have
+                already been fetched from TrakCare. Fetched on demand if not given.
+            changes (SnapshotDiff, optional): The team's changes on TrakCare since the last
+                run, used to flag patients who have moved and to add counts of moved
+                and discharged patients to the footer.
         """
-        self._update_patients()
+        self.changes = changes
+        self._update_patients(trakcare_patients)
         self._update_handover_table()
         self._update_list_metadata()
 
+    def compact(self) -> compact.CompactionReport:
+        """Strip the XML which builds up from carrying the list forward each day; see compact.py."""
+        return compact.compact(self.doc)
+
     def __repr__(self):
         return (
             f"<{self.__class__.__name__}("
@@ -190,36 +481,20 @@ class HandoverList:
 class HandoverTable:
     def __init__(self, table: Table):
         self._table = table
-        self._new_patient_indices = set()
+        # the <w:tr> elements of the new patients' rows, which are formatted in bold
+        self._new_patient_trs = set()
 
     def __getattr__(self, attr):
         """Pass any unfound attributes down to the underlying Table object."""
         return getattr(self._table, attr)
 
-    def update(self, patients):
-        """Create a freshly updated table with the given patient list."""
+    def update(self, rows):
+        """Create a freshly updated table with the given Rows; see rows.build_rows."""
         logger.debug("Generating a fresh table in the Word document")
 
         # clear the existing table back to the column headers
         self.clear()
-
-        current_ward = None
-        for patient in patients:
-            if patient.location.ward != current_ward:
-                # we're at the first patient on a different ward, therefore add
-                # a subheader row with the name of the new ward
-                current_ward = patient.location.ward
-                self.add_ward_header_row(current_ward)
-
-            self.add_patient_row(patient)
-            logger.debug("%r added to the table", patient)
-
-        if not patients:
-            logger.debug("No patients added to the table")
-
-        # apply formatting to the newly updated table
-        logger.debug("Applying table formatting to the Word document")
-        self.format()
+        render(rows, [DocxRenderer(self)])
 
     def clear(self, keep_headers: bool = True) -> None:
         logger.debug("Removing old rows from original patient list table")
@@ -227,35 +502,51 @@ class HandoverTable:
             tr = row._tr
             self._tbl.remove(tr)
 
+    def row_cells(self, row) -> list:
+        """Return the cells of a row, in the same way as row.cells.
+
+        python-docx's row.cells lays out the whole table to find a single row's cells, which
+        makes anything that visits every row quadratic in the length of the list. Unless
+        the row has cells merged with the row above, they can simply be read off in order
+        instead, repeating any cell which spans several columns as row.cells does.
+        """
+        tcs = row._tr.tc_lst
+        if any(tc.vMerge is not None for tc in tcs):
+            return row.cells
+
+        cells = []
+        for tc in tcs:
+            cells.extend([_Cell(tc, self)] * tc.grid_span)
+        return cells
+
     def add_full_width_row(self):
         new_row = self.add_row()
-        new_row.cells[0].merge(new_row.cells[-1])
+        cells = self.row_cells(new_row)
+        cells[0].merge(cells[-1])
         return new_row
 
-    def add_ward_header_row(self, ward: shared_enums.Ward) -> None:
-        ward_header_row = self.add_full_width_row()
-        ward_header_row.cells[0].text = ward.value
-
-    def add_patient_row(self, patient: Patient) -> None:
-        if patient.is_birthday:
-            birthday_row = self.add_full_width_row()
-            birthday_row.cells[0].text = f"Happy birthday {patient.forename}! {patient.age} today!"
+    def add_header_row(self, text: str) -> None:
+        """Add a row spanning the whole table, e.g. a ward header or birthday message."""
+        header_row = self.add_full_width_row()
+        self.row_cells(header_row)[0].text = text
 
+    def add_patient_row(self, row: Row) -> None:
         new_patient_row = self.add_row()
-        new_patient_row.patient = patient
-
-        new_patient_row.cells[0].text = patient.bed
-        new_patient_row.cells[1].text = patient.patient_details
-        new_patient_row.cells[2].text = patient.reason_for_admission or ""
-        if not patient.is_new:
-            # new patients won't have any of these attributes on them
-            new_patient_row.cells[3].text = patient.progress
-            new_patient_row.cells[4].text = patient.jobs
-            new_patient_row.cells[5].text = patient.edd
-            new_patient_row.cells[6].text = patient.tta_ds
-            new_patient_row.cells[7].text = patient.bloods
+        cells = self.row_cells(new_patient_row)
+
+        if row.carried_cells is not None:
+            cells[0].text, cells[1].text = row.cells[:2]
+            # move the cells over from the previous list as they are, which keeps the
+            # clinicians' formatting (bold, bullet points etc.) without re-creating it
+            for new_cell, tc in zip(cells[2:], row.carried_cells):
+                new_cell._tc.getparent().replace(new_cell._tc, tc)
         else:
-            self._new_patient_indices.add(new_patient_row._index)
+            for cell, text in zip(cells, row.cells):
+                if text:
+                    cell.text = text
+
+        if row.is_new:
+            self._new_patient_trs.add(new_patient_row._tr)
 
     def format(self) -> None:
         # center table within the page
@@ -268,41 +559,44 @@ class HandoverTable:
 
         # format the rows and cells
         for row in self.rows:
+            cells = self.row_cells(row)
             # format the column headers and set header row to repeat
-            if row.cells[0].text.lower() == "bed":
-                for cell in row.cells:
+            if cells[0].text.lower() == "bed":
+                for cell in cells:
                     for paragraph in cell.paragraphs:
                         for run in paragraph.runs:
                             run.underline = True
-                tr = row._tr
-                trPr = tr.get_or_add_trPr()
-                tblHeader = OxmlElement("w:tblHeader")
-                tblHeader.set(qn("w:val"), "true")
-                trPr.append(tblHeader)
+                trPr = row._tr.get_or_add_trPr()
+                # the column headers are carried over from the previous list, so may already
+                # be set to repeat
+                if trPr.find(qn("w:tblHeader")) is None:
+                    tblHeader = OxmlElement("w:tblHeader")
+                    tblHeader.set(qn("w:val"), "true")
+                    trPr.append(tblHeader)
 
             # format the ward headers
-            if row.cells[0].text == row.cells[1].text:
+            if cells[0].text == cells[1].text:
                 shading_elm = parse_xml(f'<w:shd {nsdecls("w")} w:fill="EEEEEE"/>')
-                for cell in row.cells:
+                for cell in cells:
                     cell._tc.get_or_add_tcPr().append(shading_elm)
                     # keep this header row on the same page as the next row
                     for paragraph in cell.paragraphs:
                         paragraph.paragraph_format.keep_with_next = True
-                if "birthday" in row.cells[0].text:
-                    for cell in row.cells:
+                if "birthday" in cells[0].text:
+                    for cell in cells:
                         for para in cell.paragraphs:
                             for run in para.runs:
                                 run.italic = True
 
             # format new patients as bold
-            if row._index in self._new_patient_indices:
-                for cell in row.cells:
+            if row._tr in self._new_patient_trs:
+                for cell in cells:
                     for para in cell.paragraphs:
                         for run in para.runs:
                             run.bold = True
 
             # format all cells in the table
-            for cell in row.cells:
+            for cell in cells:
                 cell.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
                 for paragraph in cell.paragraphs:
                     formatter = paragraph.paragraph_format
@@ -311,15 +605,184 @@ class HandoverTable:
                     formatter.space_after = Pt(2)
 
             # prevent table rows from splitting across page breaks
-            no_split = parse_xml(f"<w:cantSplit {nsdecls('w')}/>")
-            row._tr.get_or_add_trPr().append(no_split)
+            trPr = row._tr.get_or_add_trPr()
+            if trPr.find(qn("w:cantSplit")) is None:
+                trPr.append(parse_xml(f"<w:cantSplit {nsdecls('w')}/>"))
+
+
+class WardTables:
+    """The list laid out as a table per ward, each under a heading with the ward's name.
+
+    Word lays out a long table with full-width merged rows for the wards much more slowly
+    than several shorter ones without, so this is an alternative to a single HandoverTable.
+    The first ward uses the list's own table and each further ward a copy of its column
+    headers. Birthday messages are paragraphs under the ward's heading.
+
+    Args:
+        document (Document): The list's Word document.
+        table (HandoverTable): The list's table, cleared back to its column headers.
+    """
+
+    def __init__(self, document, table: HandoverTable):
+        self.tables = []
+        self._first_table = table
+        self._blank_tbl = copy.deepcopy(table._tbl)
+        self._heading_style = self._get_or_add_style(document, WARD_HEADING_STYLE, bold=True)
+        self._birthday_style = self._get_or_add_style(document, BIRTHDAY_STYLE, italic=True)
+
+    @staticmethod
+    def _get_or_add_style(document, name: str, bold=None, italic=None):
+        try:
+            return document.styles[name]
+        except KeyError:
+            style = document.styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+        style.base_style = document.styles["Normal"]
+        style.font.bold = bold
+        style.font.italic = italic
+        # keep the heading on the same page as the start of the ward's table
+        style.paragraph_format.keep_with_next = True
+        style.paragraph_format.space_before = Pt(6) if bold else Pt(0)
+        style.paragraph_format.space_after = Pt(2)
+        return style
+
+    def _add_paragraph(self, text: str, style) -> None:
+        """Add a paragraph just above the current ward's table."""
+        p = OxmlElement("w:p")
+        self.tables[-1]._tbl.addprevious(p)
+        paragraph = Paragraph(p, self._first_table._parent)
+        paragraph.text = text
+        paragraph.style = style
+
+    def add_ward(self, name: str) -> None:
+        if self.tables:
+            tbl = copy.deepcopy(self._blank_tbl)
+            self.tables[-1]._tbl.addnext(tbl)
+            self.tables.append(HandoverTable(Table(tbl, self._first_table._parent)))
+        else:
+            self.tables.append(self._first_table)
+        self._add_paragraph(name, self._heading_style)
+
+    def add_birthday(self, text: str) -> None:
+        self._add_paragraph(text, self._birthday_style)
+
+    def add_patient_row(self, row: Row) -> None:
+        self.tables[-1].add_patient_row(row)
+
+    def format(self) -> None:
+        for table in self.tables or [self._first_table]:
+            table.format()
 
 
 class PatientList:
+    """An ordered collection of patients, indexed by each of the ways they can be identified.
+
+    A patient can be looked up by NHS number, Trak registration number or, failing those, by
+    surname and date of birth. Patients on a handover list may have been written with only
+    one of the two numbers, so looking up a TrakCare patient tries each key in turn. A key
+    shared by two different patients (e.g. twins with the same surname and date of birth) is
+    recorded in 'collisions' and no longer used for lookups, rather than risk a patient's
+    jobs being given to someone else.
+    """
+
+    # the keys that patients are indexed by, from most to least specific
+    KEY_KINDS = ("nhs_number", "reg_number", "surname_dob")
+
     def __init__(self, home_ward: shared_enums.Ward):
         self.home_ward: shared_enums.Ward = home_ward
-        # a mapping of {nhs_number: Patient}
+        # a mapping of {patient_id: Patient}, in list order
         self._patient_mapping: dict = {}
+        # a mapping of {(key kind, value): Patient} for every key of every patient
+        self._index: dict = {}
+        # keys which are shared by more than one patient, and so can't identify either
+        self._ambiguous_keys: set = set()
+        # (key, Patient already in the list, Patient being added) for each collision found
+        self.collisions: list = []
+        # running counts, kept up to date as patients are added so they are free to read
+        self.new_count = 0
+        self.moved_count = 0
+        self._ward_counts = Counter()
+
+    @staticmethod
+    def index_keys(patient: "Patient") -> list:
+        """Return the (key kind, value) keys a patient can be found by, most specific first."""
+        keys = []
+        if patient.nhs_number:
+            keys.append(("nhs_number", "".join(patient.nhs_number.split())))
+        if patient.reg_number:
+            keys.append(("reg_number", patient.reg_number.strip().upper()))
+        if patient.surname and patient.dob:
+            surname = "".join(char for char in patient.surname.casefold() if char.isalnum())
+            keys.append(("surname_dob", surname, patient.dob))
+        return keys
+
+    def find(self, patient: "Patient") -> Optional["Patient"]:
+        """Return the patient in the list who is the same person as the given patient, if any.
+
+        A match on a less specific key is ignored if the two patients' NHS or registration
+        numbers disagree.
+        """
+        for key in self.index_keys(patient):
+            match = self._index.get(key)
+            if match is not None and not match.conflicts_with(patient):
+                return match
+        return None
+
+    def _add_to_index(self, patient: "Patient") -> None:
+        for key in self.index_keys(patient):
+            if key in self._ambiguous_keys:
+                continue
+            existing = self._index.get(key)
+            if existing is not None and existing is not patient:
+                logger.warning(
+                    "%r and %r share the same %s, so it won't be used to identify either",
+                    existing,
+                    patient,
+                    key[0].replace("_", " "),
+                )
+                self.collisions.append((key, existing, patient))
+                self._ambiguous_keys.add(key)
+                del self._index[key]
+            else:
+                self._index[key] = patient
+
+    def _remove(self, patient: "Patient") -> None:
+        del self._patient_mapping[patient.patient_id]
+        for key in self.index_keys(patient):
+            if self._index.get(key) is patient:
+                del self._index[key]
+        self._count(patient, -1)
+
+    def reconcile(self, patients) -> Reconciliation:
+        """Match each of the given (TrakCare) patients with the same person on this list.
+
+        See reconcile.reconcile. Patients parsed from a list have no location to compare, so
+        none are reported as moved; who has moved comes from the TrakCare snapshot instead,
+        as SnapshotDiff.moved.
+        """
+        return reconcile(self, patients, self.find)
+
+    def _count(self, patient: "Patient", n: int) -> None:
+        self.new_count += n * bool(patient.is_new)
+        self.moved_count += n * bool(patient.moved)
+        self._ward_counts[patient.ward] += n
+
+    def ward_counts(self) -> list:
+        """Return a list of (Ward, number of patients), in the same order as the list is sorted."""
+        home_ward_count = [(self.home_ward, self._ward_counts[self.home_ward])]
+        outlier_counts = sorted(
+            (
+                (ward, count)
+                for ward, count in self._ward_counts.items()
+                if ward not in (self.home_ward, None) and count
+            ),
+            key=lambda item: item[0].value,
+        )
+        return [item for item in home_ward_count + outlier_counts if item[1]]
+
+    @property
+    def outlier_count(self) -> int:
+        """The number of patients on a ward other than the home ward."""
+        return len(self) - self._ward_counts[self.home_ward] - self._ward_counts[None]
 
     def append(self, patient: "Patient") -> None:
         self[patient] = patient
@@ -340,23 +803,30 @@ class PatientList:
         grouped_dict = defaultdict(list)
         # create a mapping of {ward: [Patient]}
         for patient in self:
-            grouped_dict[patient.location.ward].append(patient)
+            grouped_dict[patient.ward].append(patient)
 
         # sort the patients by bed on a per-ward basis
         for ward, pts in grouped_dict.items():
-            grouped_dict[ward] = sorted(pts, key=lambda patient: patient.location._bed_sort)
+            grouped_dict[ward] = sorted(pts, key=self._bed_sort_key)
 
         # populate the new list with the Home Ward patients first
         for patient in grouped_dict.pop(self.home_ward, []):
-            sorted_dict[patient.nhs_number] = patient
+            sorted_dict[patient.patient_id] = patient
 
         # then populate the new list with the outlier patients sorted by ward alphabetically
         for ward in sorted(grouped_dict.keys(), key=lambda k: k.value):
             for patient in grouped_dict[ward]:
-                sorted_dict[patient.nhs_number] = patient
+                sorted_dict[patient.patient_id] = patient
 
         self._patient_mapping = sorted_dict
 
+    @staticmethod
+    def _bed_sort_key(patient: "Patient") -> str:
+        # prefer the key precomputed by stamp_batch, which saves re-parsing the location
+        if patient.bed_sort is not None:
+            return patient.bed_sort
+        return patient.location._bed_sort
+
     @property
     def patients(self):
         return list(self)
@@ -365,26 +835,43 @@ class PatientList:
     def patients(self, value):
         raise AttributeError(f"{self.__class__.__name__}.patients is a read-only property.")
 
-    def __getitem__(self, key: Union[str, "Patient"]) -> "Patient":
-        """Return a Patient from the list with a given Patient or NHS number."""
+    def _lookup(self, key: Union[str, "Patient"]) -> Optional["Patient"]:
         if isinstance(key, Patient):
-            key = key.nhs_number
-        try:
-            return self._patient_mapping[key]
-        except KeyError:
-            raise KeyError(f"No patient with the NHS number '{key}' found in the list")
+            return self.find(key)
+        # otherwise it is an NHS or Trak registration number
+        patient_id = "".join(key.split())
+        return self._index.get(("nhs_number", patient_id)) or self._index.get(
+            ("reg_number", patient_id.upper())
+        )
+
+    def __getitem__(self, key: Union[str, "Patient"]) -> "Patient":
+        """Return a Patient from the list with a given Patient, NHS or registration number."""
+        patient = self._lookup(key)
+        if patient is None:
+            raise KeyError(f"No patient matching '{key}' found in the list")
+        return patient
 
     def __setitem__(self, _: str, value: "Patient"):
+        """Add a patient to the list, replacing the patient with the same ID if there is one.
+
+        Only the same patient ID is taken to be the same person: a patient who merely shares
+        a key with another (e.g. the same surname and date of birth, with only one of the two
+        numbers each) is added alongside them as a collision, rather than replacing them and
+        losing their jobs. Matching TrakCare patients to the list by any key is reconcile's job.
+        """
         if not isinstance(value, Patient):
             raise TypeError
 
-        self._patient_mapping[value.nhs_number] = value
+        existing = self._patient_mapping.get(value.patient_id)
+        if existing is not None:
+            self._remove(existing)
+        self._count(value, 1)
+        self._patient_mapping[value.patient_id] = value
+        self._add_to_index(value)
 
     def __contains__(self, key: Union[str, "Patient"]) -> bool:
-        """Assert whether a given patient (where type(key) == Patient) is in the list."""
-        if isinstance(key, Patient):
-            key = key.nhs_number
-        return key in self._patient_mapping
+        """Return whether a given Patient, NHS or registration number is in the list."""
+        return self._lookup(key) is not None
 
     def __iter__(self):
         return iter(self._patient_mapping.values())
@@ -397,5 +884,5 @@ class PatientList:
             f"<{self.__class__.__name__}("
             f"home_ward={self.home_ward.value}, "
             f"total_patient_count={len(self)}, "
-            f"new_patient_count={len([pt for pt in self if pt.is_new])})>"
+            f"new_patient_count={self.new_count})>"
         )
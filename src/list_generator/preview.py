@@ -0,0 +1,58 @@
+"""A lightweight preview of a generated list, for showing in the browser.
+
+The preview is rendered from the list's Rows whilst they are still in memory, in the same
+pass as the Word table (see HandoverList._update_handover_table), as compact dicts; see
+Row.to_dict. Leaving out everything that's empty means a long list costs a fraction of the
+size of the Word document to send to the browser.
+
+The preview is saved as JSON alongside the list's local copy, so that it is still there
+when an unchanged list isn't regenerated, and so that the list can be exported to other
+formats without python-docx; see renderers.py.
+"""
+import datetime
+import json
+import logging
+from pathlib import Path
+
+from .. import utils
+from . import prewarm
+
+logger = logging.getLogger()
+
+
+def preview_path(list_path: Path) -> Path:
+    """Return the path of the preview of the list at the given path."""
+    local_path = prewarm.local_path(list_path)
+    return local_path.with_name(f"{local_path.name}.preview.json")
+
+
+def write(list_path: Path, rows: list) -> None:
+    path = preview_path(list_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(rows, separators=(",", ":")))
+
+
+def read(list_path: Path):
+    """Return the preview rows of the list at the given path, or None if there isn't one."""
+    try:
+        return json.loads(preview_path(list_path).read_text())
+    except (FileNotFoundError, ValueError) as e:
+        logger.debug("No preview of %s: %r", list_path, e)
+        return None
+
+
+def find_latest(team, date):
+    """Return the path of the team's most recent list up to the given date which has a preview.
+
+    Like utils.find_previous_list, this searches back up to a week, but only looks at the
+    local copies of lists generated here, so never touches the share.
+    """
+    for n_days in range(7):
+        day = date - datetime.timedelta(days=n_days)
+        stem = utils.generate_file_stem(team, day)
+        list_dir = utils.build_team_file_path(team, day)
+        for path in sorted(
+            prewarm.local_path(list_dir / stem).parent.glob(f"{stem}.*.preview.json")
+        ):
+            return list_dir / path.name[: -len(".preview.json")]
+    return None
@@ -0,0 +1,162 @@
+"""Warm up everything that generating a list needs, ahead of the morning rush.
+
+The first person from each team to generate a list in the morning would otherwise wait for
+the search for their previous list on the share, for the list to be copied over the network
+and parsed, and for a database connection to be opened. Shortly before lists are usually
+generated, 'prewarm' does all of this for every team, so that by the time anyone clicks
+"Generate" only the TrakCare fetch and the write are left to do.
+
+Previous lists are copied into CACHE_DIR. A copy is only used while the list on the share
+has the same size and modification time, so a list edited since then is read afresh.
+"""
+import datetime
+import io
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from .. import database, settings, utils
+from ..shared_enums import Team
+from ..store import store
+from . import fingerprint
+from .models import HandoverList
+
+logger = logging.getLogger()
+
+# how long the location of a team's previous list is remembered for
+PREVIOUS_LIST_TTL_SECONDS = 12 * 60 * 60
+
+
+def find_previous_list(team, date):
+    """Return the path to the team's most recent list before the given date, as utils does.
+
+    A list from the day before is remembered in the shared store, so that the share is only
+    searched once per team per day, so long as the list is still there. An older list isn't
+    remembered, as a more recent one might yet be saved.
+    """
+    key = f"{team.name.value}:{date}"
+    path = store.get("previous_lists", key)
+    if path is not None and Path(path.decode()).exists():
+        return Path(path.decode())
+
+    path = utils.find_previous_list(team, date)
+    yesterday = date - datetime.timedelta(days=1)
+    if path is not None and path.stem == utils.generate_file_stem(team, yesterday):
+        store.set("previous_lists", key, str(path).encode(), ttl=PREVIOUS_LIST_TTL_SECONDS)
+    return path
+
+
+def local_path(path: Path) -> Path:
+    """Return where the local copy of a list on the share is kept.
+
+    Raises:
+        ValueError: If the path isn't on the share.
+    """
+    return (
+        settings.CACHE_DIR / "lists" / path.parent.relative_to(settings.LIST_ROOT_DIR) / path.name
+    )
+
+
+def local_copy(path: Path) -> Path:
+    """Return the path of an up to date local copy of the list, or else the list itself."""
+    try:
+        copy_path = local_path(path)
+        local_stat, stat = copy_path.stat(), path.stat()
+    except (FileNotFoundError, ValueError):
+        # there's no copy, or the list isn't on the share (so is never copied)
+        return path
+
+    if (local_stat.st_size, local_stat.st_mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+        return copy_path
+    return path
+
+
+def copy_locally(path: Path) -> Path:
+    """Copy a list on the share into the local cache, unless an up to date copy is already there.
+
+    Returns:
+        Path: The path of the local copy.
+    """
+    copy_path = local_path(path)
+    if local_copy(path) == copy_path:
+        return copy_path
+
+    copy_path.parent.mkdir(parents=True, exist_ok=True)
+    # copy2 keeps the modification time, which is how 'local_copy' knows it is up to date.
+    # Copy to a temporary file first, so that no other worker ever reads a partial copy
+    temp_path = copy_path.with_name(f"{copy_path.name}.{os.getpid()}.tmp")
+    shutil.copy2(path, temp_path)
+    os.replace(temp_path, copy_path)
+    return copy_path
+
+
+def prewarm(date=None) -> None:
+    """Open the database connections, and copy and parse every team's previous list.
+
+    A failure for one team is logged and doesn't stop the others from being prewarmed.
+    """
+    date = date or datetime.date.today()
+    logger.info("Prewarming the previous lists for %s", date)
+
+    database.warm_up()
+    for team in (team.value for team in Team):
+        try:
+            path = find_previous_list(team, date)
+            if path is None:
+                logger.info("No previous list to prewarm for %s", team)
+                continue
+
+            with utils.log_duration(f"Prewarming {path.name}"):
+                contents = copy_locally(path).read_bytes()
+                file = io.BytesIO(contents)
+                HandoverList(team, file, path.name, cache_key=fingerprint.hash_input(file))
+        except Exception as e:
+            logger.warning("Unable to prewarm the previous list for %s: %r", team, e)
+
+
+class PrewarmScheduler:
+    """Run 'prewarm' every day at a given time, on a background thread.
+
+    Args:
+        at (datetime.time): The time of day to prewarm at.
+    """
+
+    def __init__(self, at: datetime.time):
+        self.at = at
+        self._timer = None
+
+    def seconds_until_next_run(self, now: datetime.datetime = None) -> float:
+        now = now or datetime.datetime.now()
+        next_run = datetime.datetime.combine(now.date(), self.at)
+        if next_run <= now:
+            next_run += datetime.timedelta(days=1)
+        return (next_run - now).total_seconds()
+
+    def start(self) -> None:
+        delay = self.seconds_until_next_run()
+        logger.debug("Prewarming in %.0f seconds", delay)
+        self._timer = threading.Timer(delay, self._run)
+        # don't keep the server running just for the sake of the timer
+        self._timer.daemon = True
+        self._timer.start()
+
+    def cancel(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+
+    def _run(self) -> None:
+        try:
+            prewarm()
+        finally:
+            self.start()
+
+
+def start_scheduler():
+    """Start prewarming every day at settings.PREWARM_AT, if settings.PREWARM is set."""
+    if not settings.PREWARM:
+        return None
+    scheduler = PrewarmScheduler(settings.PREWARM_AT)
+    scheduler.start()
+    return scheduler
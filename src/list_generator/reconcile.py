@@ -0,0 +1,75 @@
+"""Work out who is continuing, new and discharged between two collections of patients.
+
+This is used both to bring a team's handover list up to date with TrakCare, and to compare
+hospital-wide snapshots of TrakCare. Either way, each current patient is looked up once in
+the previous collection, so reconciling takes linear time however many patients there are.
+"""
+from typing import Callable, Iterable, Optional
+
+
+class Reconciliation:
+    """The result of reconciling the current patients against the previous ones.
+
+    Attributes:
+        continuing (list): (current, previous) pairs for each patient present in both.
+        moved (list): The (current, previous) pairs whose location has changed; only pairs
+            where both locations are known are compared.
+        new (list): Current patients with no previous match.
+        discharged (list): Previous patients with no current match.
+    """
+
+    def __init__(self, continuing: list, moved: list, new: list, discharged: list):
+        self.continuing = continuing
+        self.moved = moved
+        self.new = new
+        self.discharged = discharged
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__}("
+            f"continuing={len(self.continuing)}, moved={len(self.moved)}, "
+            f"new={len(self.new)}, discharged={len(self.discharged)})>"
+        )
+
+
+def reconcile(
+    previous: Iterable,
+    current: Iterable,
+    find: Callable[[object], Optional[object]],
+    location: Callable[[object], object] = None,
+) -> Reconciliation:
+    """Match each current patient with the same patient in the previous collection.
+
+    A previous patient is only ever matched once; any other current patient who would match
+    them is treated as new.
+
+    Args:
+        previous (iterable): The previous patients, e.g. a PatientList or the values of a
+            snapshot.
+        current (iterable): The current patients.
+        find (callable): Given a current patient, returns the matching previous patient or
+            None, e.g. PatientList.find, or a lookup in a mapping of the previous patients.
+        location (callable): Given a patient, returns their location, or None if it isn't
+            known. If not given, no patients are reported as moved.
+
+    Returns:
+        Reconciliation: The continuing, moved, new and discharged patients.
+    """
+    continuing, moved, new = [], [], []
+    matched_ids = set()
+    for patient in current:
+        previous_patient = find(patient)
+        if previous_patient is None or id(previous_patient) in matched_ids:
+            new.append(patient)
+            continue
+
+        matched_ids.add(id(previous_patient))
+        pair = (patient, previous_patient)
+        continuing.append(pair)
+        if location is not None:
+            before, after = location(previous_patient), location(patient)
+            if before is not None and after is not None and before != after:
+                moved.append(pair)
+
+    discharged = [patient for patient in previous if id(patient) not in matched_ids]
+    return Reconciliation(continuing, moved, new, discharged)
@@ -0,0 +1,169 @@
+"""Renderers which turn the rows of a handover list into a particular format.
+
+Each renderer is given the rows one at a time by 'render', so that any number of formats
+can be produced from the same rows in a single pass over them. Apart from the Word
+document, none of them need python-docx, so a print view or export of a list can be
+rendered in milliseconds from its saved rows; see preview.py.
+"""
+import csv
+import html
+import io
+from abc import ABC, abstractmethod
+
+from .rows import HEADERS, Row
+
+
+class Renderer(ABC):
+    """The interface of a renderer: 'add' is called with each Row, then 'finish' once."""
+
+    @abstractmethod
+    def add(self, row: Row) -> None:
+        pass
+
+    def finish(self):
+        """Return the rendered list."""
+        return None
+
+
+class DocxRenderer(Renderer):
+    """Write the rows into the table of a Word document, below its column headers.
+
+    Args:
+        table (HandoverTable): The table to write the rows into, already cleared back to its
+            column headers.
+    """
+
+    def __init__(self, table):
+        self.table = table
+
+    def add(self, row: Row) -> None:
+        if row.is_header:
+            self.table.add_header_row(row.cells[0])
+        else:
+            self.table.add_patient_row(row)
+
+    def finish(self):
+        # apply formatting to the newly updated table
+        self.table.format()
+
+
+class WardTablesDocxRenderer(Renderer):
+    """Write the rows into a table per ward of a Word document, rather than a single table.
+
+    Args:
+        ward_tables (WardTables): The tables to write the rows into.
+    """
+
+    def __init__(self, ward_tables):
+        self.ward_tables = ward_tables
+
+    def add(self, row: Row) -> None:
+        if row.kind == Row.WARD:
+            self.ward_tables.add_ward(row.cells[0])
+        elif row.kind == Row.BIRTHDAY:
+            self.ward_tables.add_birthday(row.cells[0])
+        else:
+            self.ward_tables.add_patient_row(row)
+
+    def finish(self):
+        self.ward_tables.format()
+
+
+class JsonRenderer(Renderer):
+    """Render the rows as a list of compact dicts; see Row.to_dict."""
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, row: Row) -> None:
+        self.rows.append(row.to_dict())
+
+    def finish(self) -> list:
+        return self.rows
+
+
+class CsvRenderer(Renderer):
+    """Render the patients as CSV text, with a column for their ward rather than header rows."""
+
+    def __init__(self):
+        self.file = io.StringIO()
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["Ward"] + HEADERS + ["New", "Moved"])
+        self.ward = ""
+
+    def add(self, row: Row) -> None:
+        if row.kind == Row.WARD:
+            self.ward = row.cells[0]
+        elif row.kind == Row.PATIENT:
+            self.writer.writerow(
+                [self.ward] + row.cells + ["yes" if row.is_new else "", "yes" if row.moved else ""]
+            )
+
+    def finish(self) -> str:
+        return self.file.getvalue()
+
+
+class HtmlRenderer(Renderer):
+    """Render the rows as a standalone HTML page, laid out like the Word document for printing.
+
+    Args:
+        title (str): The title of the page, e.g. the list's filename.
+    """
+
+    STYLE = """
+        body { font-family: Calibri, sans-serif; font-size: 8pt; margin: 1.25cm; }
+        table { border-collapse: collapse; width: 100%; }
+        th, td { border: 1px solid #000; padding: 2pt; text-align: center; vertical-align: middle; }
+        th { text-decoration: underline; }
+        thead { display: table-header-group; }
+        tr { page-break-inside: avoid; }
+        tr.ward td { background-color: #eeeeee; }
+        tr.birthday td { font-style: italic; }
+        tr.new td { font-weight: bold; }
+        tr.moved td { background-color: #fdf2e9; }
+        @media print { tr.moved td { background-color: transparent; } }
+    """
+
+    def __init__(self, title: str = "Handover list"):
+        self.parts = [
+            "<!DOCTYPE html>",
+            f'<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>',
+            f"<style>{self.STYLE}</style></head><body><table><thead><tr>",
+            *(f"<th>{html.escape(header)}</th>" for header in HEADERS),
+            "</tr></thead><tbody>",
+        ]
+
+    @staticmethod
+    def _cell(text: str, colspan: int = 1) -> str:
+        text = "<br>".join(html.escape(line) for line in text.splitlines())
+        return f'<td colspan="{colspan}">{text}</td>' if colspan > 1 else f"<td>{text}</td>"
+
+    def add(self, row: Row) -> None:
+        if row.is_header:
+            self.parts.append(
+                f'<tr class="{row.kind}">{self._cell(row.cells[0], len(HEADERS))}</tr>'
+            )
+            return
+
+        classes = " ".join(
+            name for name, is_set in [("new", row.is_new), ("moved", row.moved)] if is_set
+        )
+        self.parts.append(f'<tr class="{classes}">' if classes else "<tr>")
+        self.parts.extend(self._cell(text) for text in row.cells)
+        self.parts.append("</tr>")
+
+    def finish(self) -> str:
+        self.parts.append("</tbody></table></body></html>")
+        return "".join(self.parts)
+
+
+# the renderers which can be used for exporting a list, by file extension
+EXPORTERS = {"csv": CsvRenderer, "json": JsonRenderer}
+
+
+def render(rows, renderers) -> list:
+    """Give each row to every renderer in turn, returning what each renderer rendered."""
+    for row in rows:
+        for renderer in renderers:
+            renderer.add(row)
+    return [renderer.finish() for renderer in renderers]
@@ -0,0 +1,117 @@
+"""The contents of a handover list's table, independent of how the table is rendered.
+
+Every decision about what goes in the table (where the ward headers and birthday rows go,
+and which cells of a patient's row are filled in) is made once, here, when the rows are
+built from the sorted PatientList. The Word document and every other format of the list
+are then rendered from the same rows; see renderers.py.
+"""
+
+# the column headers of the list, as found in the Word document
+HEADERS = [
+    "Bed",
+    "Patient Details",
+    "Issues",
+    "Inpatient Progress",
+    "Jobs",
+    "EDD",
+    "TTA/DS",
+    "Bloods",
+]
+
+
+class Row:
+    """One row of a handover list's table.
+
+    Attributes:
+        kind (str): Row.WARD or Row.BIRTHDAY for a header spanning the whole table, with
+            its text in the first cell, or Row.PATIENT.
+        cells (list): The text of each cell, with an entry per column for a patient row.
+        is_new (bool): Whether the patient wasn't on the previous list.
+        moved (bool): Whether the patient has moved since the previous list.
+        carried_cells (list, optional): The patient's Issues to Bloods cells as they were
+            in the previous Word document; see HandoverList._carried_cells.
+    """
+
+    WARD = "ward"
+    BIRTHDAY = "birthday"
+    PATIENT = "patient"
+
+    def __init__(self, kind: str, cells: list, is_new=False, moved=False, carried_cells=None):
+        self.kind = kind
+        self.cells = cells
+        self.is_new = is_new
+        self.moved = moved
+        self.carried_cells = carried_cells
+
+    @property
+    def is_header(self) -> bool:
+        return self.kind != self.PATIENT
+
+    def to_dict(self) -> dict:
+        """Return the row as a compact, JSON-serialisable dict, leaving out anything empty.
+
+        The keys of the cells are the headers in lower case, e.g. "patient details".
+        """
+        row = {"kind": self.kind}
+        row.update((header.lower(), text) for header, text in zip(HEADERS, self.cells) if text)
+        flags = " ".join(
+            flag for flag, is_set in [("new", self.is_new), ("moved", self.moved)] if is_set
+        )
+        if flags:
+            row["flags"] = flags
+        return row
+
+    @classmethod
+    def from_dict(cls, row: dict) -> "Row":
+        flags = row.get("flags", "").split()
+        cells = [row.get(header.lower(), "") for header in HEADERS]
+        if row["kind"] != cls.PATIENT:
+            cells = cells[:1]
+        return cls(row["kind"], cells, is_new="new" in flags, moved="moved" in flags)
+
+    def __eq__(self, other):
+        return isinstance(other, type(self)) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}(kind={self.kind}, cells={self.cells[:2]})>"
+
+
+def build_rows(patients) -> list:
+    """Return the Rows of the table for a sorted PatientList."""
+    rows = []
+    current_ward = None
+    for patient in patients:
+        if patient.ward != current_ward:
+            # we're at the first patient on a different ward, therefore add
+            # a subheader row with the name of the new ward
+            current_ward = patient.ward
+            rows.append(Row(Row.WARD, [current_ward.value if current_ward else ""]))
+
+        if patient.is_birthday:
+            rows.append(
+                Row(Row.BIRTHDAY, [f"Happy birthday {patient.forename}! {patient.age} today!"])
+            )
+
+        if patient.is_new:
+            # new patients won't have any of the other attributes on them
+            other_cells = [patient.reason_for_admission or ""] + [""] * 5
+        else:
+            other_cells = [
+                patient.reason_for_admission or "",
+                patient.progress,
+                patient.jobs,
+                patient.edd,
+                patient.tta_ds,
+                patient.bloods,
+            ]
+        rows.append(
+            Row(
+                Row.PATIENT,
+                [patient.bed or "", patient.patient_details] + other_cells,
+                is_new=patient.is_new,
+                moved=patient.moved,
+                # new patients are never carried over, as they weren't on the previous list
+                carried_cells=None if patient.is_new else patient.carried_cells,
+            )
+        )
+    return rows
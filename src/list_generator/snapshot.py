@@ -0,0 +1,188 @@
+"""Local snapshots of the TrakCare inpatient list, used to work out what changed between runs.
+
+Every time TrakCare is queried, a compact copy of the hospital-wide result (just the
+identifiers, location and consultant of each inpatient) is saved to a local SQLite
+database. Comparing the current result against the most recent snapshot from before today
+then tells us, with a handful of set operations, who has been admitted, discharged, moved
+or changed consultant since yesterday.
+"""
+import contextlib
+import datetime
+import logging
+import sqlite3
+from typing import NamedTuple, Optional
+
+from .. import settings
+from .reconcile import reconcile
+
+logger = logging.getLogger()
+
+
+class SnapshotRow(NamedTuple):
+    reg_number: str
+    nhs_number: str
+    ward: Optional[str]
+    room: Optional[str]
+    bed: Optional[str]
+    consultant: Optional[str]
+    team: Optional[str]
+
+    @classmethod
+    def from_patient(cls, patient):
+        return cls(
+            reg_number=patient.reg_number,
+            nhs_number=patient.nhs_number,
+            ward=patient.ward.value if patient.ward else None,
+            room=patient.room,
+            bed=patient._bed,
+            consultant=patient.consultant.value if patient.consultant else None,
+            team=patient.team,
+        )
+
+    @property
+    def location(self):
+        return self.ward, self.room, self.bed
+
+
+class SnapshotDiff:
+    """The changes between two snapshots, each a mapping of {reg_number: SnapshotRow}.
+
+    Attributes:
+        admitted (set): Reg numbers present now, but not previously.
+        discharged (set): Reg numbers present previously, but not now.
+        moved (set): Reg numbers present in both, whose ward, room or bed has changed.
+        consultant_changed (set): Reg numbers present in both, whose consultant has changed.
+    """
+
+    def __init__(self, previous: dict, current: dict, previous_taken_at=None, taken_at=None):
+        self.previous = previous
+        self.current = current
+        self.previous_taken_at = previous_taken_at
+        self.taken_at = taken_at
+
+        reconciliation = reconcile(
+            previous.values(),
+            current.values(),
+            lambda row: previous.get(row.reg_number),
+            location=lambda row: row.location,
+        )
+        self.admitted = {row.reg_number for row in reconciliation.new}
+        self.discharged = {row.reg_number for row in reconciliation.discharged}
+        self.moved = {after.reg_number for after, _ in reconciliation.moved}
+        self.consultant_changed = {
+            after.reg_number
+            for after, before in reconciliation.continuing
+            if before.consultant != after.consultant
+        }
+
+    def for_team(self, team_name: str) -> "SnapshotDiff":
+        """Return the changes from the point of view of a single team.
+
+        Patients who have come under the team, whether newly admitted or transferred from
+        another team, count as admitted; those who have left the team count as discharged.
+        """
+        return type(self)(
+            {key: row for key, row in self.previous.items() if row.team == team_name},
+            {key: row for key, row in self.current.items() if row.team == team_name},
+            previous_taken_at=self.previous_taken_at,
+            taken_at=self.taken_at,
+        )
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__}("
+            f"admitted={len(self.admitted)}, discharged={len(self.discharged)}, "
+            f"moved={len(self.moved)}, consultant_changed={len(self.consultant_changed)})>"
+        )
+
+
+class SnapshotStore:
+    """A local SQLite database of timestamped TrakCare snapshots."""
+
+    def __init__(self, path=None):
+        self.path = path or settings.CACHE_DIR / "snapshots.sqlite3"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS snapshot (
+                    taken_at TEXT NOT NULL,
+                    reg_number TEXT NOT NULL,
+                    nhs_number TEXT,
+                    ward TEXT,
+                    room TEXT,
+                    bed TEXT,
+                    consultant TEXT,
+                    team TEXT,
+                    PRIMARY KEY (taken_at, reg_number)
+                )
+                """
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Yield a connection which commits on success and is always closed afterwards."""
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save(self, rows, taken_at: datetime.datetime) -> None:
+        """Save the given SnapshotRows, and prune any snapshots which are too old to keep."""
+        key = taken_at.isoformat(timespec="seconds")
+        oldest = taken_at - datetime.timedelta(days=settings.SNAPSHOT_RETENTION_DAYS)
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO snapshot VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(key, *row) for row in rows],
+            )
+            conn.execute(
+                "DELETE FROM snapshot WHERE taken_at < ?", (oldest.isoformat(timespec="seconds"),)
+            )
+
+    def latest_before(self, moment: datetime.datetime) -> Optional[datetime.datetime]:
+        """Return the time of the most recent snapshot taken before the given moment."""
+        with self._connect() as conn:
+            (taken_at,) = conn.execute(
+                "SELECT MAX(taken_at) FROM snapshot WHERE taken_at < ?",
+                (moment.isoformat(timespec="seconds"),),
+            ).fetchone()
+        return datetime.datetime.fromisoformat(taken_at) if taken_at else None
+
+    def latest(self) -> Optional[datetime.datetime]:
+        """Return the time of the most recent snapshot, or None if there are none."""
+        return self.latest_before(datetime.datetime.max)
+
+    def load(self, taken_at: datetime.datetime) -> dict:
+        """Return the snapshot taken at the given time as a mapping of {reg_number: SnapshotRow}."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT reg_number, nhs_number, ward, room, bed, consultant, team "
+                "FROM snapshot WHERE taken_at = ?",
+                (taken_at.isoformat(timespec="seconds"),),
+            ).fetchall()
+        return {row[0]: SnapshotRow(*row) for row in rows}
+
+
+def record(patients, store=None, taken_at=None) -> SnapshotDiff:
+    """Save a snapshot of the given TrakCare patients and return the changes since yesterday.
+
+    The comparison is made against the most recent snapshot taken before today, so running
+    the generator several times in one day always reports the changes since the day before.
+    If there is no such snapshot, every patient is reported as admitted.
+    """
+    store = store or SnapshotStore()
+    taken_at = taken_at or datetime.datetime.now()
+
+    current = {patient.reg_number: SnapshotRow.from_patient(patient) for patient in patients}
+    start_of_today = datetime.datetime.combine(taken_at.date(), datetime.time())
+    previous_taken_at = store.latest_before(start_of_today)
+    previous = store.load(previous_taken_at) if previous_taken_at else {}
+
+    store.save(current.values(), taken_at)
+
+    diff = SnapshotDiff(previous, current, previous_taken_at=previous_taken_at, taken_at=taken_at)
+    logger.debug("TrakCare changes since %s: %r", previous_taken_at, diff)
+    return diff
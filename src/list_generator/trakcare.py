@@ -0,0 +1,76 @@
+import logging
+from collections import defaultdict
+
+from sqlalchemy import and_, func
+
+from .. import database, shared_enums
+from ..shared_models import Patient
+
+logger = logging.getLogger()
+
+
+def _allowed_wards():
+    return [ward.value for ward in shared_enums.Ward]
+
+
+def _known_consultants():
+    # the Consultant column can only load the consultants we know about, so any
+    # query which isn't already restricted to a team must filter on them
+    return [consultant.value for consultant in shared_enums.Consultant]
+
+
+def fetch_team_patients(team):
+    """Fetch and return a list of patients from TrakCare under the given team."""
+    return (
+        database.session.query(Patient)
+        .filter(and_(Patient.team == team.name.value), Patient.ward.in_(_allowed_wards()))
+        .all()
+    )
+
+
+def fetch_all_patients():
+    """Fetch and return every patient from TrakCare on the wards we produce lists for.
+
+    This is not restricted to particular teams, so that the result is a complete picture
+    of those wards, e.g. for a snapshot.
+    """
+    patients = (
+        database.session.query(Patient)
+        .filter(Patient.ward.in_(_allowed_wards()), Patient.consultant.in_(_known_consultants()))
+        .all()
+    )
+    logger.debug("Fetched %d patients from TrakCare", len(patients))
+    return patients
+
+
+def group_by_team(patients, teams) -> dict:
+    """Group patients by team.
+
+    Returns:
+        dict: A mapping of {TeamName: [Patient]}, with an entry for every given team.
+    """
+    patients_by_team = defaultdict(list)
+    for patient in patients:
+        if patient.team is not None:
+            patients_by_team[shared_enums.TeamName(patient.team)].append(patient)
+
+    return {team.name: patients_by_team[team.name] for team in teams}
+
+
+def fetch_census_counts():
+    """Count the patients on each ward, grouped by consultant, ward and admission date.
+
+    This is a single grouped query, and the result is small whatever the number of
+    inpatients, which makes it suitable for building hospital-wide statistics.
+
+    Returns:
+        list: (Consultant, Ward, admission date, number of patients) tuples.
+    """
+    return (
+        database.session.query(
+            Patient.consultant, Patient.ward, Patient.admission_date, func.count()
+        )
+        .filter(Patient.ward.in_(_allowed_wards()), Patient.consultant.in_(_known_consultants()))
+        .group_by(Patient.consultant, Patient.ward, Patient.admission_date)
+        .all()
+    )
@@ -1,4 +1,6 @@
+import datetime
 import os
+import tempfile
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -14,12 +16,76 @@ else:
     except KeyError:
         raise Exception("DB_URL environment variable is required")
 
+# connection pool settings for the TrakCare database. Connections are recycled well within
+# the server's idle timeout and pinged before use so that a connection which has died
+# overnight is replaced rather than handed to the first request of the morning
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+# the number of connections to open and validate when the server starts
+DB_WARM_UP_CONNECTIONS = int(os.environ.get("DB_WARM_UP_CONNECTIONS", 2))
+# pyodbc-only options; TrakCare is only ever read from, so autocommit is safe
+DB_FAST_EXECUTEMANY = os.environ.get("DB_FAST_EXECUTEMANY", "true").lower() == "true"
+DB_AUTOCOMMIT = os.environ.get("DB_AUTOCOMMIT", "true").lower() == "true"
+
 try:
     LIST_ROOT_DIR = Path(os.environ["LIST_ROOT_DIR"])
 except KeyError:
     raise Exception("LIST_ROOT_DIR environment variable is required")
 
+# a local (i.e. not network share) folder for data which is kept between runs, such as
+# the TrakCare snapshots. Tests get a fresh temporary folder each run
+if TESTING:
+    CACHE_DIR = Path(tempfile.mkdtemp(prefix="plg-cache-"))
+else:
+    CACHE_DIR = Path(
+        os.environ.get("CACHE_DIR", Path.home() / ".patient-list-generator")
+    ).expanduser()
+
+# how many days of TrakCare snapshots to keep
+SNAPSHOT_RETENTION_DAYS = int(os.environ.get("SNAPSHOT_RETENTION_DAYS", 14))
+
+# roughly how much memory parsed previous lists may take up, per process, so that generating
+# from the same list again doesn't have to unzip and parse it again; see list_generator/cache.py
+PARSED_LIST_CACHE_BYTES = int(os.environ.get("PARSED_LIST_CACHE_BYTES", 64 * 1024 * 1024))
+
+# keep as little of each list in memory as possible whilst generating it, e.g. for lists
+# with many pasted images; see HandoverList
+LOW_MEMORY = os.environ.get("LOW_MEMORY", "false").lower() == "true"
+
+# lay generated lists out as a table per ward, each under a heading, rather than as one long
+# table with a row for each ward, which Word is slow to lay out; see list_generator/models.py
+PER_WARD_TABLES = os.environ.get("PER_WARD_TABLES", "false").lower() == "true"
+
+# prewarm every team's previous list and the database connections in the background each
+# day at PREWARM_AT (HH:MM), ahead of lists being generated; see list_generator/prewarm.py
+PREWARM = os.environ.get("PREWARM", "false").lower() == "true"
+PREWARM_AT = datetime.time.fromisoformat(os.environ.get("PREWARM_AT", "07:30"))
+
+# how long the census page's figures are cached for before TrakCare is queried again
+CENSUS_CACHE_SECONDS = int(os.environ.get("CENSUS_CACHE_SECONDS", 60))
+
+# how long uploaded lists are kept for between uploading and clicking "Generate", and how
+# long the result of a generation is kept for repeated clicks on the same list
+UPLOAD_SPOOL_SECONDS = int(os.environ.get("UPLOAD_SPOOL_SECONDS", 3600))
+JOB_RESULT_SECONDS = int(os.environ.get("JOB_RESULT_SECONDS", 300))
+
+# how long the download link shown for a generated list keeps working
+DOWNLOAD_SECONDS = int(os.environ.get("DOWNLOAD_SECONDS", 12 * 60 * 60))
+
+# how often the JSON API reloads the current patients from the local TrakCare snapshot and
+# the generated lists, however often it is polled; see front_end/api.py
+API_CACHE_SECONDS = int(os.environ.get("API_CACHE_SECONDS", 30))
+
 DEBUG = os.environ.get("DEBUG", "true").lower() == "true"
 
+# serve the app with a multi-process WSGI server rather than the development server. Each
+# worker process serves up to THREADS requests at once
+PRODUCTION = os.environ.get("PRODUCTION", "false").lower() == "true"
+WORKERS = int(os.environ.get("WORKERS", 4))
+THREADS = int(os.environ.get("THREADS", 4))
+
 HOST = os.environ.get("HOST", "127.0.0.1")
 PORT = int(os.environ.get("PORT", 8080))
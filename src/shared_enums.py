@@ -10,6 +10,9 @@ class TeamModel:
     def __eq__(self, other):
         return self.name == other.name
 
+    def __hash__(self):
+        return hash(self.name)
+
     def __lt__(self, other):
         return self.name.value < other.name.value
 
@@ -130,3 +133,9 @@ class Team(Enum):
             if team_name.lower() == name.lower():
                 return member.value
         raise ValueError(f"{team_name!r} is not a valid {cls.__name__}")
+
+
+# a mapping of {Consultant: team name}, to find a consultant's team with a single lookup
+CONSULTANT_TEAMS = {
+    consultant: team.value.name.value for team in Team for consultant in team.value.consultants
+}
@@ -1,41 +1,71 @@
 import datetime
 import re
 
+from sqlalchemy import Column, Date, Enum, Text, case
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm.attributes import manager_of_class
 
 from . import utils
-from .front_end.app import db
-from .shared_enums import Consultant
+from .database import Base
+from .shared_enums import CONSULTANT_TEAMS, Consultant
 from .shared_enums import Team as TeamEnum
 from .shared_enums import TeamName, Ward
 
 
-class Patient(db.Model):
+class Patient(Base):
     """Database table representing a live view of inpatients at NDDH from TrakCare."""
 
     __tablename__ = "vwPathologyCurrentInpatients"
     patient_id_pattern = re.compile(
         r"(?:((?<=\s|\))|^)(\d{3}[ \t]*\d{3}[ \t]*\d{4})(\s+|)|\d{7})", flags=re.M
     )
-
-    reg_number = db.Column("RegNumber", db.Text(), primary_key=True)
-    _nhs_number = db.Column("NHSNumber", utils.NHSNumber(), default="")
-    forename = db.Column("Forename", db.Text())
-    surname = db.Column("Surname", db.Text())
-    admission_date = db.Column("AdmissionDate", db.Date)
-    dob = db.Column("DateOfBirth", db.Date)
-    ward = db.Column(
-        "Ward", db.Enum(Ward, values_callable=lambda enum: [name.value for name in enum]),
-    )
-    room = db.Column("Room", db.Text())
-    _bed = db.Column("Bed", db.Text())
-    _reason_for_admission = db.Column("ReasonForAdmission", db.Text())
-    consultant = db.Column(
-        "Consultant",
-        db.Enum(Consultant, values_callable=lambda enum: [name.value for name in enum]),
+    # the surname and date of birth, as written by 'patient_details'
+    surname_pattern = re.compile(r"^\s*([^,\n]+),", flags=re.M)
+    dob_pattern = re.compile(r"\b(\d{2})/(\d{2})/(\d{4})\b")
+
+    reg_number = Column("RegNumber", Text(), primary_key=True)
+    _nhs_number = Column("NHSNumber", utils.NHSNumber(), default="")
+    forename = Column("Forename", Text())
+    surname = Column("Surname", Text())
+    admission_date = Column("AdmissionDate", Date)
+    dob = Column("DateOfBirth", Date)
+    ward = Column("Ward", Enum(Ward, values_callable=lambda enum: [name.value for name in enum]),)
+    room = Column("Room", Text())
+    _bed = Column("Bed", Text())
+    _reason_for_admission = Column("ReasonForAdmission", Text())
+    consultant = Column(
+        "Consultant", Enum(Consultant, values_callable=lambda enum: [name.value for name in enum]),
     )
 
     location = None
+    # set for patients who weren't on the previous list
+    is_new = False
+    # set when TrakCare shows the patient has changed ward, room or bed since the last run
+    moved = False
+    # the date that age, birthdays and length of stay are calculated on; defaults to today.
+    # stamp_batch sets it so that every patient in a batch uses the same date
+    as_of = None
+    # a precomputed bed sorting key, set by stamp_batch; see Location._bed_sort
+    bed_sort = None
+    # the original <w:tc> elements of the Issues to Bloods cells of a patient parsed from a
+    # handover list, so that they can be moved into the new list with their formatting
+    # intact; see HandoverList._parse_patients
+    carried_cells = None
+
+    # the mapped TrakCare columns, used to pass patients between processes as plain records
+    record_fields = (
+        "reg_number",
+        "_nhs_number",
+        "forename",
+        "surname",
+        "admission_date",
+        "dob",
+        "ward",
+        "room",
+        "_bed",
+        "_reason_for_admission",
+        "consultant",
+    )
 
     def __init__(
         self,
@@ -97,12 +127,16 @@ class Patient(db.Model):
             value = "".join(value.split())
         self._nhs_number = value
 
+    @property
+    def _today(self) -> datetime.date:
+        return self.as_of or datetime.date.today()
+
     @hybrid_property
     def age(self) -> int:
         if self.dob is None:
             return
 
-        today = datetime.date.today()
+        today = self._today
         return (
             today.year - self.dob.year - ((today.month, today.day) < (self.dob.month, self.dob.day))
         )
@@ -112,16 +146,14 @@ class Patient(db.Model):
         if not self.dob:
             return False
 
-        today = datetime.date.today()
-        birthday = self.dob.replace(year=today.year)
-        if today == birthday:
-            return True
-        return False
+        # compare the month and day rather than replacing the year, which fails for 29th Feb
+        today = self._today
+        return (today.month, today.day) == (self.dob.month, self.dob.day)
 
     @hybrid_property
     def length_of_stay(self) -> int:
         """Return the integer number of days since admission."""
-        return (datetime.date.today() - self.admission_date).days
+        return (self._today - self.admission_date).days
 
     @hybrid_property
     def list_name(self):
@@ -158,16 +190,11 @@ class Patient(db.Model):
 
     @hybrid_property
     def team(self):
-        for team in TeamEnum:
-            if self.consultant in team.consultants:
-                return team.name.value
-        else:
-            # this should be unreachable
-            pass
+        return CONSULTANT_TEAMS.get(self.consultant)
 
     @team.expression
     def team(cls):
-        return db.case(
+        return case(
             [
                 (
                     cls.consultant.in_(TeamEnum.from_team_name(TeamName.ARBAB.value).consultants),
@@ -206,7 +233,12 @@ class Patient(db.Model):
 
     @classmethod
     def from_table_row(cls, row):
-        """Return a Patient object from the information held in a table row.
+        """Return a Patient object from the information held in a table row."""
+        return cls.from_table_cells(row.cells)
+
+    @classmethod
+    def from_table_cells(cls, cells):
+        """Return a Patient object from the cells of a table row.
 
         Expects the row to be in the following format:
 
@@ -229,7 +261,7 @@ class Patient(db.Model):
         formatted list as possible in order to minimise parsing errors when
         trying to extract a patient from the Word list.
         """
-        patient_details = row.cells[1].text.strip()
+        patient_details = cells[1].text.strip()
         patient_id = cls.patient_id_pattern.search(patient_details)
 
         if patient_id is None:
@@ -242,12 +274,12 @@ class Patient(db.Model):
             # retrieves the NHS number from the successful regex match
             patient_id = patient_id[0]
 
-        issues = row.cells[2].text.strip()
-        progress = row.cells[3].text.strip()
-        jobs = row.cells[4].text.strip()
-        edd = row.cells[5].text.strip()
-        tta_ds = row.cells[6].text.strip()
-        bloods = row.cells[7].text.strip()
+        issues = cells[2].text.strip()
+        progress = cells[3].text.strip()
+        jobs = cells[4].text.strip()
+        edd = cells[5].text.strip()
+        tta_ds = cells[6].text.strip()
+        bloods = cells[7].text.strip()
 
         patient = cls(
             patient_id=patient_id,
@@ -260,7 +292,41 @@ class Patient(db.Model):
         )
 
         patient.is_new = False
+        patient.surname, patient.dob = cls._parse_surname_and_dob(patient_details)
+
+        return patient
 
+    @classmethod
+    def _parse_surname_and_dob(cls, patient_details: str):
+        """Return the (surname, date of birth) from a Patient Details cell, where they can be found.
+
+        These are only used to match up patients who have no identifier in common, so either
+        is None rather than an error if it can't be parsed.
+        """
+        surname = cls.surname_pattern.search(patient_details)
+        surname = surname[1].strip() if surname else None
+
+        dob = cls.dob_pattern.search(patient_details)
+        try:
+            dob = datetime.date(int(dob[3]), int(dob[2]), int(dob[1])) if dob else None
+        except ValueError:
+            dob = None
+        return surname, dob
+
+    def to_record(self) -> dict:
+        """Return the TrakCare columns of this patient as a plain, picklable dict."""
+        return {field: getattr(self, field) for field in self.record_fields}
+
+    @classmethod
+    def from_record(cls, record: dict):
+        """Return a transient Patient rebuilt from a record created by 'to_record'.
+
+        Like a row loaded by SQLAlchemy, __init__ is bypassed; the patient only carries
+        the TrakCare columns and is never attached to a database session.
+        """
+        patient = manager_of_class(cls).new_instance()
+        for field, value in record.items():
+            setattr(patient, field, value)
         return patient
 
     def merge(self, other_patient) -> None:
@@ -276,22 +342,32 @@ class Patient(db.Model):
         The result should be a fully populated Patient with an up to date location from TrakCare
         as well as up to date information about jobs, edd etc."""
         # the two Patients must represent the same underlying person
-        if self != other_patient:
+        if self.conflicts_with(other_patient):
             raise ValueError
 
-        attrs_to_merge = [
-            "reason_for_admission",
-            "progress",
-            "jobs",
-            "edd",
-            "tta_ds",
-            "bloods",
-            "is_new",
-        ]
-
-        for attr in attrs_to_merge:
-            other_pt_attr = getattr(other_patient, attr)
-            setattr(self, attr, other_pt_attr)
+        # copy the fields kept on the list directly, rather than looking each one up by name
+        self._reason_for_admission = other_patient._reason_for_admission
+        self.progress = other_patient.progress
+        self.jobs = other_patient.jobs
+        self.edd = other_patient.edd
+        self.tta_ds = other_patient.tta_ds
+        self.bloods = other_patient.bloods
+        self.is_new = other_patient.is_new
+        self.carried_cells = other_patient.carried_cells
+
+    def conflicts_with(self, other_patient) -> bool:
+        """Return whether the two patients have different NHS or Trak registration numbers.
+
+        A patient on a handover list may have only one of the two, in which case only the one
+        they both have is compared.
+        """
+        return any(
+            ours and theirs and ours != theirs
+            for ours, theirs in [
+                (self.nhs_number, other_patient.nhs_number),
+                (self.reg_number, other_patient.reg_number),
+            ]
+        )
 
     def __eq__(self, other):
         return isinstance(other, type(self)) and self.patient_id == other.patient_id
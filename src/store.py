@@ -0,0 +1,172 @@
+"""A small key-value store shared by every process of the web server.
+
+When the app is served by several worker processes, anything kept in memory by one worker
+is invisible to the others. State which must be shared between them (uploaded files,
+in-progress generation jobs and cached query results) is therefore kept here instead, in
+a local SQLite database which every worker opens independently.
+
+Values are bytes, optionally with an expiry time, and are grouped into namespaces.
+"""
+import contextlib
+import functools
+import json
+import logging
+import sqlite3
+import time
+
+from . import settings
+
+logger = logging.getLogger()
+
+
+class Store:
+    def __init__(self, path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            # write-ahead logging lets readers carry on whilst another process writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS store (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB,
+                    expires_at REAL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Yield a connection which commits on success and is always closed afterwards."""
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _expires_at(ttl):
+        return time.time() + ttl if ttl is not None else None
+
+    def get(self, namespace: str, key: str):
+        """Return the value stored against the key, or None if it is missing or expired."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM store WHERE namespace = ? AND key = ? "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, namespace: str, key: str, value: bytes, ttl: float = None) -> None:
+        """Store the value against the key, optionally expiring after 'ttl' seconds."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO store VALUES (?, ?, ?, ?)",
+                (namespace, key, value, self._expires_at(ttl)),
+            )
+
+    def add(self, namespace: str, key: str, value: bytes, ttl: float = None) -> bool:
+        """Store the value only if the key is not already present.
+
+        This is atomic across processes, so it can be used as a lock. Returns whether the
+        value was stored.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM store WHERE namespace = ? AND key = ? AND expires_at <= ?",
+                (namespace, key, time.time()),
+            )
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO store VALUES (?, ?, ?, ?)",
+                (namespace, key, value, self._expires_at(ttl)),
+            )
+        return cursor.rowcount == 1
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM store WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def delete_prefix(self, namespace: str, prefix: str) -> None:
+        """Delete every key in the namespace which starts with the given prefix."""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM store WHERE namespace = ? AND substr(key, 1, ?) = ?",
+                (namespace, len(prefix), prefix),
+            )
+
+    def purge_expired(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM store WHERE expires_at <= ?", (time.time(),))
+
+    def get_json(self, namespace: str, key: str):
+        value = self.get(namespace, key)
+        return json.loads(value) if value is not None else None
+
+    def set_json(self, namespace: str, key: str, value, ttl: float = None) -> None:
+        self.set(namespace, key, json.dumps(value).encode(), ttl=ttl)
+
+    def single_flight(self, namespace: str, key: str, compute, ttl: float, timeout: float = 120):
+        """Return the JSON value stored against the key, calling 'compute' to create it if needed.
+
+        However many processes or threads ask for the same missing key at once, 'compute'
+        is only called by one of them; the rest wait for its result. The result is kept
+        for 'ttl' seconds.
+        """
+        value = self.get_json(namespace, key)
+        if value is not None:
+            return value
+
+        lock_key = f"{namespace}:{key}"
+        if self.add("locks", lock_key, b"", ttl=timeout):
+            try:
+                value = compute()
+                self.set_json(namespace, key, value, ttl=ttl)
+                return value
+            finally:
+                self.delete("locks", lock_key)
+
+        logger.debug("Waiting for another worker to compute %s/%s", namespace, key)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            value = self.get_json(namespace, key)
+            if value is not None:
+                return value
+            if self.add("locks", lock_key, b"", ttl=timeout):
+                # the other worker gave up without storing a result, so take over
+                self.delete("locks", lock_key)
+                return self.single_flight(namespace, key, compute, ttl, timeout)
+
+        raise TimeoutError(f"Timed out waiting for {namespace}/{key}")
+
+    def in_flight(self, namespace: str, key: str) -> bool:
+        """Return whether a 'single_flight' call is computing the value of the key right now."""
+        return self.get("locks", f"{namespace}:{key}") is not None
+
+    def cached(self, ttl: float):
+        """Cache a function's JSON-serialisable return value in the store for 'ttl' seconds.
+
+        The cache is shared by every worker process, and a stale value is only recomputed
+        once however many callers ask for it at the same time.
+        """
+
+        def decorator(fn):
+            prefix = f"{fn.__module__}.{fn.__qualname__}"
+
+            @functools.wraps(fn)
+            def wrapper(*args):
+                key = f"{prefix}{args!r}"
+                return self.single_flight("cache", key, lambda: fn(*args), ttl=ttl)
+
+            wrapper.cache_clear = lambda: self.delete_prefix("cache", prefix)
+            return wrapper
+
+        return decorator
+
+
+store = Store(settings.CACHE_DIR / "store.sqlite3")
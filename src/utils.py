@@ -1,12 +1,14 @@
+import contextlib
+import datetime
 import functools
 import logging
 import sys
+import time
 
 from sqlalchemy import Text
 from sqlalchemy.types import TypeDecorator
 
 from . import settings
-from .front_end.pages.enums import Element as El
 
 logger = logging.getLogger()
 
@@ -38,18 +40,63 @@ def generate_file_stem(team, date):
     return f"{date:%d-%m-%Y}_{team.name}".lower()
 
 
-def init_logging(app):
+def find_previous_list(team, date):
+    """Return the path to the team's most recent handover list before the given date.
+
+    Searches back up to a week for a handover list identified by the filename format
+    produced by 'generate_file_stem'. Returns None if no list is found.
+    """
+    for n_days in range(1, 7):
+        previous_day = date - datetime.timedelta(days=n_days)
+        current_team_list_dir = build_team_file_path(team, previous_day)
+
+        # make the folder first if it doesn't exist
+        current_team_list_dir.mkdir(parents=True, exist_ok=True)
+
+        for file in current_team_list_dir.iterdir():
+            if file.stem == generate_file_stem(team, previous_day):
+                return file
+
+    return None
+
+
+@contextlib.contextmanager
+def log_duration(description, since=None):
+    """Log how long the enclosed block takes to run.
+
+    If 'since' (a time.perf_counter() value) is given, the start and end of the block are
+    also logged relative to it, which makes it easy to see where phases overlap.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        if since is None:
+            logger.info("%s took %.1f ms", description, (end - start) * 1000)
+        else:
+            logger.info(
+                "%s took %.1f ms (+%.1f ms to +%.1f ms)",
+                description,
+                (end - start) * 1000,
+                (start - since) * 1000,
+                (end - since) * 1000,
+            )
+
+
+def init_logging(app=None, level=logging.DEBUG):
     # set up a standard logger to stdout
     logging.basicConfig(
         format="%(asctime)s:%(levelname)s:%(name)s:%(filename)s:%(lineno)s: %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
         stream=sys.stdout,
-        level=logging.DEBUG,
+        level=level,
     )
 
-    # get rid of the default Dash logging handler - it only duplicates
-    # some logs but without nice formatting
-    app.logger.handlers.pop()
+    if app is not None:
+        # get rid of the default Dash logging handler - it only duplicates
+        # some logs but without nice formatting
+        app.logger.handlers.pop()
 
     # raise the log level of the werkzeug level so we don't get spammed by it
     werkzeug_logger = logging.getLogger("werkzeug")
@@ -72,6 +119,9 @@ def log_callback(fn):
 
 def parse_trigger(ctx):
     """Return the triggering Element for a callback."""
+    # imported here, as importing anything from the front_end package builds the Dash app
+    from .front_end.pages.enums import Element as El
+
     trigger = ctx.triggered[0]["prop_id"].split(".")[0]
     if not trigger:
         return None
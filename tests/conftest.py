@@ -3,11 +3,12 @@ from pathlib import Path
 
 import pytest
 
-from src.front_end import callbacks  # noqa required to avoid circular imports
+from src import database
 from src.list_generator.models import HandoverList, PatientList
 from src.shared_enums import Team, Ward
 from src.shared_models import Patient
-from src.front_end.app import db
+
+database.init_db()
 
 
 @pytest.fixture
@@ -118,13 +119,13 @@ def add_patient_to_trak(**kwargs):
 
     stmt = Patient.__table__.insert()
 
-    with db.engine.connect() as conn:
+    with database.engine.connect() as conn:
         conn.execute(stmt, values)
 
 
 def clear_db():
     Patient.query.delete()
-    db.session.commit()
+    database.session.commit()
 
 
 def get_header_text(handover_list):
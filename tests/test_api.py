@@ -0,0 +1,60 @@
+import datetime
+import gzip
+
+from src import settings, utils
+from src.front_end import api, app
+from src.list_generator import preview, snapshot
+from src.shared_enums import Consultant, Team, Ward
+
+from .test_snapshot import trak_patient
+
+
+def test_team_and_ward_patients(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LIST_ROOT_DIR", tmp_path)
+    api.cache.clear()
+    team = Team.RESPIRATORY.value
+    smith = trak_patient("1111111", Ward.TARKA, "Bay 02 TA", "Bed2B", Consultant.ALISON_MOODY)
+    smith._nhs_number = "123 456 7890"
+    snapshot.record(
+        [
+            smith,
+            trak_patient("2222222", Ward.TARKA, "Room 04 TA", "Bed01", Consultant.ALISON_MOODY),
+            trak_patient("3333333", Ward.TARKA, "Bay 03 TA", "Bed3A", Consultant.RIAZ_LATIF),
+        ]
+    )
+    today = datetime.date.today()
+    list_path = (
+        utils.build_team_file_path(team, today) / f"{utils.generate_file_stem(team, today)}.docm"
+    )
+    preview.write(
+        list_path,
+        [
+            {"kind": "ward", "bed": "Tarka"},
+            {"kind": "patient", "bed": "2B", "patient details": "SMITH, John\n123 456 7890"},
+        ],
+    )
+    client = app.server.test_client()
+
+    response = client.get("/api/teams/respiratory/patients")
+    assert response.status_code == 200
+    patients = response.get_json()["patients"]
+    assert [patient["reg_number"] for patient in patients] == ["1111111", "2222222"]
+    assert patients[0]["handover"] == {"bed": "2B", "patient details": "SMITH, John\n123 456 7890"}
+    assert patients[1]["handover"] is None
+
+    # polling an unchanged list is answered without a body, and never reloads the patients
+    monkeypatch.setattr(api.current, "load", None)
+    response = client.get(
+        "/api/teams/respiratory/patients", headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert response.status_code == 304
+    assert response.data == b""
+
+    response = client.get("/api/wards/tarka/patients", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Last-Modified"]
+    patients = gzip.decompress(response.data)
+    assert patients.count(b'"reg_number"') == 3
+
+    assert client.get("/api/teams/unknown/patients").status_code == 404
+    assert client.get("/api/wards/unknown/patients").status_code == 404
@@ -0,0 +1,79 @@
+import datetime
+import io
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src import settings, utils
+from src.list_generator import archive, generate_list
+from src.shared_enums import Team
+
+from .conftest import add_patient_to_trak, clear_db
+
+
+@pytest.fixture
+def list_root_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LIST_ROOT_DIR", tmp_path / "lists")
+    monkeypatch.setattr(settings, "CACHE_DIR", tmp_path / "cache")
+    return tmp_path / "lists"
+
+
+def generate_todays_list():
+    input_list = Path(__file__).parent / "assets" / "empty_list.docm"
+    with open(input_list, "rb") as fh:
+        return generate_list(Team.RESPIRATORY.value, io.BytesIO(fh.read()), Path(input_list.name))
+
+
+def test_generate_list_adds_the_list_to_the_index(list_root_dir):
+    add_patient_to_trak()
+    output_file_path = generate_todays_list()
+    index = archive.ArchiveIndex()
+
+    (entry,) = index.search("123 456 7899")
+    assert entry["date"] == datetime.date.today().isoformat()
+    assert (entry["team"], entry["path"]) == ("Respiratory", str(output_file_path))
+    # stored in capitals, as it is when the list is indexed from the file
+    assert (entry["surname"], entry["dob"], entry["issues"]) == ("SMITH", "1956-05-14", "Unwell")
+
+    # every word matches the start of a word in any column
+    assert index.search("smi unw") == [entry]
+    assert index.search("smith cardiac") == []
+    assert index.search("smith", team=Team.STROKE.value) == []
+    # anything which would be FTS5 syntax is searched for as it is
+    assert index.search('smith" OR "') == []
+
+    clear_db()
+
+
+def test_update_indexes_new_and_changed_lists(list_root_dir):
+    add_patient_to_trak()
+    todays_list = generate_todays_list()
+    team = Team.RESPIRATORY.value
+    yesterday = datetime.date.today() - datetime.timedelta(days=1)
+    yesterdays_list = (
+        utils.build_team_file_path(team, yesterday) / utils.generate_file_stem(team, yesterday)
+    ).with_suffix(".docm")
+    yesterdays_list.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy(todays_list, yesterdays_list)
+    # anything not named as generate_list names lists is left out
+    (todays_list.parent / "notes.docx").write_bytes(b"")
+
+    index = archive.ArchiveIndex(list_root_dir.parent / "archive.sqlite3")
+    assert index.update(max_workers=2) == {"indexed": 2, "unchanged": 0, "removed": 0, "failed": 0}
+    # both lists are parsed from the share, and the most recent is found first
+    entries = index.search("1234567899")
+    assert [entry["path"] for entry in entries] == [str(todays_list), str(yesterdays_list)]
+    assert entries[0]["surname"] == "SMITH"
+
+    assert index.update() == {"indexed": 0, "unchanged": 2, "removed": 0, "failed": 0}
+
+    # a list which can't be parsed keeps what was indexed for it until it can be
+    yesterdays_list.write_bytes(b"this is not a Word document")
+    assert index.update() == {"indexed": 0, "unchanged": 1, "removed": 0, "failed": 1}
+    assert len(index.search("1234567899")) == 2
+    yesterdays_list.unlink()
+    assert index.update() == {"indexed": 0, "unchanged": 1, "removed": 1, "failed": 0}
+    assert len(index.search("1234567899")) == 1
+
+    clear_db()
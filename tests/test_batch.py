@@ -0,0 +1,42 @@
+import datetime
+
+from src.list_generator.batch import stamp_batch
+from src.shared_enums import Ward
+from src.shared_models import Patient
+
+
+def trak_patient(reg_number, dob, ward, room, bed, consultant):
+    return Patient.from_record(
+        {
+            "reg_number": reg_number,
+            "_nhs_number": "",
+            "dob": dob,
+            "admission_date": datetime.date(2020, 6, 10),
+            "ward": ward,
+            "room": room,
+            "_bed": bed,
+            "consultant": consultant,
+        }
+    )
+
+
+def test_stamp_batch():
+    as_of = datetime.date(2020, 6, 15)
+    patients = [
+        trak_patient(
+            "1111111", datetime.date(1950, 6, 15), Ward.TARKA, "Room 04 TA", "Bed01", None
+        ),
+        trak_patient("2222222", datetime.date(1960, 6, 16), Ward.LUNDY, "Bay 1 LU", "BedA", None),
+        trak_patient("3333333", None, Ward.STAPLES, "Bay 4 STA", "Bed E", None),
+        trak_patient("4444444", None, Ward.STAPLES, None, None, None),
+    ]
+
+    stamp_batch(patients, as_of=as_of)
+
+    # every patient works out their age and birthday on the same date
+    assert [patient.age for patient in patients] == [70, 59, None, None]
+    assert [patient.is_birthday for patient in patients] == [True, False, False, False]
+    for patient in patients[:3]:
+        assert patient.as_of == as_of
+        assert patient.bed_sort == patient.location._bed_sort
+    assert patients[3].bed_sort is None
@@ -0,0 +1,96 @@
+import io
+from pathlib import Path
+
+from src.list_generator.cache import ParsedListCache, parsed_lists
+from src.list_generator.models import HandoverList
+from src.shared_enums import Team
+
+from .conftest import add_patient_to_trak, clear_db, get_last_patient_row
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ParsedListCache(max_bytes=100)
+    cache.put("a", ["document a"], size=40)
+    cache.put("b", ["document b"], size=40)
+
+    # using "a" makes "b" the least recently used, so "b" is evicted to make room for "c"
+    assert cache.get("a") == ["document a"]
+    cache.put("c", ["document c"], size=40)
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.total_bytes == 80
+
+    # documents larger than the whole cache aren't cached at all
+    cache.put("d", ["document d"], size=101)
+    assert "d" not in cache
+
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.hit_rate == 0.5
+
+
+def test_cache_gives_each_caller_its_own_copy():
+    cache = ParsedListCache(max_bytes=100)
+    document = ["original"]
+    cache.put("a", document, size=1)
+    document.append("changed by the caller")
+
+    copy = cache.get("a")
+    assert copy == ["original"]
+    copy.append("changed by another caller")
+    assert cache.get("a") == ["original"]
+
+
+def test_handover_list_parsed_from_cache():
+    parsed_lists.clear()
+    add_patient_to_trak()
+    contents = (Path(__file__).parent / "assets" / "empty_list.docm").read_bytes()
+
+    for _ in range(2):
+        handover_list = HandoverList(
+            Team.RESPIRATORY.value, io.BytesIO(contents), "empty_list.docm", cache_key="key"
+        )
+        handover_list.update()
+        assert "SMITH, John" in get_last_patient_row(handover_list).cells[1].text
+        # the updated list can be saved just as if it had been parsed from the file
+        handover_list.save(io.BytesIO())
+
+    assert (parsed_lists.hits, parsed_lists.misses) == (1, 1)
+    clear_db()
+
+
+def test_patients_parsed_from_cache():
+    parsed_lists.clear()
+    add_patient_to_trak()
+    empty_list = Path(__file__).parent / "assets" / "empty_list.docm"
+    handover_list = HandoverList(Team.RESPIRATORY.value, empty_list, empty_list.name)
+    handover_list.update()
+    get_last_patient_row(handover_list).cells[4].text = "Chase bloods"
+    contents = io.BytesIO()
+    handover_list.save(contents)
+
+    parsed, cached = [
+        HandoverList(
+            Team.RESPIRATORY.value, io.BytesIO(contents.getvalue()), "list.docm", cache_key="key"
+        )
+        for _ in range(2)
+    ]
+    assert (parsed_lists.hits, parsed_lists.misses) == (1, 1)
+
+    # the patients are the same as those parsed from the table, and their carried cells
+    # belong to the copy of the document they were given
+    ((parsed_patient,), (cached_patient,)) = (parsed.patients, cached.patients)
+    for attr in ("nhs_number", "reason_for_admission", "jobs", "surname", "dob", "is_new"):
+        assert getattr(cached_patient, attr) == getattr(parsed_patient, attr)
+    body = cached.doc.element.body
+    assert all(
+        tc.getroottree().getroot() is body.getparent() for tc in cached_patient.carried_cells
+    )
+
+    # and the updated list is saved with them
+    cached.update()
+    saved = io.BytesIO()
+    cached.save(saved)
+    saved_list = HandoverList(Team.RESPIRATORY.value, saved, "saved.docm")
+    assert get_last_patient_row(saved_list).cells[4].text == "Chase bloods"
+
+    clear_db()
@@ -0,0 +1,37 @@
+import datetime
+
+from src.list_generator import census
+
+from .conftest import add_patient_to_trak, clear_db
+
+
+def test_census_counts_outliers_and_length_of_stay():
+    today = datetime.date.today()
+    # two respiratory patients on their home ward and one outlier, plus one stroke patient
+    add_patient_to_trak(RegNumber="1111111", Ward="Tarka", AdmissionDate=today)
+    add_patient_to_trak(RegNumber="2222222", Ward="Tarka", AdmissionDate=today)
+    add_patient_to_trak(
+        RegNumber="3333333", Ward="Capener", AdmissionDate=today - datetime.timedelta(days=30)
+    )
+    add_patient_to_trak(RegNumber="4444444", Ward="Staples", Consultant="Dr Riaz Latif")
+
+    census.get_census.cache_clear()
+    figures = census.get_census()
+
+    respiratory = next(team for team in figures["teams"] if team["team"] == "Respiratory")
+    assert respiratory["patients"] == 3
+    assert respiratory["outliers"] == 1
+    assert respiratory["outlier_wards"] == 1
+    assert respiratory["median_length_of_stay"] == 0
+
+    respiratory_wards = [row for row in figures["wards"] if row["team"] == "Respiratory"]
+    assert [(row["ward"], row["patients"]) for row in respiratory_wards] == [
+        ("Tarka", 2),
+        ("Capener", 1),
+    ]
+
+    assert figures["length_of_stay"]["Respiratory"] == [2, 0, 0, 0, 0, 1]
+
+    # the figures are cached, so a change on TrakCare isn't seen straight away
+    clear_db()
+    assert census.get_census() == figures
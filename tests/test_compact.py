@@ -0,0 +1,58 @@
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+from .conftest import add_patient_to_trak, clear_db, get_last_patient_row
+
+
+def test_compact_strips_cruft(empty_list):
+    add_patient_to_trak()
+    empty_list.update()
+
+    # the jobs, as Word might leave them after a clinician has edited them a few times
+    row = get_last_patient_row(empty_list)
+    paragraph = row.cells[4].paragraphs[0]
+    for text in ["Chase ", "", "CXR"]:
+        paragraph.add_run(text).bold = True
+        paragraph._p.r_lst[-1].set(qn("w:rsidR"), "00A1B2C3")
+    paragraph._p.insert(1, parse_xml(f'<w:proofErr {nsdecls("w")} w:type="spellStart"/>'))
+    row._tr.trPr.append(parse_xml(f"<w:cantSplit {nsdecls('w')}/>"))
+    empty_list.styles.add_style("Pasted", WD_STYLE_TYPE.PARAGRAPH)
+
+    parts = [part for part in empty_list.part.package.iter_parts() if hasattr(part, "element")]
+    text_before = [[t.text for t in part.element.iter(qn("w:t"))] for part in parts]
+
+    report = empty_list.compact()
+
+    # none of the text has changed...
+    assert ["".join(text) for text in text_before] == [
+        "".join(t.text for t in part.element.iter(qn("w:t"))) for part in parts
+    ]
+
+    row = get_last_patient_row(empty_list)
+    (run,) = row.cells[4].paragraphs[0].runs
+    assert run.text == "Chase CXR"
+    assert run.bold
+    assert len(row._tr.trPr.findall(qn("w:cantSplit"))) == 1
+    assert "Pasted" not in [style.name for style in empty_list.styles]
+    assert "Normal" in [style.name for style in empty_list.styles]
+    assert report.removed["proofing marks"] == 1
+    assert report.removed["unused styles"] == 1
+    assert report.bytes_saved > 0
+
+    clear_db()
+
+
+def test_format_doesnt_repeat_row_properties(empty_list):
+    add_patient_to_trak()
+    empty_list.update()
+    # the column headers are carried over to the next day's list, and formatted again
+    empty_list.patients = empty_list._parse_patients()
+    empty_list.update()
+
+    for row in empty_list._handover_table.rows:
+        assert len(row._tr.trPr.findall(qn("w:cantSplit"))) == 1
+    header_trPr = empty_list._handover_table.rows[0]._tr.trPr
+    assert len(header_trPr.findall(qn("w:tblHeader"))) == 1
+
+    clear_db()
@@ -0,0 +1,47 @@
+from src import settings
+from src.front_end import app, downloads
+from src.list_generator import preview
+
+
+def test_download_is_conditional(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LIST_ROOT_DIR", tmp_path)
+    path = tmp_path / "19-10-2026_respiratory.docm"
+    path.write_bytes(b"0123456789")
+    client = app.server.test_client()
+
+    response = client.get(f"/download/{downloads.register(path)}")
+    assert response.status_code == 200
+    assert response.data == b"0123456789"
+    assert response.headers["Content-Length"] == "10"
+    assert "19-10-2026_respiratory.docm" in response.headers["Content-Disposition"]
+
+    # a repeat download of the same list isn't sent again
+    etag = response.headers["ETag"]
+    response = client.get(f"/download/{downloads.register(path)}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = client.get(f"/download/{downloads.register(path)}", headers={"Range": "bytes=4-"})
+    assert response.status_code == 206
+    assert response.data == b"456789"
+
+    assert client.get("/download/unknown").status_code == 404
+
+    # keys can't be worked out from the path, but are kept for as long as they're valid
+    assert downloads.register(path) == downloads.register(path)
+    assert downloads.register(path) != downloads.register(tmp_path / "other.docm")
+
+
+def test_print_view_and_export(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LIST_ROOT_DIR", tmp_path)
+    path = tmp_path / "19-10-2026_respiratory.docm"
+    preview.write(path, [{"kind": "ward", "bed": "Tarka"}, {"kind": "patient", "bed": "3F"}])
+    key = downloads.register(path)
+    client = app.server.test_client()
+
+    response = client.get(f"/print/{key}")
+    assert response.status_code == 200
+    assert "<td>3F</td>" in response.data.decode()
+
+    response = client.get(f"/export/{key}.csv")
+    assert response.data.decode().splitlines()[1].startswith("Tarka,3F")
+    assert client.get(f"/export/{key}.docx").status_code == 404
@@ -0,0 +1,101 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from src import settings
+from src.list_generator import generate_all, generate_list, prewarm, preview
+from src.list_generator.__main__ import main
+from src.shared_enums import Team
+
+from .conftest import add_patient_to_trak, clear_db
+
+
+@pytest.fixture
+def list_root_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LIST_ROOT_DIR", tmp_path)
+    return tmp_path
+
+
+def test_generate_all_isolates_failures(list_root_dir):
+    add_patient_to_trak()
+
+    good_list = Path(__file__).parent / "assets" / "empty_list.docm"
+    malformed_list = list_root_dir / "malformed_list.docm"
+    malformed_list.write_bytes(b"this is not a Word document")
+
+    results = generate_all(
+        {Team.RESPIRATORY.value: good_list, Team.STROKE.value: malformed_list}, max_workers=2
+    )
+
+    respiratory, stroke = results
+    assert respiratory.team == Team.RESPIRATORY.value
+    assert respiratory.ok
+    assert respiratory.output_file_path.exists()
+
+    assert stroke.team == Team.STROKE.value
+    assert not stroke.ok
+    assert stroke.output_file_path is None
+
+    clear_db()
+
+
+def test_generate_list_skips_unchanged_list(list_root_dir):
+    add_patient_to_trak()
+    input_list = Path(__file__).parent / "assets" / "empty_list.docm"
+
+    def generate(**kwargs):
+        with open(input_list, "rb") as fh:
+            return generate_list(
+                Team.RESPIRATORY.value, io.BytesIO(fh.read()), Path(input_list.name), **kwargs
+            )
+
+    output_file_path = generate()
+    first_mtime = output_file_path.stat().st_mtime_ns
+    # the list is saved locally as well, for downloading without reading it from the share
+    assert prewarm.local_copy(output_file_path) != output_file_path
+
+    # nothing has changed, so the existing list is returned as it is
+    assert generate() == output_file_path
+    assert output_file_path.stat().st_mtime_ns == first_mtime
+
+    # unless the user asks for it to be regenerated anyway...
+    generate(force=True)
+    assert output_file_path.stat().st_mtime_ns != first_mtime
+
+    # ...or a patient has changed on TrakCare
+    second_mtime = output_file_path.stat().st_mtime_ns
+    add_patient_to_trak(RegNumber="7654321", NHSNumber="9876543210")
+    generate()
+    assert output_file_path.stat().st_mtime_ns != second_mtime
+
+    # ...or the list is to be laid out differently
+    third_mtime = output_file_path.stat().st_mtime_ns
+    generate(per_ward_tables=True)
+    assert output_file_path.stat().st_mtime_ns != third_mtime
+
+    clear_db()
+
+
+def test_generate_list_writes_preview(list_root_dir):
+    add_patient_to_trak()
+    input_list = Path(__file__).parent / "assets" / "empty_list.docm"
+
+    with open(input_list, "rb") as fh:
+        output_file_path = generate_list(
+            Team.RESPIRATORY.value, io.BytesIO(fh.read()), Path(input_list.name)
+        )
+
+    ward_header, patient_row = preview.read(output_file_path)
+    assert ward_header == {"kind": "ward", "bed": "Capener"}
+    assert patient_row["patient details"].startswith("SMITH, John")
+    assert (patient_row["issues"], patient_row["flags"]) == ("Unwell", "new")
+
+    clear_db()
+
+
+def test_cli_reports_missing_previous_list(list_root_dir, capsys):
+    exit_code = main(["--team", "stroke"])
+
+    assert exit_code == 1
+    assert "no previous handover list found" in capsys.readouterr().out
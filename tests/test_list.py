@@ -1,6 +1,13 @@
 import datetime
+import zipfile
+from pathlib import Path
 
-from src.front_end.app import db
+from docx.shared import RGBColor
+
+from src import database
+from src.list_generator.models import HandoverList
+from src.list_generator.snapshot import SnapshotDiff, SnapshotRow
+from src.shared_enums import Team
 
 from .conftest import (
     add_patient_to_trak,
@@ -44,7 +51,7 @@ def test_footer_content_updated(empty_list):
     DELETE FROM vwPathologyCurrentInpatients WHERE vwPathologyCurrentInpatients.RegNumber = '123456'
     """
 
-    with db.engine.connect() as conn:
+    with database.engine.connect() as conn:
         conn.execute(stmt)
 
     # force the internal patient list to be parsed from the new list
@@ -57,6 +64,36 @@ def test_footer_content_updated(empty_list):
     assert "0 patients (0 new)" in new_footer_text
 
 
+def test_footer_ward_counts(empty_list):
+    # one patient on the home ward, and two outliers on another
+    add_patient_to_trak(Ward="Tarka", Room="Bay 02 TA", Bed="Bed2B")
+    add_patient_to_trak(RegNumber="2222222", NHSNumber="2222222222", Ward="Capener")
+    add_patient_to_trak(RegNumber="3333333", NHSNumber="3333333333", Ward="Capener", Bed="Bed02")
+
+    empty_list.update()
+
+    assert "Tarka 1 · Capener 2 · 2 outliers" in get_footer_text(empty_list)
+
+    clear_db()
+
+
+def test_footer_discharge_count(empty_list):
+    discharged = SnapshotRow("2222222", "2222222222", "Tarka", "Bay 02 TA", "Bed2B", None, None)
+    friday = datetime.datetime(2020, 6, 12, 17, 30)
+    changes = SnapshotDiff(
+        {"2222222": discharged}, {}, previous_taken_at=friday, taken_at=datetime.datetime.now()
+    )
+
+    empty_list.update(trakcare_patients=[], changes=changes)
+
+    # the discharges are counted from the snapshot they're compared with, whenever that was
+    assert "0 moved · 1 discharged since 17:30 12/06/2020" in get_footer_text(empty_list)
+
+    # and without an earlier snapshot, there's nothing to count them from
+    empty_list.update(trakcare_patients=[], changes=SnapshotDiff({}, {}))
+    assert "discharged" not in get_footer_text(empty_list)
+
+
 def test_new_patient_is_bold(empty_list):
     # add a patient to TrakCare and put them on the list; they should be bold
     add_patient_to_trak()
@@ -94,6 +131,65 @@ def test_old_patient_not_bold(empty_list):
     clear_db()
 
 
+def test_old_patient_keeps_cell_formatting(empty_list):
+    add_patient_to_trak()
+    empty_list.update()
+
+    # a clinician adds a job in red to the new patient
+    row = get_last_patient_row(empty_list)
+    run = row.cells[4].paragraphs[0].add_run("Chase CXR")
+    run.font.color.rgb = RGBColor(0xFF, 0x00, 0x00)
+
+    empty_list.patients = empty_list._parse_patients()
+    empty_list.update()
+
+    row = get_last_patient_row(empty_list)
+    # the patient is no longer new, so the generator's bold is removed from every cell...
+    assert not any(run.bold for run in row.cells[0].paragraphs[0].runs)
+    # ...but the job has been carried over from the previous list exactly as it was written
+    (run,) = row.cells[4].paragraphs[0].runs
+    assert run.text == "Chase CXR"
+    assert run.font.color.rgb == RGBColor(0xFF, 0x00, 0x00)
+
+    # once the patient is no longer new, bold added by a clinician is kept too
+    run.bold = True
+    empty_list.patients = empty_list._parse_patients()
+    empty_list.update()
+
+    (run,) = get_last_patient_row(empty_list).cells[4].paragraphs[0].runs
+    assert run.bold
+    assert run.font.color.rgb == RGBColor(0xFF, 0x00, 0x00)
+
+    clear_db()
+
+
+def test_low_memory_list_keeps_binary_parts(tmp_path):
+    add_patient_to_trak()
+    input_path = Path(__file__).parent / "assets" / "empty_list.docm"
+    output_path = tmp_path / "list.docm"
+
+    with open(input_path, "rb") as fh:
+        handover_list = HandoverList(Team.RESPIRATORY.value, fh, input_path.name, low_memory=True)
+        # the macros are binary, so they aren't kept in memory...
+        (vba_project,) = [
+            part
+            for part in handover_list.doc.part.package.iter_parts()
+            if part.partname == "/word/vbaProject.bin"
+        ]
+        assert vba_project.blob == b""
+        handover_list.update()
+        handover_list.save(output_path)
+
+    # ...but are copied across from the input list when it's saved
+    with zipfile.ZipFile(input_path) as input_zip, zipfile.ZipFile(output_path) as output_zip:
+        assert output_zip.read("word/vbaProject.bin") == input_zip.read("word/vbaProject.bin")
+
+    saved_list = HandoverList(Team.RESPIRATORY.value, output_path, output_path.name)
+    assert "SMITH, John" in get_last_patient_row(saved_list).cells[1].text
+
+    clear_db()
+
+
 def test_patient_birthday_row(empty_list):
     # if it is a patient's birthday, the row above will be full width and have
     # an short, italicised birthday message
@@ -122,3 +218,46 @@ def test_not_patient_birthday_row(empty_list):
     assert "birthday" not in row_above.cells[0].text
 
     clear_db()
+
+
+def ward_paragraphs(handover_list, style_name):
+    return [p.text for p in handover_list.paragraphs if p.style.name == style_name]
+
+
+def test_per_ward_tables_round_trip(empty_list):
+    add_patient_to_trak()
+    add_patient_to_trak(
+        RegNumber="7654321",
+        NHSNumber="9876543210",
+        Ward="Tarka",
+        Room="Bay 02 TA",
+        Bed="Bed2B",
+        DateOfBirth=datetime.date.today().replace(year=1950),
+    )
+    empty_list.per_ward_tables = True
+    empty_list.update()
+
+    # a table per ward, each under a heading, with no full-width rows
+    assert len(empty_list.tables) == 2
+    assert ward_paragraphs(empty_list, "Ward Heading") == ["Tarka", "Capener"]
+    (birthday,) = ward_paragraphs(empty_list, "Ward Birthday")
+    assert "birthday" in birthday
+    for table in empty_list.tables:
+        assert all(len(row._tr.tc_lst) == 8 for row in table.rows)
+
+    # the list can be read back and generated again, in either layout
+    empty_list.patients = empty_list._parse_patients()
+    assert len(empty_list.patients) == 2
+    empty_list.update()
+    assert len(empty_list.tables) == 2
+    assert ward_paragraphs(empty_list, "Ward Heading") == ["Tarka", "Capener"]
+
+    empty_list.per_ward_tables = False
+    empty_list.patients = empty_list._parse_patients()
+    empty_list.update()
+    assert len(empty_list.tables) == 1
+    assert ward_paragraphs(empty_list, "Ward Heading") == []
+    assert ward_paragraphs(empty_list, "Ward Birthday") == []
+    assert len(empty_list.patients) == 2
+
+    clear_db()
@@ -309,6 +309,27 @@ def test_patient_list_contains_patient(empty_patient_list, patient):
     assert patient.nhs_number in empty_patient_list
 
 
+def test_patient_list_counts(empty_patient_list):
+    # the list's home ward is Glossop
+    home_patient = Patient("111 111 1111")
+    home_patient.ward = Ward.GLOSSOP
+    new_outlier = Patient("222 222 2222")
+    new_outlier.ward, new_outlier.is_new, new_outlier.moved = Ward.TARKA, True, True
+
+    empty_patient_list.extend([new_outlier, home_patient])
+    assert (empty_patient_list.new_count, empty_patient_list.moved_count) == (1, 1)
+    assert empty_patient_list.outlier_count == 1
+    assert empty_patient_list.ward_counts() == [(Ward.GLOSSOP, 1), (Ward.TARKA, 1)]
+
+    # replacing a patient takes the old one out of the counts
+    replacement = Patient("222 222 2222")
+    replacement.ward = Ward.GLOSSOP
+    empty_patient_list.append(replacement)
+    assert (empty_patient_list.new_count, empty_patient_list.moved_count) == (0, 0)
+    assert empty_patient_list.outlier_count == 0
+    assert empty_patient_list.ward_counts() == [(Ward.GLOSSOP, 2)]
+
+
 def test_patient_list_len(empty_patient_list, patient):
     assert len(empty_patient_list) == 0
 
@@ -323,3 +344,97 @@ def test_patient_list_iter(empty_patient_list, patient):
 
     for list_pt, other_pt in zip(empty_patient_list, [patient, patient_2]):
         assert list_pt == other_pt
+
+
+def test_parse_surname_and_dob_from_table_cell():
+    class MockCell:
+        def __init__(self, contents):
+            self.text = contents
+
+    row = ["1A", "1111111111\nO'SULLIVAN, Ronald\n05/03/1950 (70 Yrs)", *[""] * 6]
+    pt = Patient.from_table_cells([MockCell(text) for text in row])
+    assert (pt.surname, pt.dob) == ("O'SULLIVAN", date(1950, 3, 5))
+
+    row[1] = "1111111111"
+    pt = Patient.from_table_cells([MockCell(text) for text in row])
+    assert (pt.surname, pt.dob) == (None, None)
+
+
+def test_patient_list_keeps_patients_without_nhs_numbers(empty_patient_list):
+    patients = [Patient("A123456"), Patient("B123456")]
+    empty_patient_list.extend(patients)
+
+    assert empty_patient_list.patients == patients
+    assert empty_patient_list["B123456"] is patients[1]
+
+
+def test_patient_list_finds_patient_by_any_identifier(empty_patient_list):
+    by_reg_number = Patient("A123456")
+    by_name_and_dob = Patient("222 222 2222")
+    by_name_and_dob.surname, by_name_and_dob.dob = "O'Sullivan", date(1950, 3, 5)
+    empty_patient_list.extend([by_reg_number, by_name_and_dob])
+
+    # the first patient's NHS number isn't on the list, so they're matched by reg number
+    trakcare_patient = Patient("111 111 1111")
+    trakcare_patient.reg_number = "A123456"
+    assert empty_patient_list[trakcare_patient] is by_reg_number
+
+    # the second patient has no NHS number on TrakCare, and their reg number isn't on the
+    # list, so the match falls back to their surname and date of birth
+    trakcare_patient = Patient("B123456")
+    trakcare_patient.surname, trakcare_patient.dob = "OSULLIVAN", date(1950, 3, 5)
+    assert empty_patient_list[trakcare_patient] is by_name_and_dob
+
+    # but a patient with a different NHS number isn't the same person, whatever their name
+    trakcare_patient.nhs_number = "333 333 3333"
+    assert trakcare_patient not in empty_patient_list
+
+
+def test_patient_list_detects_collisions(empty_patient_list):
+    twins = [Patient("111 111 1111"), Patient("222 222 2222")]
+    for twin in twins:
+        twin.surname, twin.dob = "Smith", date(1990, 1, 1)
+    empty_patient_list.extend(twins)
+
+    assert len(empty_patient_list) == 2
+    assert [key for key, _, _ in empty_patient_list.collisions] == [
+        ("surname_dob", "smith", date(1990, 1, 1))
+    ]
+
+    # the shared surname and DOB no longer identify either twin
+    someone = Patient("A123456")
+    someone.surname, someone.dob = "Smith", date(1990, 1, 1)
+    assert someone not in empty_patient_list
+
+
+def test_patient_list_only_replaces_the_same_patient_id(empty_patient_list):
+    by_nhs_number, by_reg_number = Patient("111 111 1111"), Patient("A123456")
+    for patient in (by_nhs_number, by_reg_number):
+        patient.surname, patient.dob = "Smith", date(1990, 1, 1)
+    by_nhs_number.jobs = "Chase bloods"
+    empty_patient_list.extend([by_nhs_number, by_reg_number])
+
+    # sharing a surname and DOB doesn't make them the same person, so neither is lost
+    assert empty_patient_list.patients == [by_nhs_number, by_reg_number]
+    assert empty_patient_list["111 111 1111"].jobs == "Chase bloods"
+    assert [key for key, _, _ in empty_patient_list.collisions] == [
+        ("surname_dob", "smith", date(1990, 1, 1))
+    ]
+
+    # whereas the same patient ID replaces the patient
+    updated = Patient("111 111 1111")
+    empty_patient_list.append(updated)
+    assert len(empty_patient_list) == 2
+    assert empty_patient_list["111 111 1111"] is updated
+
+
+def test_patient_list_reconcile(empty_patient_list):
+    staying, leaving = Patient("111 111 1111"), Patient("A123456")
+    empty_patient_list.extend([staying, leaving])
+
+    trakcare_staying, arriving = Patient("111 111 1111"), Patient("222 222 2222")
+    reconciliation = empty_patient_list.reconcile([trakcare_staying, arriving])
+
+    assert reconciliation.continuing == [(trakcare_staying, staying)]
+    assert reconciliation.new == [arriving]
+    assert reconciliation.discharged == [leaving]
@@ -0,0 +1,58 @@
+import datetime
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src import settings, utils
+from src.list_generator import cache, prewarm
+from src.shared_enums import Team
+from src.store import store
+
+TODAY = datetime.date(2020, 6, 2)
+
+
+@pytest.fixture
+def previous_list(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LIST_ROOT_DIR", tmp_path / "share")
+    store.delete_prefix("previous_lists", "")
+
+    team = Team.RESPIRATORY.value
+    yesterday = TODAY - datetime.timedelta(days=1)
+    folder = utils.build_team_file_path(team, yesterday)
+    folder.mkdir(parents=True)
+    path = folder / f"{utils.generate_file_stem(team, yesterday)}.docm"
+    shutil.copy(Path(__file__).parent / "assets" / "empty_list.docm", path)
+    return path
+
+
+def test_local_copy_is_only_used_while_up_to_date(previous_list):
+    assert prewarm.local_copy(previous_list) == previous_list
+
+    local_path = prewarm.copy_locally(previous_list)
+    assert local_path != previous_list
+    assert prewarm.local_copy(previous_list) == local_path
+
+    # the list has been edited on the share since it was copied
+    stat = previous_list.stat()
+    os.utime(previous_list, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert prewarm.local_copy(previous_list) == previous_list
+
+
+def test_previous_list_location_is_remembered(previous_list):
+    team = Team.RESPIRATORY.value
+    assert prewarm.find_previous_list(team, TODAY) == previous_list
+    assert store.get("previous_lists", f"Respiratory:{TODAY}") == str(previous_list).encode()
+
+    # a list that has since been removed is searched for again
+    previous_list.unlink()
+    assert prewarm.find_previous_list(team, TODAY) is None
+
+
+def test_prewarm_parses_previous_lists(previous_list):
+    cache.parsed_lists.clear()
+    prewarm.prewarm(TODAY)
+
+    assert prewarm.local_copy(previous_list) != previous_list
+    assert len(cache.parsed_lists) == 1
@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+from src.list_generator.reconcile import reconcile
+
+
+def patient(reg_number, location=None):
+    return SimpleNamespace(reg_number=reg_number, location=location)
+
+
+def test_reconcile():
+    staying = patient("1111111", "Tarka 1A")
+    moving = patient("2222222", "Tarka 2B")
+    unknown_location = patient("3333333")
+    leaving = patient("4444444", "Tarka 3C")
+    previous = [staying, moving, unknown_location, leaving]
+    by_reg_number = {p.reg_number: p for p in previous}
+
+    current = [
+        patient("1111111", "Tarka 1A"),
+        patient("2222222", "Lundy 4D"),
+        patient("3333333", "Lundy 5E"),
+        patient("5555555", "Lundy 6F"),
+    ]
+    reconciliation = reconcile(
+        previous, current, lambda p: by_reg_number.get(p.reg_number), location=lambda p: p.location,
+    )
+
+    assert reconciliation.continuing == [
+        (current[0], staying),
+        (current[1], moving),
+        (current[2], unknown_location),
+    ]
+    # a patient is only moved if both locations are known
+    assert reconciliation.moved == [(current[1], moving)]
+    assert reconciliation.new == [current[3]]
+    assert reconciliation.discharged == [leaving]
+
+
+def test_reconcile_matches_each_previous_patient_once():
+    previous = [patient("1111111")]
+    current = [patient("1111111"), patient("1111111")]
+
+    reconciliation = reconcile(previous, current, lambda p: previous[0])
+
+    assert reconciliation.continuing == [(current[0], previous[0])]
+    # the second current patient can't also be the same person, so they're new
+    assert reconciliation.new == [current[1]]
+    assert reconciliation.discharged == []
+    # without a way of finding their location, no one is reported as moved
+    assert reconciliation.moved == []
@@ -0,0 +1,31 @@
+import csv
+import io
+
+from src.list_generator.renderers import CsvRenderer, HtmlRenderer, JsonRenderer, render
+from src.list_generator.rows import Row
+
+ROWS = [
+    Row(Row.WARD, ["Tarka"]),
+    Row(Row.BIRTHDAY, ["Happy birthday John! 64 today!"]),
+    Row(
+        Row.PATIENT, ["3F", "SMITH, John\n123 456 7890", "Unwell", "", "", "", "", ""], is_new=True
+    ),
+    Row(Row.PATIENT, ["SR2", "JONES, Mary", "CAP", "Improving", "Chase CXR", "Wed", "", "7"]),
+]
+
+
+def test_renderers_share_one_pass():
+    page, exported, rows = render(ROWS, [HtmlRenderer(title="list"), CsvRenderer(), JsonRenderer()])
+
+    assert '<tr class="ward"><td colspan="8">Tarka</td></tr>' in page
+    assert '<tr class="new"><td>3F</td><td>SMITH, John<br>123 456 7890</td>' in page
+
+    # the CSV has a row per patient, with their ward as a column
+    header, *patients = csv.reader(io.StringIO(exported))
+    assert header[:3] == ["Ward", "Bed", "Patient Details"]
+    assert [patient[:2] for patient in patients] == [["Tarka", "3F"], ["Tarka", "SR2"]]
+    assert patients[0][-2:] == ["yes", ""]
+
+    # the compact JSON rows can be turned back into the same Rows
+    assert rows[0] == {"kind": "ward", "bed": "Tarka"}
+    assert [Row.from_dict(row) for row in rows] == ROWS
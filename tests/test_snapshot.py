@@ -0,0 +1,67 @@
+import datetime
+
+from src.list_generator.snapshot import SnapshotStore, record
+from src.shared_enums import Consultant, Ward
+from src.shared_models import Patient
+
+
+def trak_patient(reg_number, ward, room, bed, consultant):
+    return Patient.from_record(
+        {
+            "reg_number": reg_number,
+            "_nhs_number": "",
+            "ward": ward,
+            "room": room,
+            "_bed": bed,
+            "consultant": consultant,
+        }
+    )
+
+
+def test_snapshot_diff(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots.sqlite3")
+    yesterday = datetime.datetime(2020, 6, 15, 7, 0)
+    today = yesterday + datetime.timedelta(days=1)
+
+    record(
+        [
+            trak_patient("1111111", Ward.TARKA, "Bay 02 TA", "Bed2B", Consultant.ALISON_MOODY),
+            trak_patient("2222222", Ward.TARKA, "Bay 02 TA", "Bed2C", Consultant.ALISON_MOODY),
+            trak_patient("3333333", Ward.LUNDY, "Bay 1 LU", "BedA", Consultant.ALISON_MOODY),
+            trak_patient("4444444", Ward.STAPLES, "Bay 4 STA", "Bed E", Consultant.RIAZ_LATIF),
+        ],
+        store=store,
+        taken_at=yesterday,
+    )
+
+    diff = record(
+        [
+            # unchanged
+            trak_patient("1111111", Ward.TARKA, "Bay 02 TA", "Bed2B", Consultant.ALISON_MOODY),
+            # moved ward; 2222222 was discharged
+            trak_patient("3333333", Ward.TARKA, "Bay 03 TA", "Bed3A", Consultant.ALISON_MOODY),
+            # transferred from stroke to respiratory
+            trak_patient("4444444", Ward.STAPLES, "Bay 4 STA", "Bed E", Consultant.JAREER_RAZA),
+            # newly admitted
+            trak_patient("5555555", Ward.TARKA, "Room 04 TA", "Bed01", Consultant.ALISON_MOODY),
+        ],
+        store=store,
+        taken_at=today,
+    )
+
+    assert diff.previous_taken_at == yesterday
+    assert diff.admitted == {"5555555"}
+    assert diff.discharged == {"2222222"}
+    assert diff.moved == {"3333333"}
+    assert diff.consultant_changed == {"4444444"}
+
+    respiratory = diff.for_team("Respiratory")
+    assert respiratory.admitted == {"4444444", "5555555"}
+    assert respiratory.discharged == {"2222222"}
+    assert respiratory.moved == {"3333333"}
+
+    stroke = diff.for_team("Stroke")
+    assert stroke.discharged == {"4444444"}
+
+    # a second run on the same day still compares against yesterday
+    assert record([], store=store, taken_at=today.replace(hour=9)).previous_taken_at == yesterday
@@ -0,0 +1,63 @@
+import threading
+import time
+
+from src.store import Store
+
+
+def test_store_expiry_and_add(tmp_path):
+    store = Store(tmp_path / "store.sqlite3")
+
+    store.set("uploads", "a", b"contents")
+    assert store.get("uploads", "a") == b"contents"
+    assert store.get("jobs", "a") is None
+
+    # an existing key can't be added again, so add() works as a lock
+    assert not store.add("uploads", "a", b"other")
+    assert store.add("uploads", "b", b"other", ttl=-1)
+    # ...unless it has expired
+    assert store.get("uploads", "b") is None
+    assert store.add("uploads", "b", b"again")
+
+
+def test_single_flight_computes_once(tmp_path):
+    store = Store(tmp_path / "store.sqlite3")
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"output_file_path": "list.docx"}
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(store.single_flight("jobs", "key", compute, ttl=60))
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"output_file_path": "list.docx"}] * 5
+
+
+def test_in_flight(tmp_path):
+    store = Store(tmp_path / "store.sqlite3")
+    computing, finish = threading.Event(), threading.Event()
+
+    def compute():
+        computing.set()
+        finish.wait()
+        return {"output_file_path": "list.docx"}
+
+    thread = threading.Thread(target=lambda: store.single_flight("jobs", "key", compute, ttl=60))
+    thread.start()
+    computing.wait()
+    assert store.in_flight("jobs", "key")
+
+    finish.set()
+    thread.join()
+    assert not store.in_flight("jobs", "key")